@@ -79,8 +79,14 @@ class Aerosol_Penetrometer_Light_Scattering_Detector:
     evaluateMeasurement(total_turbidity_ratio)
         Calculates the filtered particle percentage of the sample
     saveData(diode_voltage,turbidity,turbidity_ratio,measurement_time)
-        Saves the measurement values into a .csv file and the measurement plot
-        into .pdf file
+        Saves the measurement values into a .csv and a .npz file and the
+        measurement plot into .pdf file
+    saveNpzData(file_name,diode_voltage,turbidity,turbidity_ratio,
+                measurement_time,calibration_value,total_turbidity,
+                total_turbidity_ratio,filtered_percentage,data_name)
+        Saves the measurement values into a columnar .npz file
+    readNpzData(file_name)
+        Reads an existing .npz file containing measurement data
     readCSVData(file_name)
         Reads an existing .csv file containing measurement data   
     makeListOfCsvRow(row)
@@ -111,6 +117,7 @@ class Aerosol_Penetrometer_Light_Scattering_Detector:
         self.__calibration_value = calibration_value
         self.__serial_port = serial_port
         self.__baud_rate = baud_rate
+        self.__arduino = None
         self.__arduino = self.initSerial()
         self.setLedState(led_state,'Before')
         self.setLedState(led_state,'After')
@@ -119,12 +126,17 @@ class Aerosol_Penetrometer_Light_Scattering_Detector:
     def initSerial(self):
         """Initializes the serial communication to the arduino
         
+        An open connection is reused, because every opening resets the
+        arduino.
+        
         Returns
         -------
         self.__arduino : serial object
             Serial object of the arduino     
         """
         
+        if self.__arduino is not None and self.__arduino.is_open:
+            return self.__arduino
         self.__arduino = serial.Serial(self.__serial_port,self.__baud_rate)
         return self.__arduino
     
@@ -502,8 +514,8 @@ class Aerosol_Penetrometer_Light_Scattering_Detector:
     def saveData(self,diode_voltage,turbidity,turbidity_ratio,
                  measurement_time,calibration_value,total_turbidity,
                  total_turbidity_ratio,filtered_percentage):
-        """Saves the measurement values into a .csv file and the measurement
-        plot into .pdf file
+        """Saves the measurement values into a .csv and a .npz file and the
+        measurement plot into .pdf file
         
         Parameters
         ----------
@@ -571,8 +583,103 @@ class Aerosol_Penetrometer_Light_Scattering_Detector:
             for (i,j,k,l) in zip(measurement_time,diode_voltage,turbidity,
                 turbidity_ratio):
                 wr.writerow([i,j,k,l])
+        self.saveNpzData("Messungen/" + data_name + "/" + data_name + ".npz",
+                         diode_voltage,turbidity,turbidity_ratio,
+                         measurement_time,calibration_value,total_turbidity,
+                         total_turbidity_ratio,filtered_percentage,data_name)
         print("Saving complete!")
         
+    def saveNpzData(self,file_name,diode_voltage,turbidity,turbidity_ratio,
+                    measurement_time,calibration_value,total_turbidity,
+                    total_turbidity_ratio,filtered_percentage,data_name):
+        """Saves the measurement values into a columnar .npz file
+        
+        Every quantity is saved as one array, the same layout is used by the
+        Storage module of the V2.
+        
+        Parameters
+        ----------
+        file_name : str
+            Name of the file inclusive complete file path, for example:
+            'Messungen/Test/Test.npz'
+        diode_voltage : float
+            Voltage values in volts of the photo transistors in order:
+            [Before90° Before180° After90° After180°]
+        turbidity : float
+            Turbidity value (90°signal/180°signal) before and after the mask in
+            order: [Before After]
+        turbidity_ratio : float
+            Ratio between the turbidity before and after the mask
+        measurement_time : float
+            Measurement time in seconds
+        calibration_value : float
+            offset value of the turbidity before and after the mask
+        total_turbidity : float
+            Integrated turbidity values over time
+        total_turbidity_ratio : float
+            Ratio of the total, integrated trubidity values before and after
+            the sample
+        filtered_percentage : int
+            Filtered particle percentage of the sample
+        data_name : str
+            Name of the measurement
+        """
+        
+        np.savez(file_name,format_version = 1,
+                 measurement_time = np.asarray(measurement_time,np.float64),
+                 transistor_voltage = np.asarray(diode_voltage,
+                                                 np.float64).reshape(-1,4),
+                 turbidity = np.asarray(turbidity,np.float64).reshape(-1,2),
+                 turbidity_ratio = np.asarray(turbidity_ratio,np.float64),
+                 calibration_value = np.asarray(calibration_value),
+                 total_turbidity = np.asarray(total_turbidity),
+                 total_turbidity_ratio = np.asarray(total_turbidity_ratio),
+                 filtered_percentage = np.asarray(filtered_percentage),
+                 data_name = np.asarray(data_name),
+                 created = np.asarray(str(date.today())),
+                 device = np.asarray('V1'))
+        
+    def readNpzData(self,file_name):
+        """Reads an existing .npz file containing measurement data
+        
+        The arrays are returned directly without parsing.
+        
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to read inclusive complete file path, for example:
+            'Messungen/Test/Test.npz'
+            
+        Returns
+        -------
+        measurement_time : ndarray
+            Measurement time in seconds
+        diode_voltage : ndarray
+            Voltage values in volts of the photo transistors in order:
+            [Before90° Before180° After90° After180°]
+        turbidity : ndarray
+            Turbidity value (90°signal/180°signal) before and after the mask in
+            order: [Before After]
+        turbidity_ratio : ndarray
+            Ratio between the turbidity before and after the mask
+        calibration_value : ndarray
+            offset value of the turbidity before and after the mask
+        total_turbidity : ndarray
+            Integrated turbidity values over time
+        total_turbidity_ratio : float
+            Ratio of the total, integrated trubidity values before and after
+            the sample
+        filtered_percentage : int
+            Filtered particle percentage of the sample
+        """
+        
+        with np.load(file_name,allow_pickle = False) as data:
+            return data['measurement_time'],data['transistor_voltage'],\
+                data['turbidity'],data['turbidity_ratio'],\
+                data['calibration_value'],data['total_turbidity'],\
+                data['total_turbidity_ratio'].item(),\
+                data['filtered_percentage'].item()
+        
     def readCSVData(self,file_name):
         """Reads an existing .csv file containing measurement data
         
@@ -643,6 +750,8 @@ class Aerosol_Penetrometer_Light_Scattering_Detector:
                     turbidity_ratio.append(float(row[3]))             
                     line_count += 1
                 else:
+                    # Skip the empty row and the column names
+                    line_count += 1
                     continue
                              
         return measurement_time,diode_voltage,turbidity,turbidity_ratio,\
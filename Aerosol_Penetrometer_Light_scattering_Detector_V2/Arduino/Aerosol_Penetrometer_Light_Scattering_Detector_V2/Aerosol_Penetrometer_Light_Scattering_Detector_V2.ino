@@ -2,8 +2,15 @@
 // Author: Sebastian Lifka
 // Title: ﻿Aerosol_Penetrometer_Light_Scattering_Detector_V2
 // Created: 22. Jan 2021
-// Modified: 22. Jan 2021
-// Description: 
+// Modified: 17. Oct 2026
+// Description: "1" sends one sample, "2" checks the pressure sensor,
+//              "S<rate>\n" starts streaming samples with <rate> Hz and a sample
+//              number in front, "B<rate>\n" starts streaming binary frames
+//              with <rate> Hz, "X" stops streaming.
+//              Binary frame (18 bytes, little endian): 0xAA 0x55, uint16
+//              sample number, 4x uint16 ADC values [Before90 Before180
+//              After90 After180], uint32 pressure in Pa/256, uint16
+//              CRC-16/CCITT-FALSE of the first 16 bytes.
 ///////////////////////////////////////////////////////////////////////////////////////////////////////////////////////
 
 #include <Wire.h>
@@ -33,10 +40,19 @@ float transistorVoltageAfter180;
 
 float pressureAfter;
 
+bool streaming = false;
+bool binaryFrames = false;      // Stream binary frames instead of text lines
+unsigned long streamPeriod;     // Sample period of the stream in microseconds
+unsigned long lastSampleTime;   // Time of the last streamed sample in microseconds
+unsigned long sampleNumber;     // Number of the streamed sample
+
+uint8_t frame[18];
+
 String incoming;
 
 void setup() {
   Serial.begin(baudRate);
+  Serial.setTimeout(20);  // Timeout of the rest of a command in milliseconds
   bmp.begin();
 
     /* Default settings from datasheet. */
@@ -51,29 +67,8 @@ void loop() {
   incoming = readInput();
 
   if (incoming == "1") {
-    transistorValueBefore90 = analogRead(analogPinBefore90);
-    transistorValueBefore180 = analogRead(analogPinBefore180);
-    transistorValueAfter90 = analogRead(analogPinAfter90);
-    transistorValueAfter180 = analogRead(analogPinAfter180);
-    
-    transistorVoltageBefore90 = transistorValueBefore90 * (5.0 / 1023.0);
-    transistorVoltageBefore180 = transistorValueBefore180 * (5.0 / 1023.0);
-    transistorVoltageAfter90 = transistorValueAfter90 * (5.0 / 1023.0);
-    transistorVoltageAfter180 = transistorValueAfter180 * (5.0 / 1023.0);
-  
-    pressureAfter = bmp.readPressure();
-    pressureAfter = pressureAfter*1e-2;
-    
-    Serial.print(transistorVoltageBefore90,3);
-    Serial.print(';');
-    Serial.print(transistorVoltageBefore180,3);
-    Serial.print(';');
-    Serial.print(transistorVoltageAfter90,3);
-    Serial.print(';');
-    Serial.print(transistorVoltageAfter180,3);
-    Serial.print(';');
-    Serial.print(pressureAfter,1);
-    Serial.println();
+    readSensors();
+    printSample();
 
     incoming = "0";
   } else if (incoming == "2") {
@@ -81,9 +76,116 @@ void loop() {
       Serial.println("No pressure sensor connected!");
     }
     incoming = "0";
+  } else if (incoming.startsWith("S") || incoming.startsWith("B")) {
+    // The rate may not be received completely yet, read until the new line
+    incoming += Serial.readStringUntil('\n');
+    long streamRate = incoming.substring(1).toInt();
+    if (streamRate > 0) {
+      streamPeriod = 1000000UL / streamRate;
+      lastSampleTime = micros() - streamPeriod;
+      sampleNumber = 0;
+      binaryFrames = incoming.startsWith("B");
+      streaming = true;
+    }
+    incoming = "0";
+  } else if (incoming == "X") {
+    streaming = false;
+    incoming = "0";
   }
-  
-  delay(50);
+
+  if (streaming) {
+    // No delay while streaming, the samples are timed by micros()
+    unsigned long lag = micros() - lastSampleTime;
+    if (lag >= streamPeriod) {
+      if (lag >= 2 * streamPeriod) {
+        // More than one period behind, e.g. the rate exceeds what the baud
+        // rate can carry. Skip the missed samples instead of bursting them,
+        // the gap in the sample numbers shows them as dropped
+        unsigned long missedSamples = lag / streamPeriod - 1;
+        lastSampleTime += missedSamples * streamPeriod;
+        sampleNumber += missedSamples;
+      }
+      lastSampleTime += streamPeriod;
+      readSensors();
+      if (binaryFrames) {
+        writeFrame();
+      } else {
+        Serial.print(sampleNumber);
+        Serial.print(';');
+        printSample();
+      }
+      sampleNumber++;
+    }
+  } else {
+    delay(50);
+  }
+}
+
+void readSensors() {
+  transistorValueBefore90 = analogRead(analogPinBefore90);
+  transistorValueBefore180 = analogRead(analogPinBefore180);
+  transistorValueAfter90 = analogRead(analogPinAfter90);
+  transistorValueAfter180 = analogRead(analogPinAfter180);
+
+  transistorVoltageBefore90 = transistorValueBefore90 * (5.0 / 1023.0);
+  transistorVoltageBefore180 = transistorValueBefore180 * (5.0 / 1023.0);
+  transistorVoltageAfter90 = transistorValueAfter90 * (5.0 / 1023.0);
+  transistorVoltageAfter180 = transistorValueAfter180 * (5.0 / 1023.0);
+
+  pressureAfter = bmp.readPressure();
+  pressureAfter = pressureAfter*1e-2;
+}
+
+void writeFrame() {
+  // Pressure in Pa/256 like the fixed point output of the BMP280
+  uint32_t pressureValue = (uint32_t)(pressureAfter*1e2*256.0 + 0.5);
+  uint16_t values[] = {(uint16_t)sampleNumber,
+                       (uint16_t)transistorValueBefore90,
+                       (uint16_t)transistorValueBefore180,
+                       (uint16_t)transistorValueAfter90,
+                       (uint16_t)transistorValueAfter180};
+  frame[0] = 0xAA;
+  frame[1] = 0x55;
+  for (int i = 0; i < 5; i++) {
+    frame[2 + 2*i] = values[i] & 0xFF;
+    frame[3 + 2*i] = values[i] >> 8;
+  }
+  for (int i = 0; i < 4; i++) {
+    frame[12 + i] = (pressureValue >> (8*i)) & 0xFF;
+  }
+  uint16_t crc = crc16(frame, 16);
+  frame[16] = crc & 0xFF;
+  frame[17] = crc >> 8;
+  Serial.write(frame, 18);
+}
+
+uint16_t crc16(uint8_t *data, int length) {
+  // CRC-16/CCITT-FALSE
+  uint16_t crc = 0xFFFF;
+  for (int i = 0; i < length; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (int j = 0; j < 8; j++) {
+      if (crc & 0x8000) {
+        crc = (crc << 1) ^ 0x1021;
+      } else {
+        crc = crc << 1;
+      }
+    }
+  }
+  return crc;
+}
+
+void printSample() {
+  Serial.print(transistorVoltageBefore90,3);
+  Serial.print(';');
+  Serial.print(transistorVoltageBefore180,3);
+  Serial.print(';');
+  Serial.print(transistorVoltageAfter90,3);
+  Serial.print(';');
+  Serial.print(transistorVoltageAfter180,3);
+  Serial.print(';');
+  Serial.print(pressureAfter,1);
+  Serial.println();
 }
 
 String readInput() {
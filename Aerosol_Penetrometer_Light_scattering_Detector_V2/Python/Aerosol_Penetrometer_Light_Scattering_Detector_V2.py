@@ -1,10 +1,44 @@
 """Class file for the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
 import numpy as np
-import matplotlib.pyplot as plt
-import serial
+import sys
 import time
 import glob
 import warnings
+import collections
+import threading
+from serial.tools import list_ports
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Acquisition as acq
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Drift_Tracker as dtr
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Evaluation as evl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Flow_Detector as fdt
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Frames as frm
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Port_Pool as ppl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Recorder as rec
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Running_Integrator \
+    as rin
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Running_Statistics \
+    as rst
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Sample_Store as sst
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Storage as sto
+
+# Serial port names of the USB serial converters of the arduino on Linux and
+# macOS
+port_patterns = ['/dev/ttyUSB*', '/dev/ttyACM*', '/dev/cu.usbserial-*',
+                 '/dev/cu.usbmodem*']
+
+
+def findSerialPorts():
+    """Return the serial ports of all connected USB serial converters.
+
+    Returns
+    -------
+    serial_ports : list
+        Sorted serial port names matching the port patterns
+    """
+    serial_ports = []
+    for pattern in port_patterns:
+        serial_ports += sorted(glob.glob(pattern))
+    return serial_ports
 
 
 class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
@@ -21,7 +55,7 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
 
     Modified
     --------
-    Jun 23 2021
+    Oct 17 2026
 
     Attributes
     ----------
@@ -40,16 +74,101 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
     __baud_rate : int
         baud rate of the serial port communication (default 9600)
     __arduino : serial object
-        serial object of the arduino
+        serial object of the arduino, None until the first use
+    __live_plot : Live_Plot
+        Live plot of the current measurement, None if no plot is shown
+    __sample_number : int
+        Number of the last streamed sample, None if no sample was received
+    __dropped_samples : int
+        Number of streamed samples missing in the sample numbers
+    __corrupted_frames : int
+        Number of binary frames discarded due to a wrong CRC
+    __frame_rest : bytes
+        Received bytes of an incomplete binary frame
+    __line_rest : bytes
+        Received bytes of an incomplete line of the stream
+    __sample_period : float
+        Sample period of the stream in seconds
+    __pipeline_depth : int
+        Maximum number of pipelined requests in flight
+    __request_interval : float
+        Minimum time between two pipelined requests in seconds
+    __requests : deque
+        Monotonic send times of the pipelined requests in flight
+    __latency : float
+        Mean time between a pipelined request and its reply in seconds
+    __lost_replies : int
+        Number of pipelined requests without reply
+    __running_integrator : Running_Integrator
+        Running integrals of the turbidity before and after the mask and of
+        the relative pressure of the current measurement
+    __flow_detector : Flow_Detector
+        Online detector of the flow start and stop of the current measurement
+    __running_statistics : Running_Statistics
+        Running mean and variance of the turbidity before and after the mask
+        and of the relative pressure of the current measurement
+    __calibration_standard_error : list
+        Standard error of the calibration value
+    __calibration_samples : int
+        Number of samples of the calibration
+    __drift_tracker : Drift_Tracker
+        Exponentially weighted baselines of the uncorrected turbidity before
+        and after the mask and of the absolute pressure between the
+        measurements
+    __drift_ring_buffer : Ring_Buffer
+        Ring buffer of the samples of the drift monitor
+    __drift_thread : Acquisition_Thread
+        Acquisition thread of the drift monitor, None if it is not running
+    __drift_stop_event : threading.Event
+        Set to stop waiting for the next sample of the drift monitor
+    ring_buffer_capacity : int
+        Number of samples the ring buffer between the acquisition thread and
+        the live plot can hold (default 4096)
+    recording_window : int
+        Number of the latest samples kept in memory for the live plot, while
+        the samples are recorded to disk (default 65536)
+    reply_timeout : float
+        Time in seconds after which a request is taken as lost, also the read
+        timeout of the serial port (default 0.5)
+    flow_hold_off : float
+        Time in seconds without pressure jump before the flow stop is
+        confirmed (default 0.5)
+    auto_stop_margin : float
+        Time in seconds the measurement continues after the flow stop, if it
+        is stopped automatically (default 1.0)
+    calibration_tolerance : list
+        Standard errors of the mean turbidity before and after the mask and
+        of the mean pressure in mbar, below which the calibration finishes,
+        half of the rounding of the calibration value
+        (default [5e-4, 5e-4, 5e-2])
+    calibration_minimum_samples : int
+        Minimum number of samples of a calibration (default 50)
+    drift_check_samples : int
+        Number of samples requested by the drift check of a cached
+        calibration, about 0.5 s at 20 Hz of readData() (default 10)
+    calibration_drift_tolerance : list
+        Maximum difference of the turbidity offsets before and after the
+        mask and of the absolute pressure in mbar between the drift check
+        and a cached calibration, which is reused then. The scatter of the
+        drift check is added, see calibrateCached()
+        (default [2e-3, 2e-3, 0.2])
+    drift_sample_interval : float
+        Time in seconds between the samples of the drift monitor
+        (default 1.0)
+    drift_time_constant : float
+        Time constant in seconds of the baselines of the drift monitor
+        (default 60.0)
 
     Methods
     -------
     initSerial()
         Initializes the serial communication to the arduino
-    closeSerial()
+    closeSerial(keep_open)
         Closes the serial communication to the arduino
     getCalibrationValue()
         Returns the calibration value
+    getCalibrationConfidence()
+        Returns the standard error of the calibration value
     getMeasurementVolume
         Get measurement volume
     setMeasurementVolume
@@ -61,15 +180,65 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
     readData()
         Read the analog voltage values of the photo transistor conneceted to
         the analog inputs of the arduino
-    liveMeasurement(measurement_duration)
+    startStreaming(sample_rate)
+        Start the continuous stream of samples
+    stopStreaming()
+        Stop the continuous stream of samples
+    readStreamData()
+        Read the next sample of the continuous stream
+    readStreamBlock()
+        Read all received lines of the continuous stream at once
+    getDroppedSamples()
+        Return the number of dropped samples of the stream
+    startBinaryStreaming(sample_rate)
+        Start the continuous stream of binary frames
+    readFrameData()
+        Read all received binary frames of the continuous stream
+    getCorruptedFrames()
+        Return the number of binary frames with a wrong CRC
+    startPipeline(pipeline_depth, request_interval)
+        Start the pipelined requests of samples
+    stopPipeline()
+        Stop the pipelined requests of samples
+    readPipelinedData()
+        Request samples pipelined and read all received replies
+    getLostReplies()
+        Return the number of pipelined requests without reply
+    liveMeasurement(measurement_duration, plot, sample_rate, binary,
+                    pipeline_depth, record_file, auto_stop, tolerance)
         Starts a measurement and plots the measurement values live into a
-        figure
+        figure, without plot the measurement runs headless
+    getRunningIntegrals(start_ind, stop_ind)
+        Returns the running integrals of the turbidity and the pressure
+    getLiveEstimate()
+        Returns the running estimate of penetration and breathing resistance
+    getLiveFlowRate()
+        Returns flow rate, flow time, start and stop index detected online
+    saveData(file_name, sample_store, **metadata)
+        Saves a measurement as columnar .npz file
     plotMeasurement(measurement_time,diode_voltage,turbidity,turbidity_ratio)
         Plots the measurement values
     markFlowStartStop(tart_ind, stop_ind, measurement_time)
         Mark start and stop of the flow in the live measurement.
-    calibrate(measurement_duration)
+    calibrate(measurement_duration, plot, sample_rate, binary,
+              pipeline_depth, tolerance)
         Measures the trurbidity offset values
+    getDeviceKey()
+        Returns the key of the device for the calibration cache
+    calibrateCached(cache, measurement_duration, plot, sample_rate, binary,
+                    pipeline_depth, drift_tolerance)
+        Reuses a cached calibration if it did not drift, otherwise measures
+        the turbidity offset values
+    startDriftMonitor(reset)
+        Starts the background monitor of the baseline drift
+    stopDriftMonitor()
+        Stops the background monitor of the baseline drift
+    getDriftBaseline()
+        Returns the baselines of the drift monitor
+    getDrift()
+        Returns the drift of the baselines from the calibration value
+    isCalibrationDue(drift_tolerance)
+        Returns True if the baselines drifted beyond the tolerance
     calculateTurbidity(diode_voltage)
         Calculates the turbidity values before and after the mask
     calculateTurbidityRatio(turbidity)
@@ -90,8 +259,21 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         Calculate the flow rate in l/min and the flow time in seconds
     """
 
+    ring_buffer_capacity = 4096
+    recording_window = 65536
+    reply_timeout = 0.5
+    flow_hold_off = 0.5
+    auto_stop_margin = 1.0
+    calibration_tolerance = [5e-4, 5e-4, 5e-2]
+    calibration_minimum_samples = 50
+    drift_check_samples = 10
+    calibration_drift_tolerance = [2e-3, 2e-3, 0.2]
+    drift_sample_interval = 1.0
+    drift_time_constant = 60.0
+
     def __init__(self, measurement_volume, total_turbidity_ratio_idle,
-                 calibration_value=[0.000, 0.000, 0.00], baud_rate=9600):
+                 calibration_value=[0.000, 0.000, 0.00], baud_rate=9600,
+                 serial_port=None):
         """Init function.
 
         Parameters
@@ -104,36 +286,90 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
             offset value of the turbidity before and after the mask and the
             absolute pressure value in mbar
             (default [0,0,0])
-        serial_port : str
-            serial port of the arduino
         baud_rate : int
             baud rate of the serial port communication (default 9600)
+        serial_port : str
+            serial port of the arduino, for example the port of the
+            simulator. If None the first port found by findSerialPorts() is
+            used (default None)
         """
         self.measurement_volume = measurement_volume
         self.total_turbidity_ratio_idle = total_turbidity_ratio_idle
         self.__calibration_value = calibration_value
-        serial_port = glob.glob('/dev/cu.usbserial-*')
-        if np.size(serial_port) == 0:
-            raise ValueError("No device connected!")
-        self.__serial_port = serial_port[0]
+        if serial_port is None:
+            serial_port = findSerialPorts()
+            if np.size(serial_port) == 0:
+                raise ValueError("No device connected!")
+            serial_port = serial_port[0]
+        self.__serial_port = serial_port
         self.__baud_rate = baud_rate
-        self.__arduino = self.initSerial()
+        self.__live_plot = None
+        self.__sample_number = None
+        self.__dropped_samples = 0
+        self.__corrupted_frames = 0
+        self.__frame_rest = b""
+        self.__line_rest = b""
+        self.__sample_period = None
+        self.__pipeline_depth = 1
+        self.__request_interval = 0.0
+        self.__requests = collections.deque()
+        self.__latency = 0.0
+        self.__lost_replies = 0
+        self.__running_integrator = rin.Running_Integrator(3)
+        self.__flow_detector = fdt.Flow_Detector(self.flow_hold_off)
+        self.__running_statistics = rst.Running_Statistics(3)
+        self.__calibration_standard_error = [np.nan, np.nan, np.nan]
+        self.__calibration_samples = 0
+        self.__drift_tracker = dtr.Drift_Tracker(3, self.drift_time_constant)
+        self.__drift_ring_buffer = acq.Ring_Buffer(self.ring_buffer_capacity,
+                                                   6)
+        self.__drift_thread = None
+        self.__drift_stop_event = threading.Event()
+        # The serial port is opened at the first use
+        self.__arduino = None
 
     def initSerial(self):
         """Initialize the serial communication to the arduino.
 
+        The connection is taken from the process-wide port pool, so a port
+        which is already open, for example by a former instance, is reused
+        without resetting the arduino. A stale connection is reopened.
+
         Returns
         -------
         self.__arduino : serial object
             Serial object of the arduino
         """
-        self.__arduino = serial.Serial(self.__serial_port, self.__baud_rate)
-        plt.close(2)
+        self.__arduino = ppl.port_pool.acquire(self.__serial_port,
+                                               self.__baud_rate,
+                                               self.reply_timeout)
+        # Do not import matplotlib only to close the figure
+        if 'matplotlib.pyplot' in sys.modules:
+            sys.modules['matplotlib.pyplot'].close(2)
         return self.__arduino
 
-    def closeSerial(self):
-        """Close the serial communication to the arduino."""
-        self.__arduino.close()
+    def __connect(self):
+        """Initialize the serial communication if it is not usable."""
+        if self.__arduino is None or \
+                ppl.port_pool.isStale(self.__serial_port):
+            self.initSerial()
+        # Wait for the bootloader only if the port was just opened
+        ppl.port_pool.waitUntilReady(self.__serial_port)
+
+    def closeSerial(self, keep_open=True):
+        """Close the serial communication to the arduino.
+
+        Parameters
+        ----------
+        keep_open : bool
+            Keep the port open and warmed up in the port pool for the next
+            measurement. All ports are closed at the exit of the interpreter
+            (default True)
+        """
+        self.stopDriftMonitor()
+        if not keep_open:
+            ppl.port_pool.close(self.__serial_port)
+        self.__arduino = None
 
     def getCalibrationValue(self):
         """Return the calibration value.
@@ -147,6 +383,22 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         calibration_value = self.__calibration_value
         return calibration_value
 
+    def getCalibrationConfidence(self):
+        """Return the standard error of the calibration value.
+
+        Returns
+        -------
+        standard_error : list
+            Standard error of the mean turbidity before and after the mask
+            and of the mean absolute pressure in mbar. The 95 % confidence
+            interval of the calibration value is about +-2 standard errors.
+        number_of_samples : int
+            Number of samples of the calibration
+        """
+        standard_error = list(self.__calibration_standard_error)
+        number_of_samples = self.__calibration_samples
+        return standard_error, number_of_samples
+
     def getMeasurementVolume(self):
         """Return the measurement volume.
 
@@ -202,103 +454,672 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
             Voltage values in volts of the photo transistors and pressure
             values in mbar in order:
             [Before90° Before180° After90° After180° Pressure]
+            An empty list if no complete reply was received within
+            reply_timeout
         """
+        if self.__arduino is None:
+            self.__connect()
         outgoing_string = "1"
         self.__arduino.write(outgoing_string.encode())
-        while (self.__arduino.inWaiting() < 0):
-            time.sleep(0.1)
+        # readline() returns an incomplete line after the read timeout
         data = self.__arduino.readline().decode()
+        if not data.endswith("\n"):
+            # Discard the rest of a late reply
+            self.__arduino.reset_input_buffer()
+            return []
         # Voltage values are split by ';', use .float_ to convert list
         data = list(np.float_(data.split(';')))
         return data
 
-    def liveMeasurement(self, measurement_duration):
-        """Live plot of measurement.
+    def startStreaming(self, sample_rate):
+        """Start the continuous stream of samples.
 
-        Starts a measurement and plots the measurement values live into a
-        figure. Measurement can be interrupted by triggering a
-        KeyboardInterrupt.
+        The arduino sends the samples with the given rate without being
+        asked for every sample. Every line starts with the sample number.
 
         Parameters
         ----------
-        measurement_duration : int
-            Duration time of the measurement in seconds
+        sample_rate : int
+            Sample rate of the stream in Hz. At 9600 baud at most about 25 Hz
+            can be transmitted.
+        """
+        self.__connect()
+        self.__sample_number = None
+        self.__dropped_samples = 0
+        self.__line_rest = b""
+        self.__sample_period = 1/int(sample_rate)
+        outgoing_string = "S" + str(int(sample_rate)) + "\n"
+        self.__arduino.write(outgoing_string.encode())
+
+    def stopStreaming(self):
+        """Stop the continuous stream of samples."""
+        outgoing_string = "X"
+        self.__arduino.write(outgoing_string.encode())
+        # Discard the samples sent before the command arrived
+        time.sleep(0.1)
+        self.__arduino.reset_input_buffer()
+
+    def readStreamData(self):
+        """Read the next sample of the continuous stream.
+
+        Gaps in the sample numbers are counted as dropped samples.
 
         Returns
         -------
-        transistor_voltage : float
+        data : float
             Voltage values in volts of the photo transistors and pressure
             values in mbar in order:
             [Before90° Before180° After90° After180° Pressure]
-        turbidity : float
-            Turbidity value (90°signal/180°signal) before and after the mask in
-            order: [Before After]
-        turbidity_ratio : float
-            Ratio beteween the turbidity before and after the mask
-        measurement_time : float
-            Measurement time in seconds
         """
         data = []
-        transistor_voltage = []
-        turbidity = []
-        turbidity_ratio = []
-        pressure = []
-        measurement_time = []
-        t = time.time()
+        while len(data) != 6:
+            line = self.__arduino.readline().decode(errors='ignore')
+            try:
+                data = list(np.float64(line.split(';')))
+            except ValueError:
+                # Skip incomplete or corrupted lines
+                continue
+        sample_number = int(data[0])
+        if self.__sample_number is not None:
+            self.__dropped_samples += max(
+                sample_number - self.__sample_number - 1, 0)
+        self.__sample_number = sample_number
+        return data[1:]
+
+    def getDroppedSamples(self):
+        """Return the number of dropped samples of the stream.
+
+        Returns
+        -------
+        dropped_samples : int
+            Number of streamed samples missing in the sample numbers
+        """
+        dropped_samples = self.__dropped_samples
+        return dropped_samples
+
+    def readStreamBlock(self):
+        """Read all received lines of the continuous stream at once.
+
+        All bytes waiting in the input buffer are read by one call and all
+        complete lines are converted into one array, so the Python overhead
+        is paid per block instead of per sample. An incomplete last line is
+        kept and completed by the next call. Without received bytes an empty
+        block is returned instead of waiting. The time of every sample is
+        calculated back from the arrival time of the block by the sample
+        numbers and the sample period.
+
+        Returns
+        -------
+        data : ndarray
+            Arrival time in seconds, voltage values in volts of the photo
+            transistors and pressure values in mbar, one row per sample in
+            order: [Time Before90° Before180° After90° After180° Pressure]
+        """
+        if self.__arduino.in_waiting == 0:
+            # Do not block, so the acquisition can stop if the device stops
+            # sending
+            time.sleep(1e-3)
+            return np.zeros((0, 6))
+        incoming = self.__arduino.read(self.__arduino.in_waiting)
+        arrival_time = time.monotonic()
+        values = self.__parseLines(incoming, 6)
+        data = np.zeros((len(values), 6))
+        data[:, 0] = self.__timeStamps(values[:, 0].astype(np.int64),
+                                       arrival_time)
+        data[:, 1:6] = values[:, 1:6]
+        return data
+
+    def __parseLines(self, incoming, number_of_fields):
+        """Convert all complete lines of the received bytes at once.
+
+        Parameters
+        ----------
+        incoming : bytes
+            Received bytes, an incomplete last line is kept for the next call
+        number_of_fields : int
+            Number of values separated by ';' per line, other lines are
+            skipped as incomplete or corrupted
+
+        Returns
+        -------
+        values : ndarray
+            Values of the lines with one row per line
+        """
+        lines = (self.__line_rest + incoming).split(b"\n")
+        self.__line_rest = lines.pop()
+        # Skip incomplete or corrupted lines
+        lines = [line for line in lines
+                 if line.count(b";") == number_of_fields - 1]
+        if len(lines) == 0:
+            return np.zeros((0, number_of_fields))
+        try:
+            values = np.array(b";".join(lines).split(b";"), np.float64)
+        except ValueError:
+            values = []
+            for line in lines:
+                try:
+                    values += list(np.float64(line.split(b";")))
+                except ValueError:
+                    continue
+            values = np.array(values)
+        values = values.reshape(-1, number_of_fields)
+        return values
+
+    def __timeStamps(self, sample_number, arrival_time):
+        """Calculate the time of streamed samples arrived at once.
+
+        Gaps in the sample numbers are counted as dropped samples.
+
+        Parameters
+        ----------
+        sample_number : ndarray
+            Sample numbers of the samples
+        arrival_time : float
+            Monotonic time in seconds when the samples arrived
+
+        Returns
+        -------
+        sample_time : ndarray
+            Monotonic time of the samples in seconds
+        """
+        sample_time, dropped_samples = frm.calculateSampleTime(
+            sample_number, self.__sample_number, arrival_time,
+            self.__sample_period)
+        self.__dropped_samples += dropped_samples
+        if len(sample_number) > 0:
+            self.__sample_number = sample_number[-1]
+        return sample_time
+
+    def startBinaryStreaming(self, sample_rate):
+        """Start the continuous stream of binary frames.
+
+        The arduino sends every sample as a frame of 18 bytes with the sample
+        number, the raw ADC values, the pressure and a CRC, see the Frames
+        module. Compared to the text lines less than half of the bytes are
+        transmitted, so about 50 Hz can be streamed at 9600 baud.
+
+        Parameters
+        ----------
+        sample_rate : int
+            Sample rate of the stream in Hz
+        """
+        self.__connect()
+        self.__sample_number = None
+        self.__dropped_samples = 0
+        self.__corrupted_frames = 0
+        self.__frame_rest = b""
+        self.__sample_period = 1/int(sample_rate)
+        outgoing_string = "B" + str(int(sample_rate)) + "\n"
+        self.__arduino.write(outgoing_string.encode())
+
+    def readFrameData(self):
+        """Read all received binary frames of the continuous stream.
+
+        All bytes waiting in the input buffer are decoded at once, without
+        received bytes an empty block is returned instead of waiting. The time
+        of every sample is calculated back from the arrival time of the last
+        frame by the sample numbers and the sample period. Gaps in the sample
+        numbers are counted as dropped samples and frames with a wrong CRC
+        as corrupted frames.
+
+        Returns
+        -------
+        data : ndarray
+            Arrival time in seconds, voltage values in volts of the photo
+            transistors and pressure values in mbar, one row per sample in
+            order: [Time Before90° Before180° After90° After180° Pressure]
+        """
+        if self.__arduino.in_waiting == 0:
+            # Do not block, so the acquisition can stop if the device stops
+            # sending
+            time.sleep(1e-3)
+            return np.zeros((0, 6))
+        incoming = self.__arduino.read(self.__arduino.in_waiting)
+        arrival_time = time.monotonic()
+        frames, self.__frame_rest, corrupted_frames = frm.decodeFrames(
+            self.__frame_rest + incoming)
+        self.__corrupted_frames += corrupted_frames
+        data = np.zeros((len(frames), 6))
+        data[:, 0] = self.__timeStamps(
+            frames['sample_number'].astype(np.int64), arrival_time)
+        data[:, 1:6] = frm.convertFrames(frames)
+        return data
+
+    def getCorruptedFrames(self):
+        """Return the number of binary frames with a wrong CRC.
+
+        Returns
+        -------
+        corrupted_frames : int
+            Number of binary frames discarded due to a wrong CRC
+        """
+        corrupted_frames = self.__corrupted_frames
+        return corrupted_frames
+
+    def startPipeline(self, pipeline_depth=4, request_interval=55e-3):
+        """Start the pipelined requests of samples.
+
+        Instead of waiting for every reply before the next request, up to
+        pipeline_depth requests are kept in flight, so the latency of the
+        USB serial converter and the loop delay of the arduino do not add
+        up. The arduino takes all bytes received within one loop as one
+        command, therefore a request is sent at least request_interval after
+        the previous request still in flight, which has to be longer than
+        the loop of the arduino (50 ms).
+
+        Parameters
+        ----------
+        pipeline_depth : int
+            Maximum number of requests in flight (default 4)
+        request_interval : float
+            Minimum time between two requests in flight in seconds (default
+            55e-3)
+        """
+        self.__connect()
+        self.__pipeline_depth = pipeline_depth
+        self.__request_interval = request_interval
+        self.__requests = collections.deque()
+        self.__latency = request_interval
+        self.__lost_replies = 0
+        self.__line_rest = b""
+
+    def stopPipeline(self):
+        """Stop the pipelined requests of samples."""
+        # Discard the replies of the requests still in flight
+        time.sleep(self.reply_timeout)
+        self.__arduino.reset_input_buffer()
+        self.__requests.clear()
+
+    def readPipelinedData(self):
+        """Request samples pipelined and read all received replies.
+
+        A new request is sent if the request interval has passed and less
+        requests than the window are in flight. The window adapts to the
+        observed latency: it holds the requests sent within one mean
+        latency plus one, limited by the pipeline depth. The replies are
+        matched to the requests in order, requests without reply within
+        reply_timeout are counted as lost.
+
+        Returns
+        -------
+        data : ndarray
+            Arrival time in seconds, voltage values in volts of the photo
+            transistors and pressure values in mbar, one row per sample in
+            order: [Time Before90° Before180° After90° After180° Pressure]
+        """
+        now = time.monotonic()
+        while (len(self.__requests) > 0 and
+               now - self.__requests[0] > self.reply_timeout):
+            self.__requests.popleft()
+            self.__lost_replies += 1
+        window = min(self.__pipeline_depth,
+                     int(np.ceil(self.__latency/self.__request_interval)) + 1)
+        if (len(self.__requests) < window and
+                (len(self.__requests) == 0 or
+                 now - self.__requests[-1] >= self.__request_interval)):
+            outgoing_string = "1"
+            self.__arduino.write(outgoing_string.encode())
+            self.__requests.append(now)
+        if self.__arduino.in_waiting == 0:
+            # Wait for replies or the next request
+            time.sleep(1e-3)
+            return np.zeros((0, 6))
+        incoming = self.__arduino.read(self.__arduino.in_waiting)
+        arrival_time = time.monotonic()
+        values = self.__parseLines(incoming, 5)
+        for i in range(min(len(values), len(self.__requests))):
+            latency = arrival_time - self.__requests.popleft()
+            # Exponentially weighted mean of the latency
+            self.__latency += 0.2*(latency - self.__latency)
+        data = np.zeros((len(values), 6))
+        data[:, 0] = arrival_time
+        data[:, 1:6] = values
+        return data
+
+    def getLostReplies(self):
+        """Return the number of pipelined requests without reply.
+
+        Returns
+        -------
+        lost_replies : int
+            Number of pipelined requests without reply
+        """
+        lost_replies = self.__lost_replies
+        return lost_replies
+
+    def liveMeasurement(self, measurement_duration, plot=True,
+                        sample_rate=None, binary=False,
+                        pipeline_depth=None, record_file=None,
+                        auto_stop=False, tolerance=None):
+        """Live plot of measurement.
+
+        Starts a measurement and plots the measurement values live into a
+        figure. Without plot the measurement runs headless and never imports
+        matplotlib. Measurement can be interrupted by triggering a
+        KeyboardInterrupt. The samples are read by an acquisition thread into
+        a ring buffer, so the sample rate is set by the device and not by
+        the plot. Every sample is stamped with the monotonic host time of its
+        arrival, the measurement time is not assumed to be uniformly spaced.
+
+        Parameters
+        ----------
+        measurement_duration : int
+            Duration time of the measurement in seconds
+        plot : bool
+            Plot the measurement values live into a figure (default True)
+        sample_rate : int
+            Sample rate in Hz of the continuous stream. If None every sample
+            is requested by readData() (default None)
+        binary : bool
+            Stream binary frames instead of text lines, only used with a
+            sample rate (default False)
+        pipeline_depth : int
+            Maximum number of pipelined requests in flight, only used
+            without sample rate. If None every sample is requested after the
+            previous reply (default None)
+        record_file : str
+            File name of a recording the raw samples are appended to while
+            the measurement runs, see the Recorder module. Then only the
+            latest recording_window samples are kept in memory
+            (default None)
+        auto_stop : bool
+            Finish the measurement auto_stop_margin seconds after the flow
+            stop is detected, the measurement duration is the maximum
+            duration then (default False)
+        tolerance : list
+            Finish the measurement when the standard errors of the mean
+            turbidity before and after the mask and of the mean pressure are
+            below the tolerance, after at least calibration_minimum_samples
+            samples. The measurement duration is the maximum duration then.
+            If None the measurement runs for the measurement duration
+            (default None)
+
+        Returns
+        -------
+        sample_store : Sample_Store
+            Columnar store of the measurement time, the photo transistor
+            voltages, the relative pressure, the turbidity and the turbidity
+            ratio. It can be unpacked into transistor_voltage, turbidity,
+            turbidity_ratio, pressure and measurement_time. With a record
+            file it holds the latest recording_window samples only, all
+            samples are in the recording.
+        """
+        # The recording holds all samples, the memory keeps only the ones
+        # of the live plot
+        sample_store = sst.Sample_Store(
+            maximum_samples=None if record_file is None else
+            self.recording_window)
+        ring_buffer = acq.Ring_Buffer(self.ring_buffer_capacity, 6)
+        if sample_rate is None and pipeline_depth is None:
+            acquisition_thread = acq.Acquisition_Thread(self.readData,
+                                                        ring_buffer)
+        elif sample_rate is None:
+            acquisition_thread = acq.Acquisition_Thread(
+                self.readPipelinedData, ring_buffer)
+        elif binary:
+            acquisition_thread = acq.Acquisition_Thread(self.readFrameData,
+                                                        ring_buffer)
+        else:
+            acquisition_thread = acq.Acquisition_Thread(self.readStreamBlock,
+                                                        ring_buffer)
+        # The drift monitor shares the serial port, pause it while measuring
+        resume_drift_monitor = self.__drift_thread is not None
+        self.stopDriftMonitor()
         elapsed_time = 0
-        time.sleep(1)
+        self.__connect()
         print("Measurement started...")
+        # Start a new live plot, integrals and flow detection for every
+        # measurement
+        self.__live_plot = None
+        self.__running_integrator = rin.Running_Integrator(3)
+        self.__flow_detector = fdt.Flow_Detector(self.flow_hold_off)
+        self.__running_statistics = rst.Running_Statistics(3)
+        if sample_rate is not None and binary:
+            self.startBinaryStreaming(sample_rate)
+        elif sample_rate is not None:
+            self.startStreaming(sample_rate)
+        elif pipeline_depth is not None:
+            self.startPipeline(pipeline_depth)
+        t = time.monotonic()
+        recorder = None
+        if record_file is not None:
+            recorder = rec.Recorder(record_file, self.__calibration_value,
+                                    self.measurement_volume,
+                                    self.total_turbidity_ratio_idle,
+                                    time.time())
+        acquisition_thread.start()
         # Try until KeybordInterrup
         try:
             while elapsed_time < measurement_duration:
-                for i in range(10):
-                    data.append(self.readData())
-                    transistor_voltage.append(data[-1][0:4])
-                    # Use transistor_voltage[-1] to use only the latest voltage
-                    # value
-                    turbidity.append(self.calculateTurbidity(
-                        transistor_voltage[-1]))
-                    # Use turbidity[-1] to use only the latest turbidity value
-                    turbidity_ratio.append(self.calculateTurbidityRatio(
-                            turbidity[-1]))
-                    pressure.append(round(data[-1][-1] -
-                                          self.__calibration_value[-1], 1))
-                    elapsed_time = time.time() - t
-                    measurement_time = list(np.round_(
-                        np.linspace(0, elapsed_time, len(transistor_voltage)),
-                        1))
-                self.plotMeasurement(measurement_time, transistor_voltage,
-                                     turbidity, turbidity_ratio, pressure)
+                new_data = ring_buffer.get()
+                if acquisition_thread.getError() is not None:
+                    raise acquisition_thread.getError()
+                if np.size(new_data) == 0:
+                    # Wait for the acquisition thread, the measurement also
+                    # ends if the device stops sending
+                    time.sleep(1e-2)
+                    elapsed_time = time.monotonic() - t
+                    continue
+                if recorder is not None:
+                    recorder.append(new_data - [t, 0, 0, 0, 0, 0])
+                self.__appendSamples(sample_store, new_data, t)
+                elapsed_time = time.monotonic() - t
+                if auto_stop and self.__flow_detector.isStopped() and \
+                        new_data[-1, 0] - t >= \
+                        self.__flow_detector.getStopTime() + \
+                        self.auto_stop_margin:
+                    print("Flow stopped.")
+                    break
+                if tolerance is not None and \
+                        len(self.__running_statistics) >= \
+                        self.calibration_minimum_samples and \
+                        np.all(self.__running_statistics.getStandardError() <
+                               tolerance):
+                    print("Mean values converged.")
+                    break
+                # Plot at its own pace, the acquisition thread keeps sampling
+                if plot:
+                    self.plotMeasurement(*self.__plotArguments(sample_store))
+                    self.__showLiveEstimate()
         # Stop manually before end of measurement duration
         except KeyboardInterrupt:
             print("Measurement interrupted.")
         # Plot again to ensure the plot is shown in case of manual interruption
         finally:
-            for i in range(10):
-                data.append(self.readData())
-                transistor_voltage.append(data[-1][0:4])
-                # Use transistor_voltage[-1] to use only the latest voltage
-                # value
-                turbidity.append(self.calculateTurbidity(
-                    transistor_voltage[-1]))
-                # Use turbidity[-1] to use only the latest turbidity value
-                turbidity_ratio.append(self.calculateTurbidityRatio(
-                            turbidity[-1]))
-                pressure.append(round(data[-1][-1] -
-                                      self.__calibration_value[-1], 1))
-                elapsed_time = round(time.time() - t, 2)
-                measurement_time = list(np.round_(
-                    np.linspace(0, elapsed_time, len(transistor_voltage)), 1))
-            self.plotMeasurement(measurement_time, transistor_voltage,
-                                 turbidity, turbidity_ratio, pressure)
+            acquisition_thread.stop()
+            acquisition_thread.join()
+            if sample_rate is not None:
+                self.stopStreaming()
+                if self.__dropped_samples > 0:
+                    warnings.warn(str(self.__dropped_samples) +
+                                  " streamed samples were dropped.")
+                if binary and self.__corrupted_frames > 0:
+                    warnings.warn(str(self.__corrupted_frames) +
+                                  " corrupted frames were discarded.")
+            elif pipeline_depth is not None:
+                self.stopPipeline()
+                if self.__lost_replies > 0:
+                    warnings.warn(str(self.__lost_replies) +
+                                  " requested samples were not replied.")
+            new_data = ring_buffer.get()
+            # The final drain is empty if the last block was already taken
+            if np.size(new_data) > 0:
+                self.__appendSamples(sample_store, new_data, t)
+                if recorder is not None:
+                    recorder.append(new_data - [t, 0, 0, 0, 0, 0])
+            if recorder is not None:
+                recorder.close()
+            if ring_buffer.getOverrun() > 0:
+                warnings.warn(str(ring_buffer.getOverrun()) +
+                              " samples were lost.")
+            if plot:
+                self.plotMeasurement(*self.__plotArguments(sample_store))
+                self.__showLiveEstimate()
+                self.__live_plot.stop()
             print("Measurement finished.")
-        return (transistor_voltage, turbidity, turbidity_ratio, pressure,
-                measurement_time)
+            if resume_drift_monitor:
+                self.startDriftMonitor()
+        return sample_store
+
+    def __appendSamples(self, sample_store, data, start_time):
+        """Evaluate a block of raw samples and append it to the store.
+
+        Parameters
+        ----------
+        sample_store : Sample_Store
+            Store the samples are appended to
+        data : ndarray
+            Arrival time in seconds, voltage values in volts of the photo
+            transistors and pressure values in mbar, one row per sample in
+            order: [Time Before90° Before180° After90° After180° Pressure]
+        start_time : float
+            Monotonic time of the measurement start in seconds
+        """
+        turbidity = evl.calculateTurbidity(data[:, 1:5],
+                                           self.__calibration_value)
+        turbidity_ratio = evl.calculateTurbidityRatio(turbidity)
+        pressure = np.round(data[:, 5] - self.__calibration_value[-1], 1)
+        sample_store.append(data[:, 0] - start_time, data[:, 1:5], pressure,
+                            turbidity, turbidity_ratio)
+        self.__running_integrator.append(data[:, 0] - start_time,
+                                         np.column_stack([turbidity,
+                                                          pressure]))
+        self.__flow_detector.append(data[:, 0] - start_time, pressure)
+        self.__running_statistics.append(np.column_stack([turbidity,
+                                                          pressure]))
+
+    def getRunningIntegrals(self, start_ind=0, stop_ind=None):
+        """Return the running integrals of the turbidity and the pressure.
+
+        The integrals are updated with every block of samples of the live
+        measurement, so they are available at once without integrating the
+        whole measurement. They equal the results of integrateTurbidity()
+        and integratePressure() with the same array indices.
+
+        Parameters
+        ----------
+        start_ind : int
+            Array index of the first sample, for example the flow start
+            (default 0)
+        stop_ind : int
+            Array index after the last sample, for example the flow stop,
+            None for all samples (default None)
+
+        Returns
+        -------
+        total_turbidity : float
+            Integrated turbidity values over time in order: [Before After]
+        total_pressure : float
+            Negative relative pressure integrated over time in mbar s
+        """
+        total = self.__running_integrator.getTotal(start_ind, stop_ind)
+        total = np.round(total, 3)
+        total_turbidity = total[0:2].tolist()
+        total_pressure = float(total[2])*-1
+        return total_turbidity, total_pressure
+
+    def getLiveEstimate(self):
+        """Return the running estimate of penetration and breathing resistance.
+
+        The turbidity is integrated from the flow start detected online up
+        to now, once the flow stop is confirmed up to the flow stop. The
+        pressure is integrated over all samples. Then the estimate equals the
+        evaluation of the measurement script.
+
+        Returns
+        -------
+        penetration_percentage : float
+            Particle penetration percentage
+        breathing_resistance : float
+            Breathing resistance of the mask in mbar/l/min
+        """
+        start_ind, stop_ind = self.__flow_detector.getStartStop()
+        if not self.__flow_detector.isStopped():
+            stop_ind = None
+        total_turbidity = self.getRunningIntegrals(start_ind, stop_ind)[0]
+        total_pressure = self.getRunningIntegrals()[1]
+        total_turbidity_ratio = float(
+            evl.calculateTotalTurbidityRatio(total_turbidity))
+        penetration_percentage = \
+            self.evaluateMeasurement(total_turbidity_ratio)[1]
+        breathing_resistance = \
+            self.calculateBreathingResistance(total_pressure)[0]
+        return penetration_percentage, breathing_resistance
+
+    def getLiveFlowRate(self):
+        """Return flow rate, flow time, start and stop index detected online.
+
+        The values equal the ones of calculateFlowRate() on all samples of
+        the current measurement received so far.
+
+        Returns
+        -------
+        flow_rate : float
+            Flow rate in l/min, NaN if the flow time is not positive
+        flow_time : float
+            Duration of the flow in seconds
+        start_ind : int
+            Array index of flow start
+        stop_ind : int
+            Array index of flow stop
+        """
+        flow_rate, flow_time, start_ind, stop_ind = \
+            self.__flow_detector.getFlowRate(self.measurement_volume)
+        return flow_rate, flow_time, start_ind, stop_ind
+
+    def __showLiveEstimate(self):
+        """Show the live estimate in the live plot of a calibrated device."""
+        if self.__live_plot.getCalibrated():
+            penetration_percentage, breathing_resistance = \
+                self.getLiveEstimate()
+            self.__live_plot.setText(
+                "Penetration: " + str(penetration_percentage) + " %, " +
+                "breathing resistance: " + str(breathing_resistance) +
+                " mbar/l/min")
+
+    def saveData(self, file_name, sample_store, **metadata):
+        """Save a measurement as columnar .npz file.
+
+        The file has the layout of the Storage module and is read by its
+        loadMeasurement().
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the .npz file inclusive path
+        sample_store : Sample_Store
+            Samples of the measurement returned by liveMeasurement()
+        **metadata
+            Further values saved with the measurement, for example
+            total_turbidity, total_turbidity_ratio, filtered_percentage or
+            data_name
+        """
+        metadata.setdefault('calibration_value', self.__calibration_value)
+        metadata.setdefault('measurement_volume', self.measurement_volume)
+        metadata.setdefault('total_turbidity_ratio_idle',
+                            self.total_turbidity_ratio_idle)
+        metadata.setdefault('created', time.strftime("%Y-%m-%d %H:%M:%S"))
+        sto.saveMeasurement(file_name, sample_store.getMeasurementTime(),
+                            sample_store.getTransistorVoltage(),
+                            sample_store.getTurbidity(),
+                            sample_store.getTurbidityRatio(),
+                            sample_store.getPressure(), device='V2',
+                            **metadata)
+
+    def __plotArguments(self, sample_store):
+        """Return the arguments of plotMeasurement() from the store."""
+        return (sample_store.getMeasurementTime(),
+                sample_store.getTransistorVoltage(),
+                sample_store.getTurbidity(), sample_store.getTurbidityRatio(),
+                sample_store.getPressure())
 
     def plotMeasurement(self, measurement_time, transistor_voltage, turbidity,
                         turbidity_ratio, pressure):
         """Plot the measurement values.
 
+        The axes and lines of the live plot are created once and updated by
+        blitting afterwards, so a frame does not redraw the whole figure.
+
         Parameters
         ----------
         transistor_voltage : float
@@ -312,41 +1133,16 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         measurement_time : float
             Measurement time in seconds
         """
-        plt.ion()  # Enable plot live update
-        plt.clf()  # Clear old plot
-        plt.subplot(311)
-        plt.plot(measurement_time, pressure)
-        plt.grid(True)
-        if self.__calibration_value == [0.000, 0.000, 0.0]:
-            plt.title("Absolute pressure after mask")
-            plt.ylabel("Absolute pressure in mbar")
-        else:
-            plt.title("Relative pressure after mask")
-            plt.ylabel("Relative pressure in mbar")
-        plt.xlabel("Time in s")
-        plt.subplot(312)
-        plt.plot(measurement_time, transistor_voltage)
-        plt.grid(True)
-        plt.title("Photo transistor voltage")
-        plt.xlabel("Time in s")
-        plt.ylabel("Photo transistor voltage in V")
-        plt.legend(["Before 90°", "Before 180°", "After 90°", "After 180°"])
-        plt.subplot(313)
-        plt.plot(measurement_time, turbidity)
-        plt.plot(measurement_time, turbidity_ratio)
-        plt.grid(True)
-        if self.__calibration_value == [0.000, 0.000, 0.0]:
-            plt.title("Turbidity and turbidity ratio (before/after mask)")
-            plt.ylabel("Turbidity, turbidity ratio")
-        else:
-            plt.title("Corrected turbidity and turbidity ratio " +
-                      "(before/after mask)")
-            plt.ylabel("Corrected turbidity, turbidity ratio")
-        plt.xlabel("Time in s")
-        plt.legend(["Before", "After", "Ratio"])
-        plt.draw_all()
-        plt.pause(1e-3)  # Some time to draw figure
-        plt.tight_layout()
+        # Import matplotlib only if a plot is requested
+        import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Live_Plot \
+            as lpl
+        calibrated = self.__calibration_value != [0.000, 0.000, 0.0]
+        # Create the axes and lines only once and update them afterwards
+        if (self.__live_plot is None or not self.__live_plot.isOpen() or
+                self.__live_plot.getCalibrated() != calibrated):
+            self.__live_plot = lpl.Live_Plot(calibrated)
+        self.__live_plot.update(measurement_time, transistor_voltage,
+                                turbidity, turbidity_ratio, pressure)
 
     def markFlowStartStop(self, start_ind, stop_ind, measurement_time):
         """Mark start and stop of the flow in the live measurement.
@@ -364,6 +1160,7 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         -------
         None.
         """
+        import matplotlib.pyplot as plt
         # warnings.filterwarnings("ignore")
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
@@ -392,13 +1189,34 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
 
         # warnings.filterwarnings("default")
 
-    def calibrate(self, measurement_duration):
+    def calibrate(self, measurement_duration, plot=True, sample_rate=None,
+                  binary=False, pipeline_depth=None, tolerance=None):
         """Measure the trurbidity offset values.
 
+        The mean values are calculated while measuring and the calibration
+        finishes as soon as their standard errors are below the tolerance,
+        the measurement duration is the maximum duration.
+
         Parameters
         ----------
         measurement_duration : int
             Duration time of the measurement in seconds
+        plot : bool
+            Plot the measurement values live into a figure (default True)
+        sample_rate : int
+            Sample rate in Hz of the continuous stream. If None every sample
+            is requested by readData() (default None)
+        binary : bool
+            Stream binary frames instead of text lines, only used with a
+            sample rate (default False)
+        pipeline_depth : int
+            Maximum number of pipelined requests in flight, only used
+            without sample rate (default None)
+        tolerance : list
+            Standard errors of the mean turbidity before and after the mask
+            and of the mean pressure in mbar, below which the calibration
+            finishes. If None calibration_tolerance is used, with [0, 0, 0]
+            the calibration runs for the measurement duration (default None)
 
         Returns
         -------
@@ -406,74 +1224,312 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
             offset value of the turbidity before and after the mask
             (default [0,0])
         """
+        if tolerance is None:
+            tolerance = self.calibration_tolerance
         self.__calibration_value = [0.000, 0.000, 0.0]
-        (transistor_voltage, turbidity, turbidity_ratio, pressure,
-         measurement_time) = self.liveMeasurement(measurement_duration)
-        # Calculate the mean turbidity before the mask over calibration time
-        self.__calibration_value[0] = round(np.mean(
-                [i[0] for i in turbidity]), 3)
-        # Calculate the mean turbidity after the mask over calibration time
-        self.__calibration_value[1] = round(np.mean(
-                [i[1] for i in turbidity]), 3)
-        self.__calibration_value[2] = round(np.mean(pressure), 1)
+        self.liveMeasurement(measurement_duration, plot, sample_rate, binary,
+                             pipeline_depth, tolerance=tolerance)
+        # Mean turbidity before and after the mask and mean absolute pressure
+        # over the calibration time
+        mean = self.__running_statistics.getMean()
+        self.__calibration_value = [round(float(mean[0]), 3),
+                                    round(float(mean[1]), 3),
+                                    round(float(mean[2]), 1)]
+        self.__calibration_standard_error = \
+            self.__running_statistics.getStandardError().tolist()
+        self.__calibration_samples = len(self.__running_statistics)
         return self.__calibration_value
 
+    def getDeviceKey(self):
+        """Return the key of the device for the calibration cache.
+
+        Returns
+        -------
+        device_key : str
+            Serial number of the USB serial converter, which stays the same
+            on every port, or the serial port if it has no serial number
+        """
+        for port_info in list_ports.comports():
+            if port_info.device == self.__serial_port and \
+                    port_info.serial_number:
+                return port_info.serial_number
+        device_key = self.__serial_port
+        return device_key
+
+    def calibrateCached(self, cache, measurement_duration, plot=True,
+                        sample_rate=None, binary=False, pipeline_depth=None,
+                        drift_tolerance=None):
+        """Reuse a cached calibration if it did not drift.
+
+        If the cache holds a valid calibration of the device, a drift check
+        requests drift_check_samples samples and compares their mean with
+        the cached calibration value. The cached calibration is reused, if
+        they differ by less than the drift tolerance plus three standard
+        errors of the difference. These are estimated by the standard
+        deviation of the cached calibration, so the few samples of the
+        check do not detect a drift by their scatter alone. Otherwise, or
+        if the device does not reply, the device is calibrated again. New
+        calibrations are put into the cache.
+
+        Parameters
+        ----------
+        cache : Calibration_Cache
+            Cache of the calibration values
+        measurement_duration : int
+            Maximum duration time of a new calibration in seconds
+        plot : bool
+            Plot the measurement values live into a figure (default True)
+        sample_rate : int
+            Sample rate in Hz of the continuous stream. If None every sample
+            is requested by readData() (default None)
+        binary : bool
+            Stream binary frames instead of text lines, only used with a
+            sample rate (default False)
+        pipeline_depth : int
+            Maximum number of pipelined requests in flight, only used
+            without sample rate (default None)
+        drift_tolerance : list
+            Maximum drift of the calibration value, None for
+            calibration_drift_tolerance (default None)
+
+        Returns
+        -------
+        self.__calibration_value : float
+            offset value of the turbidity before and after the mask and the
+            absolute pressure value in mbar
+        """
+        if drift_tolerance is None:
+            drift_tolerance = self.calibration_drift_tolerance
+        device_key = self.getDeviceKey()
+        entry = cache.get(device_key)
+        if entry is not None:
+            drift_check_value = self.__checkDrift(self.drift_check_samples)
+            if drift_check_value is not None:
+                drift = np.abs(np.subtract(drift_check_value,
+                                           entry['calibration_value']))
+                # Standard deviation of the samples by the cached
+                # calibration, zero if it has no standard error
+                standard_deviation = np.nan_to_num(
+                    entry['standard_error'] *
+                    np.sqrt(entry['number_of_samples']))
+                scatter = 3 * standard_deviation * np.sqrt(
+                    1 / self.drift_check_samples +
+                    1 / max(int(entry['number_of_samples']), 1))
+                if np.all(drift <= np.add(drift_tolerance, scatter)):
+                    print("Cached calibration reused.")
+                    self.__calibration_value = \
+                        entry['calibration_value'].tolist()
+                    self.__calibration_standard_error = \
+                        entry['standard_error'].tolist()
+                    self.__calibration_samples = \
+                        int(entry['number_of_samples'])
+                    return self.__calibration_value
+                print("Calibration drifted by " + str(drift.tolist()) + ".")
+        self.calibrate(measurement_duration, plot, sample_rate, binary,
+                       pipeline_depth)
+        cache.put(device_key, self.__calibration_value,
+                  *self.getCalibrationConfidence())
+        return self.__calibration_value
+
+    def __checkDrift(self, number_of_samples):
+        """Request a few samples and return their mean offset values.
+
+        The drift monitor shares the serial port, so it is paused meanwhile.
+
+        Parameters
+        ----------
+        number_of_samples : int
+            Number of requested samples
+
+        Returns
+        -------
+        drift_check_value : ndarray
+            Mean uncorrected turbidity before and after the mask and mean
+            absolute pressure in mbar, None if the device did not reply
+        """
+        resume_drift_monitor = self.__drift_thread is not None
+        self.stopDriftMonitor()
+        try:
+            # A request without reply returns an empty list after
+            # reply_timeout, so the check ends also with a silent device
+            data = [self.readData() for i in range(number_of_samples)]
+        finally:
+            if resume_drift_monitor:
+                self.startDriftMonitor()
+        data = np.array([sample for sample in data if len(sample) == 5])
+        if len(data) == 0:
+            return None
+        turbidity = evl.calculateTurbidity(data[:, 0:4], [0.000, 0.000])
+        drift_check_value = np.mean(np.column_stack([turbidity, data[:, 4]]),
+                                    axis=0)
+        return drift_check_value
+
+    def startDriftMonitor(self, reset=False):
+        """Start the background monitor of the baseline drift.
+
+        Between the measurements an acquisition thread requests a sample every
+        drift_sample_interval seconds. The uncorrected turbidity before and
+        after the mask and the absolute pressure of the samples update
+        exponentially weighted baselines with the time constant
+        drift_time_constant. So the drift of the photo transistors and of the
+        pressure sensor is known before the next calibration, see
+        isCalibrationDue(). A measurement pauses the monitor and resumes it
+        afterwards.
+
+        Parameters
+        ----------
+        reset : bool
+            Start new baselines instead of continuing the former ones
+            (default False)
+        """
+        if self.__drift_thread is not None:
+            return
+        if reset:
+            self.__drift_tracker = dtr.Drift_Tracker(3,
+                                                     self.drift_time_constant)
+        self.__connect()
+        self.__drift_stop_event.clear()
+        self.__drift_thread = acq.Acquisition_Thread(self.__readIdleSample,
+                                                     self.__drift_ring_buffer)
+        self.__drift_thread.start()
+
+    def stopDriftMonitor(self):
+        """Stop the background monitor of the baseline drift."""
+        if self.__drift_thread is None:
+            return
+        self.__drift_stop_event.set()
+        self.__drift_thread.stop()
+        self.__drift_thread.join()
+        self.__updateDrift()
+        error = self.__drift_thread.getError()
+        self.__drift_thread = None
+        if error is not None:
+            raise error
+
+    def __readIdleSample(self):
+        """Wait for the sample interval of the drift monitor and read data.
+
+        Returns
+        -------
+        transistor_voltage : float
+            Voltage values in volts of the photo transistors and pressure
+            values in mbar in order:
+            [Before90° Before180° After90° After180° Pressure]
+        """
+        self.__drift_stop_event.wait(self.drift_sample_interval)
+        transistor_voltage = self.readData()
+        return transistor_voltage
+
+    def __updateDrift(self):
+        """Update the baselines by the new samples of the drift monitor."""
+        data = self.__drift_ring_buffer.get()
+        if np.size(data) == 0:
+            return
+        turbidity = evl.calculateTurbidity(data[:, 1:5], [0.000, 0.000])
+        self.__drift_tracker.append(data[:, 0],
+                                    np.column_stack([turbidity, data[:, 5]]))
+
+    def getDriftBaseline(self):
+        """Return the baselines of the drift monitor.
+
+        Returns
+        -------
+        baseline : ndarray
+            Exponentially weighted baselines of the uncorrected turbidity
+            before and after the mask and of the absolute pressure in mbar,
+            NaN without samples
+        """
+        self.__updateDrift()
+        baseline = self.__drift_tracker.getBaseline()
+        return baseline
+
+    def getDrift(self):
+        """Return the drift of the baselines from the calibration value.
+
+        Returns
+        -------
+        drift : ndarray
+            Baselines minus calibration value of the turbidity before and
+            after the mask and of the absolute pressure in mbar, NaN without
+            samples
+        """
+        self.__updateDrift()
+        drift = self.__drift_tracker.getDrift(self.__calibration_value)
+        return drift
+
+    def isCalibrationDue(self, drift_tolerance=None):
+        """Return True if the baselines drifted beyond the tolerance.
+
+        Parameters
+        ----------
+        drift_tolerance : list
+            Maximum drift of the calibration value, None for
+            calibration_drift_tolerance (default None)
+
+        Returns
+        -------
+        due : bool
+            True if any baseline drifted beyond the tolerance from the
+            calibration value, False without samples
+        """
+        if drift_tolerance is None:
+            drift_tolerance = self.calibration_drift_tolerance
+        with np.errstate(invalid='ignore'):
+            due = bool(np.any(np.abs(self.getDrift()) > drift_tolerance))
+        return due
+
     def calculateTurbidity(self, transistor_voltage):
         """Calculate the turbidity values before and after the mask.
 
+        Negative turbidity values are set to zero for both channels. The
+        voltages of a whole recording can be passed at once.
+
         Parameters
         ----------
         transistor_voltage : float
             Voltage values in volts of the photo transistors in order:
-            [Before90° Before180° After90° After180°]
+            [Before90° Before180° After90° After180°], or an array with one
+            row per sample
 
         Returns
         -------
         turbidity : float
             Turbidity value (90°signal/180°signal) before and after the mask in
-            order: [Before After]
+            order: [Before After], or an array with one row per sample
         """
-        turbidity = [0.000, 0.000]
-        # Correct the turbidity value before the mask by the calibration offset
-        turbidity[0] = round(transistor_voltage[0]/transistor_voltage[1] -
-                             self.__calibration_value[0], 3)
-        # Correct the turbidity value after the mask by the calibration offset
-        turbidity[1] = round(transistor_voltage[2]/transistor_voltage[3] -
-                             self.__calibration_value[1], 3)
-        if turbidity[0] < 0:
-            turbidity[0] = 0.000
-        elif turbidity[1] < 0:
-            turbidity[1] = 0.000
+        turbidity = evl.calculateTurbidity(transistor_voltage,
+                                           self.__calibration_value)
+        if np.ndim(turbidity) == 1:
+            turbidity = turbidity.tolist()
         return turbidity
 
     def calculateTurbidityRatio(self, turbidity):
         """Calculate the turbidity ratio before and after the mask.
 
+        The turbidity values of a whole recording can be passed at once.
+
         Parameters
         ----------
         turbidity : float
             Turbidity value (90°signal/180°signal) before and after the mask in
-            order: [Before After]
+            order: [Before After], or an array with one row per sample
 
         Returns
         -------
         turbidity_ratio : float
-            Ratio between the turbidity before and after the mask
+            Ratio between the turbidity before and after the mask, or an array
+            with one value per sample
         """
-        # If the two turbidity values are samller than epsilon, which means
-        # both turbiditys are nearly equal set the turbidity ratio to 1 to
-        # avoid devide by zero and excessive fluctuations of the ratio
-        epsilon = 5e-3
-        if turbidity[0] < epsilon and turbidity[1] < epsilon:
-            turbidity_ratio = 1.000
-        else:
-            turbidity_ratio = round(turbidity[1]/turbidity[0], 3)
+        turbidity_ratio = evl.calculateTurbidityRatio(turbidity)
+        if np.ndim(turbidity_ratio) == 0:
+            turbidity_ratio = float(turbidity_ratio)
         return turbidity_ratio
 
     def integrateTurbidity(self, turbidity, measurement_time, *args):
         """Integrate turbidity values before and after the sample over time.
 
-        Integration is done by using the trapezoidal rule.
+        Integration is done by using the trapezoidal rule on the time stamps
+        of the samples, which are not necessarily uniformly spaced.
 
         Parameters
         ----------
@@ -488,19 +1544,8 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         total_turbidity : float
             Integrated turbidity values over time
         """
-        total_turbidity = [0.000, 0.000]
-        if np.size(args) == 0:
-            start_ind = 0
-            stop_ind = np.size(measurement_time)
-        elif np.size(args) != 0:
-            start_ind = args[0]
-            stop_ind = args[1]
-        total_turbidity[0] = round(
-            np.trapz([i[0] for i in turbidity[start_ind:stop_ind]],
-                     measurement_time[start_ind:stop_ind]), 3)
-        total_turbidity[1] = round(
-            np.trapz([i[1] for i in turbidity[start_ind:stop_ind]],
-                     measurement_time[start_ind:stop_ind]), 3)
+        total_turbidity = evl.integrateTurbidity(turbidity, measurement_time,
+                                                 *args[:2]).tolist()
         return total_turbidity
 
     def calculateTotalTurbidityRatio(self, total_turbidity):
@@ -517,7 +1562,10 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
             Ratio of the total, integrated trubidity values before and after
             the sample
         """
-        total_turbidity_ratio = round(total_turbidity[1]/total_turbidity[0], 3)
+        total_turbidity_ratio = \
+            evl.calculateTotalTurbidityRatio(total_turbidity)
+        if np.ndim(total_turbidity_ratio) == 0:
+            total_turbidity_ratio = float(total_turbidity_ratio)
         return total_turbidity_ratio
 
     def evaluateMeasurement(self, total_turbidity_ratio):
@@ -527,7 +1575,7 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         ----------
         total_turbidity_ratio : float
             Ratio of the total, integrated trubidity values before and after
-            the sample
+            the sample, or an array with one value per measurement
 
         Returns
         -------
@@ -536,16 +1584,20 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         penetration_percentage : float
             Particle penetration percentage
         """
-        filtered_percentage = round(
-            (1.000-total_turbidity_ratio/self.total_turbidity_ratio_idle)*100,
-            1)
-        penetration_percentage = round(
-                total_turbidity_ratio/self.total_turbidity_ratio_idle*100, 1)
+        filtered_percentage, penetration_percentage = \
+            evl.evaluateMeasurement(total_turbidity_ratio,
+                                    self.total_turbidity_ratio_idle)
+        if np.ndim(filtered_percentage) == 0:
+            filtered_percentage = float(filtered_percentage)
+            penetration_percentage = float(penetration_percentage)
         return filtered_percentage, penetration_percentage
 
     def integratePressure(self, pressure, measurement_time, *args):
         """Integrate the relative pressure time.
 
+        Integration is done by using the trapezoidal rule on the time stamps
+        of the samples.
+
         Parameters
         ----------
         pressure : float
@@ -558,16 +1610,8 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         total_pressure : float
             Relative pressure integrated over time in mbar s
         """
-        total_pressure = 0.000
-        if np.size(args) == 0:
-            start_ind = 0
-            stop_ind = np.size(measurement_time)
-        elif np.size(args) != 0:
-            start_ind = args[0]
-            stop_ind = args[1]
-        total_pressure = round(np.trapz(pressure[start_ind:stop_ind],
-                                        measurement_time[start_ind:stop_ind]),
-                               3)*-1
+        total_pressure = evl.integratePressure(pressure, measurement_time,
+                                               *args[:2])
         return total_pressure
 
     def calculateBreathingResistance(self, total_pressure):
@@ -586,10 +1630,9 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
             Aquivalent breathing resistance in mbar @ 30 l/min as it is
             specified in EN149
         """
-        breathing_resistance = round(
-            (total_pressure/60)/self.measurement_volume, 3)
-        # Equivalent br. res. with smoke
-        equivalent_breathing_resistance = round(breathing_resistance/6 - 1, 3)
+        breathing_resistance, equivalent_breathing_resistance = \
+            evl.calculateBreathingResistance(total_pressure,
+                                             self.measurement_volume)
         return breathing_resistance, equivalent_breathing_resistance
 
     def calculateFlowRate(self, pressure, measurement_time):
@@ -605,7 +1648,7 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         Returns
         -------
         flow_rate : float
-            Flow rate in l/min
+            Flow rate in l/min, NaN if the flow time is not positive
         flow_time : float
             Duration of the flow in seconds
         start_ind : int
@@ -613,22 +1656,7 @@ class Aerosol_Penetrometer_Light_Scattering_Detector_V2:
         stop_ind : int
             Array index of flow stop
         """
-        pressure_derivation = np.diff(pressure)
-        # Typical pressure derivation due to noise
-        pressure_noise_derivation = 0.1
-        ind = np.where(abs(pressure_derivation) > pressure_noise_derivation)
-        if np.size(ind[0]) == 0:
-            flow_rate = 0.000
-            flow_time = 0.000
-            start_ind = 0
-            stop_ind = np.size(measurement_time)
-            return flow_rate, flow_time, start_ind, stop_ind
-        start_ind = ind[0][0]
-        # start_ind_t = np.where(pressure_derivation ==
-        #   min(pressure_derivation))
-        # start_ind = start_ind_t[0][0]
-        stop_ind_t = np.where(pressure_derivation == max(pressure_derivation))
-        stop_ind = stop_ind_t[0][0] + 1
-        flow_time = measurement_time[stop_ind] - measurement_time[start_ind]
-        flow_rate = round(self.measurement_volume/flow_time*60, 3)
-        return flow_rate, round(flow_time, 2), start_ind, stop_ind
+        flow_rate, flow_time, start_ind, stop_ind = \
+            evl.calculateFlowRate(pressure, measurement_time,
+                                  self.measurement_volume)
+        return flow_rate, flow_time, start_ind, stop_ind
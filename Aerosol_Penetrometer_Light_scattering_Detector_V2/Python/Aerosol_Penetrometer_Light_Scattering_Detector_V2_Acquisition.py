@@ -0,0 +1,275 @@
+"""Acquisition of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+The acquisition thread reads the samples from the arduino, stamps them with
+the monotonic host time of their arrival and writes them into a preallocated
+ring buffer. The measurement loop takes the new samples out of the ring buffer
+at its own pace, so plotting does not stall the sampling.
+"""
+import numpy as np
+import threading
+import time
+
+
+class Ring_Buffer:
+    """
+    A preallocated single producer single consumer ring buffer.
+
+    The buffer is lock-free: the producer writes the sample before it
+    increments the write counter and the consumer only reads samples below the
+    write counter. Samples overwritten before they were read are counted as
+    overrun.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __buffer : ndarray
+        Preallocated buffer with one row per sample
+    __capacity : int
+        Number of samples fitting into the buffer
+    __write_count : int
+        Total number of samples written by the producer
+    __read_count : int
+        Total number of samples read by the consumer
+    __overrun : int
+        Number of samples overwritten before they were read
+    __block_size : int
+        Largest number of samples written at once, all of them may be in
+        flight while the consumer copies
+
+    Methods
+    -------
+    put(sample)
+        Writes a sample into the buffer
+    putBlock(samples)
+        Writes a block of samples into the buffer
+    get()
+        Returns all samples written since the last call
+    getSnapshot(number_of_samples)
+        Returns the latest samples without consuming them
+    getOverrun()
+        Returns the number of samples overwritten before they were read
+    """
+
+    def __init__(self, capacity, width, dtype=np.float64):
+        """Init function.
+
+        Parameters
+        ----------
+        capacity : int
+            Number of samples fitting into the buffer
+        width : int
+            Number of values per sample
+        dtype : data-type
+            Data type of the values (default np.float64)
+        """
+        self.__buffer = np.zeros((capacity, width), dtype)
+        self.__capacity = capacity
+        self.__write_count = 0
+        self.__read_count = 0
+        self.__overrun = 0
+        self.__block_size = 1
+
+    def put(self, sample):
+        """Write a sample into the buffer.
+
+        Parameters
+        ----------
+        sample : float
+            Values of the sample
+        """
+        self.__buffer[self.__write_count % self.__capacity] = sample
+        # Publish the sample only after it is completely written
+        self.__write_count += 1
+
+    def putBlock(self, samples):
+        """Write a block of samples into the buffer.
+
+        Parameters
+        ----------
+        samples : ndarray
+            Values of the samples with one row per sample
+        """
+        number_of_samples = len(samples)
+        if number_of_samples == 0:
+            return
+        if number_of_samples > self.__capacity:
+            # Only the latest samples fit into the buffer
+            self.__overrun += number_of_samples - self.__capacity
+            self.__write_count += number_of_samples - self.__capacity
+            samples = samples[-self.__capacity:]
+            number_of_samples = self.__capacity
+        self.__block_size = max(self.__block_size, number_of_samples)
+        start = self.__write_count % self.__capacity
+        stop = start + number_of_samples
+        if stop <= self.__capacity:
+            self.__buffer[start:stop] = samples
+        else:
+            split = self.__capacity - start
+            self.__buffer[start:] = samples[:split]
+            self.__buffer[:stop - self.__capacity] = samples[split:]
+        # Publish the samples only after they are completely written
+        self.__write_count += number_of_samples
+
+    def get(self):
+        """Return all samples written since the last call.
+
+        Returns
+        -------
+        samples : ndarray
+            Copy of the new samples with one row per sample
+        """
+        write_count = self.__write_count
+        # The slots of the next block may be overwritten at the moment
+        block_size = self.__block_size
+        read_count = max(self.__read_count,
+                         write_count + block_size - self.__capacity)
+        start = read_count % self.__capacity
+        stop = start + write_count - read_count
+        if stop <= self.__capacity:
+            samples = self.__buffer[start:stop].copy()
+        else:
+            samples = np.concatenate(
+                (self.__buffer[start:],
+                 self.__buffer[:stop - self.__capacity]))
+        # Drop the samples the producer overwrote while they were copied
+        lost = min(self.__write_count + block_size - self.__capacity -
+                   read_count,
+                   write_count - read_count)
+        if lost > 0:
+            samples = samples[lost:]
+            read_count += lost
+        self.__overrun += read_count - self.__read_count
+        self.__read_count = write_count
+        return samples
+
+    def getSnapshot(self, number_of_samples):
+        """Return the latest samples without consuming them.
+
+        Parameters
+        ----------
+        number_of_samples : int
+            Maximum number of samples
+
+        Returns
+        -------
+        samples : ndarray
+            Copy of the latest samples with one row per sample
+        """
+        write_count = self.__write_count
+        number_of_samples = min(number_of_samples, write_count,
+                                self.__capacity)
+        ind = np.arange(write_count - number_of_samples, write_count) % \
+            self.__capacity
+        samples = self.__buffer[ind]
+        return samples
+
+    def getOverrun(self):
+        """Return the number of samples overwritten before they were read.
+
+        Returns
+        -------
+        overrun : int
+            Number of lost samples
+        """
+        overrun = self.__overrun
+        return overrun
+
+
+class Acquisition_Thread(threading.Thread):
+    """
+    A thread continuously reading time stamped samples into a ring buffer.
+
+    Every sample is written as one row [time, values...], where time is the
+    monotonic host time in seconds when the sample arrived. If the read
+    function returns a 2-D array instead of one sample, the array is taken as
+    a block of samples already time stamped by the read function. An empty
+    sample, a request without reply, is skipped.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __read_function : callable
+        Function returning one sample, for example readData(), or a block
+        of time stamped samples, for example readFrameData()
+    __ring_buffer : Ring_Buffer
+        Ring buffer the samples are written into
+    __stop_event : threading.Event
+        Set to stop the acquisition
+    __error : Exception
+        Exception raised by the read function, None if no error occurred
+
+    Methods
+    -------
+    run()
+        Reads samples until the thread is stopped
+    stop()
+        Stops the acquisition after the current sample
+    getError()
+        Returns the exception raised by the read function
+    """
+
+    def __init__(self, read_function, ring_buffer):
+        """Init function.
+
+        Parameters
+        ----------
+        read_function : callable
+            Function returning one sample, for example readData(), or a
+            block of time stamped samples, for example readFrameData()
+        ring_buffer : Ring_Buffer
+            Ring buffer the samples are written into
+        """
+        threading.Thread.__init__(self, daemon=True)
+        self.__read_function = read_function
+        self.__ring_buffer = ring_buffer
+        self.__stop_event = threading.Event()
+        self.__error = None
+
+    def run(self):
+        """Read samples until the thread is stopped."""
+        try:
+            while not self.__stop_event.is_set():
+                sample = self.__read_function()
+                if isinstance(sample, np.ndarray) and sample.ndim == 2:
+                    self.__ring_buffer.putBlock(sample)
+                elif len(sample) > 0:
+                    self.__ring_buffer.put([time.monotonic()] + list(sample))
+        except Exception as error:
+            self.__error = error
+
+    def stop(self):
+        """Stop the acquisition after the current sample."""
+        self.__stop_event.set()
+
+    def getError(self):
+        """Return the exception raised by the read function.
+
+        Returns
+        -------
+        error : Exception
+            Exception raised by the read function, None if no error occurred
+        """
+        error = self.__error
+        return error
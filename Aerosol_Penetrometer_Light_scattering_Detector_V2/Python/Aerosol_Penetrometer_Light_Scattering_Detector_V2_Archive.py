@@ -0,0 +1,389 @@
+"""Archive of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+An archive is a directory holding an index of all runs and one payload file
+per run:
+
+    index.npy : Structured array with one row per run, see index_dtype
+    runs/<run_id>.npy : Samples of the run as float64 array with one row per
+        sample, the columns are given by payload_columns
+
+The index is small and loaded completely, so filtering and aggregating
+thousands of runs works on NumPy arrays in milliseconds. The payloads are
+only opened on request by memory-mapping. Measurements of the V1 have no
+pressure, their pressure column is NaN.
+"""
+import numpy as np
+import os
+import time
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Storage as sto
+
+index_dtype = np.dtype([('run_id', '<i8'), ('sample_name', 'U64'),
+                        ('mask_type', 'U32'), ('lot', 'U32'),
+                        ('device', 'U4'), ('timestamp', '<f8'),
+                        ('penetration', '<f8'),
+                        ('breathing_resistance', '<f8'),
+                        ('number_of_samples', '<i8')])
+payload_columns = ['measurement_time', 'before_90', 'before_180',
+                   'after_90', 'after_180', 'turbidity_before',
+                   'turbidity_after', 'turbidity_ratio', 'pressure']
+
+
+def parseTimestamp(text):
+    """Convert a creation date like '2026-10-17 12:00:00' into a timestamp.
+
+    Parameters
+    ----------
+    text : str
+        Date as written by saveData() of the V1 ('%Y-%m-%d') or of the V2
+        ('%Y-%m-%d %H:%M:%S')
+
+    Returns
+    -------
+    timestamp : float
+        Local time in seconds since the epoch, NaN if the date is unknown
+    """
+    for date_format in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+        try:
+            return time.mktime(time.strptime(str(text).strip(), date_format))
+        except ValueError:
+            continue
+    return np.nan
+
+
+class Archive:
+    """
+    An indexed archive of measurement runs.
+
+    Every run is described by one row of the index: sample name, mask type,
+    lot, device, timestamp, penetration and breathing resistance. query() and
+    aggregate() only use the index, getSamples() memory-maps the samples of
+    a single run. The index is rewritten atomically after every change, so
+    an interrupted import never leaves a broken archive.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __directory : str
+        Directory of the archive
+    __index : ndarray
+        Index of the runs with dtype index_dtype
+
+    Methods
+    -------
+    addMeasurement(measurement, sample_name, mask_type, lot, timestamp,
+                   penetration, breathing_resistance)
+        Adds a measurement given as dict of arrays
+    addFile(file_name, **metadata)
+        Adds a measurement saved as .npz file or as .csv file of the V1
+    addCsvDirectories(directory, **metadata)
+        Adds all measurements saved as .csv files by the V1
+    removeRun(run_id)
+        Removes a run
+    getIndex()
+        Returns the index of all runs
+    query(**conditions)
+        Returns the index rows of the runs matching all conditions
+    aggregate(field, by, **conditions)
+        Returns count, mean and standard deviation of a field per group
+    getSamples(run_id)
+        Returns the memory-mapped samples of a run
+    getPayloadFile(run_id)
+        Returns the file name of the payload of a run
+    """
+
+    def __init__(self, directory):
+        """Init function, opens or creates the archive.
+
+        Parameters
+        ----------
+        directory : str
+            Directory of the archive, created if it does not exist
+        """
+        self.__directory = directory
+        os.makedirs(os.path.join(directory, "runs"), exist_ok=True)
+        index_file = os.path.join(directory, "index.npy")
+        if os.path.exists(index_file):
+            self.__index = np.load(index_file, allow_pickle=False)
+        else:
+            self.__index = np.zeros(0, index_dtype)
+
+    def __len__(self):
+        """Return the number of runs."""
+        return len(self.__index)
+
+    def getPayloadFile(self, run_id):
+        """Return the file name of the payload of a run.
+
+        Parameters
+        ----------
+        run_id : int
+            Id of the run
+
+        Returns
+        -------
+        payload_file : str
+            Name of the .npy file holding the samples of the run
+        """
+        payload_file = os.path.join(self.__directory, "runs",
+                                    "%08d.npy" % run_id)
+        return payload_file
+
+    def __saveIndex(self):
+        """Write the index to a temporary file and replace the old one."""
+        index_file = os.path.join(self.__directory, "index.npy")
+        temporary_file = index_file + ".tmp"
+        with open(temporary_file, 'wb') as file:
+            np.save(file, self.__index)
+        os.replace(temporary_file, index_file)
+
+    def __writeRun(self, run_id, measurement, sample_name=None,
+                   mask_type="", lot="", timestamp=None, penetration=None,
+                   breathing_resistance=None):
+        """Write the payload of a run and return its index row."""
+        if sample_name is None:
+            sample_name = measurement.get('data_name', "")
+        if timestamp is None:
+            timestamp = parseTimestamp(measurement.get('created', ""))
+        if penetration is None:
+            penetration = 100 - np.float64(
+                measurement.get('filtered_percentage', np.nan))
+        if breathing_resistance is None:
+            breathing_resistance = measurement.get('breathing_resistance',
+                                                   np.nan)
+        measurement_time = np.asarray(measurement['measurement_time'],
+                                      np.float64)
+        payload = np.full((len(measurement_time), len(payload_columns)),
+                          np.nan)
+        payload[:, 0] = measurement_time
+        payload[:, 1:5] = measurement['transistor_voltage']
+        payload[:, 5:7] = measurement['turbidity']
+        payload[:, 7] = measurement['turbidity_ratio']
+        if 'pressure' in measurement:
+            payload[:, 8] = measurement['pressure']
+        # The payload is written before the index, so every index row has its
+        # samples
+        np.save(self.getPayloadFile(run_id), payload)
+        row = np.zeros(1, index_dtype)
+        row[0] = (run_id, sample_name, mask_type, lot,
+                  measurement.get('device', ""), timestamp, penetration,
+                  breathing_resistance, len(payload))
+        return row
+
+    def __nextRunId(self):
+        """Return the id of the next run."""
+        return int(self.__index['run_id'].max()) + 1 \
+            if len(self.__index) > 0 else 0
+
+    def addMeasurement(self, measurement, sample_name=None, mask_type="",
+                       lot="", timestamp=None, penetration=None,
+                       breathing_resistance=None):
+        """Add a measurement given as dict of arrays.
+
+        Parameters
+        ----------
+        measurement : dict
+            Arrays of the measurement by name like loadMeasurement() of the
+            Storage module returns them
+        sample_name : str
+            Name of the sample. If None the data_name of the measurement is
+            used (default None)
+        mask_type : str
+            Type of the mask, for example 'KN95' (default '')
+        lot : str
+            Lot of the mask (default '')
+        timestamp : float
+            Time of the measurement in seconds since the epoch. If None the
+            creation date of the measurement is used (default None)
+        penetration : float
+            Particle penetration percentage. If None it is taken from the
+            filtered percentage of the measurement (default None)
+        breathing_resistance : float
+            Breathing resistance of the mask in mbar/l/min. If None it is
+            taken from the measurement if saved (default None)
+
+        Returns
+        -------
+        run_id : int
+            Id of the new run
+        """
+        run_id = self.__nextRunId()
+        row = self.__writeRun(run_id, measurement, sample_name, mask_type,
+                              lot, timestamp, penetration,
+                              breathing_resistance)
+        self.__index = np.concatenate([self.__index, row])
+        self.__saveIndex()
+        return run_id
+
+    def addFile(self, file_name, **metadata):
+        """Add a measurement saved as .npz file or as .csv file of the V1.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the .npz or .csv file inclusive path
+        **metadata
+            Arguments of addMeasurement(), for example mask_type or lot
+
+        Returns
+        -------
+        run_id : int
+            Id of the new run
+        """
+        if file_name.endswith(".csv"):
+            measurement = sto.readCsvMeasurement(file_name)
+        else:
+            measurement = sto.loadMeasurement(file_name)
+        return self.addMeasurement(measurement, **metadata)
+
+    def addCsvDirectories(self, directory="Messungen", **metadata):
+        """Add all measurements saved as .csv files by the V1.
+
+        Parameters
+        ----------
+        directory : str
+            Directory with one subdirectory per measurement like the directory
+            'Messungen' of the V1 (default 'Messungen')
+        **metadata
+            Arguments of addMeasurement() used for every measurement
+
+        Returns
+        -------
+        run_ids : list
+            Ids of the new runs
+        """
+        run_id = self.__nextRunId()
+        rows = []
+        for file_name in sorted(os.listdir(directory)):
+            csv_file = os.path.join(directory, file_name, file_name + ".csv")
+            if os.path.exists(csv_file):
+                rows.append(self.__writeRun(
+                    run_id + len(rows), sto.readCsvMeasurement(csv_file),
+                    **metadata))
+        # The index is written once for all measurements
+        self.__index = np.concatenate([self.__index] + rows)
+        self.__saveIndex()
+        run_ids = list(range(run_id, run_id + len(rows)))
+        return run_ids
+
+    def removeRun(self, run_id):
+        """Remove a run.
+
+        Parameters
+        ----------
+        run_id : int
+            Id of the run
+        """
+        self.__index = self.__index[self.__index['run_id'] != run_id]
+        self.__saveIndex()
+        if os.path.exists(self.getPayloadFile(run_id)):
+            os.remove(self.getPayloadFile(run_id))
+
+    def getIndex(self):
+        """Return the index of all runs.
+
+        Returns
+        -------
+        index : ndarray
+            Structured array with one row per run, see index_dtype
+        """
+        index = self.__index.copy()
+        return index
+
+    def __select(self, conditions):
+        """Return the boolean mask of the runs matching all conditions."""
+        selected = np.ones(len(self.__index), bool)
+        for field, condition in conditions.items():
+            column = self.__index[field]
+            if isinstance(condition, tuple):
+                # Range of values, None is an open end
+                low, high = condition
+                if low is not None:
+                    selected &= column >= low
+                if high is not None:
+                    selected &= column <= high
+            elif isinstance(condition, (list, set, np.ndarray)):
+                selected &= np.isin(column, list(condition))
+            else:
+                selected &= column == condition
+        return selected
+
+    def query(self, **conditions):
+        """Return the index rows of the runs matching all conditions.
+
+        Parameters
+        ----------
+        **conditions
+            One condition per field of the index. A tuple (low, high) selects
+            a range including the limits, where None is an open end, a list
+            selects any of its values and every other value must match
+            exactly, for example:
+            query(mask_type='KN95', timestamp=(start, None), lot=['1', '2'])
+
+        Returns
+        -------
+        runs : ndarray
+            Index rows of the matching runs
+        """
+        runs = self.__index[self.__select(conditions)]
+        return runs
+
+    def aggregate(self, field, by, **conditions):
+        """Return count, mean and standard deviation of a field per group.
+
+        Runs with NaN in the field are left out.
+
+        Parameters
+        ----------
+        field : str
+            Numeric field of the index, for example 'penetration'
+        by : str
+            Field of the index to group by, for example 'mask_type'
+        **conditions
+            Conditions selecting the runs like query()
+
+        Returns
+        -------
+        groups : dict
+            Tuple (count, mean, std) by value of the group field, the
+            standard deviation is the sample standard deviation
+        """
+        runs = self.__index[self.__select(conditions)]
+        runs = runs[~np.isnan(runs[field])]
+        keys, group, count = np.unique(runs[by], return_inverse=True,
+                                       return_counts=True)
+        values = runs[field]
+        mean = np.bincount(group, values, len(keys))/count
+        squares = np.bincount(group, (values - mean[group])**2, len(keys))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(squares/(count - 1))
+        groups = {key.item(): (int(count[i]), float(mean[i]), float(std[i]))
+                  for i, key in enumerate(keys)}
+        return groups
+
+    def getSamples(self, run_id):
+        """Return the memory-mapped samples of a run.
+
+        Parameters
+        ----------
+        run_id : int
+            Id of the run
+
+        Returns
+        -------
+        samples : ndarray
+            Read-only memory-mapped samples with one row per sample, the
+            columns are given by payload_columns
+        """
+        samples = np.load(self.getPayloadFile(run_id), mmap_mode='r')
+        return samples
@@ -0,0 +1,493 @@
+"""Asyncio driver of the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
+import asyncio
+import numpy as np
+import serial
+import time
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2 as pen
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Evaluation as evl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Frames as frm
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Port_Pool as ppl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Running_Statistics \
+    as rst
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Sample_Store as sst
+
+
+class Aerosol_Penetrometer_Light_Scattering_Detector_V2_Async:
+    """
+    An asyncio driver for the V2 light scattering detector.
+
+    The serial port is opened non-blocking and watched by the event loop, so
+    waiting for samples never blocks the loop and one event loop can drive
+    several devices and other I/O concurrently. The driver needs a POSIX
+    system (Linux, macOS), where the event loop can watch the serial port.
+    The returned Sample_Store is the same as of the synchronous class, so it
+    can be evaluated by the functions of the Evaluation module.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    measurement_volume : int
+        Total measurement volume sucked up with the syringe in liter
+    total_turbidity_ratio_idle : float
+        Total turbidity ratio without mask
+    __calibration_value : float
+        Offset value of the turbidity before and after the mask and the
+        absolute pressure value in mbar
+    __serial_port : str
+        Serial port of the arduino
+    __baud_rate : int
+        Baud rate of the serial port communication
+    __arduino : serial object
+        Non-blocking serial object of the arduino, None if not connected
+    __buffer : bytearray
+        Bytes received by the event loop and not yet processed
+    __data_event : asyncio.Event
+        Set when new bytes were received, created by connect() in the
+        running event loop
+    __error : Exception
+        Exception raised while receiving, None if no error occurred
+    __lock : asyncio.Lock
+        Lock of the serial communication, only one request or stream at once,
+        created by connect() in the running event loop
+    __dropped_samples : int
+        Number of streamed samples missing in the sample numbers
+    __corrupted_frames : int
+        Number of binary frames discarded due to a wrong CRC
+    __running_statistics : Running_Statistics
+        Running mean and variance of the turbidity before and after the mask
+        and of the relative pressure of the current measurement
+    reply_timeout : float
+        Time in seconds after which a request is taken as lost and a silent
+        stream yields an empty block (default 0.5)
+    calibration_tolerance : list
+        Standard errors of the mean turbidity before and after the mask and
+        of the mean pressure in mbar, below which the calibration finishes,
+        the same as of the synchronous class (default [5e-4, 5e-4, 5e-2])
+    calibration_minimum_samples : int
+        Minimum number of samples of a calibration, the same as of the
+        synchronous class (default 50)
+
+    Methods
+    -------
+    connect()
+        Opens the serial port and waits for the arduino
+    close()
+        Closes the serial port
+    getCalibrationValue()
+        Returns the calibration value
+    read()
+        Requests and reads one sample
+    samples(sample_rate)
+        Asynchronous iterator of the time stamped samples
+    measure(measurement_duration, sample_rate, tolerance)
+        Measures for the given duration
+    calibrate(measurement_duration, sample_rate, tolerance)
+        Measures the turbidity offset values
+    getDroppedSamples()
+        Returns the number of dropped samples of the last stream
+    getCorruptedFrames()
+        Returns the number of binary frames with a wrong CRC
+    """
+
+    reply_timeout = 0.5
+    calibration_tolerance = \
+        pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2.\
+        calibration_tolerance
+    calibration_minimum_samples = \
+        pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2.\
+        calibration_minimum_samples
+
+    def __init__(self, measurement_volume, total_turbidity_ratio_idle,
+                 calibration_value=[0.000, 0.000, 0.00], baud_rate=9600,
+                 serial_port=None):
+        """Init function.
+
+        The serial port is opened by connect().
+
+        Parameters
+        ----------
+        measurement_volume : int
+            Total measurement volume sucked up with the syringe in liter
+        total_turbidity_ratio_idle : float
+            Total turbidity ratio without mask.
+        calibration_value : float
+            offset value of the turbidity before and after the mask and the
+            absolute pressure value in mbar
+            (default [0,0,0])
+        baud_rate : int
+            baud rate of the serial port communication (default 9600)
+        serial_port : str
+            serial port of the arduino, for example the port of the
+            simulator. If None the first port found by findSerialPorts() of
+            the V2 module is used (default None)
+        """
+        self.measurement_volume = measurement_volume
+        self.total_turbidity_ratio_idle = total_turbidity_ratio_idle
+        self.__calibration_value = calibration_value
+        if serial_port is None:
+            serial_port = pen.findSerialPorts()
+            if np.size(serial_port) == 0:
+                raise ValueError("No device connected!")
+            serial_port = serial_port[0]
+        self.__serial_port = serial_port
+        self.__baud_rate = baud_rate
+        self.__arduino = None
+        self.__buffer = bytearray()
+        self.__data_event = None
+        self.__error = None
+        self.__lock = None
+        self.__dropped_samples = 0
+        self.__corrupted_frames = 0
+        self.__running_statistics = rst.Running_Statistics(3)
+
+    async def __aenter__(self):
+        """Connect when entering the context."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        """Close when leaving the context."""
+        await self.close()
+
+    async def connect(self):
+        """Open the serial port and wait for the arduino."""
+        if self.__arduino is not None:
+            return
+        self.__arduino = serial.Serial(self.__serial_port, self.__baud_rate,
+                                       timeout=0)
+        self.__loop = asyncio.get_running_loop()
+        # Bind the event and the lock to the running loop, so the driver can
+        # connect again in a later event loop
+        self.__data_event = asyncio.Event()
+        self.__lock = asyncio.Lock()
+        self.__loop.add_reader(self.__arduino.fileno(), self.__receive)
+        # The arduino restarts when the serial port is opened, like for the
+        # ports of the port pool
+        await asyncio.sleep(ppl.Port_Pool.bootloader_delay)
+        self.__buffer.clear()
+        self.__error = None
+
+    async def close(self):
+        """Close the serial port."""
+        if self.__arduino is None:
+            return
+        self.__loop.remove_reader(self.__arduino.fileno())
+        self.__arduino.close()
+        self.__arduino = None
+
+    def getCalibrationValue(self):
+        """Return the calibration value.
+
+        Returns
+        -------
+        self.__calibration_value : float
+            offset value of the turbidity before and after the mask and the
+            absolute pressure value in mbar
+        """
+        return self.__calibration_value
+
+    def __receive(self):
+        """Append the received bytes to the buffer, called by the loop."""
+        try:
+            self.__buffer += self.__arduino.read(
+                max(self.__arduino.in_waiting, 1))
+        except (serial.SerialException, OSError) as error:
+            # Stop watching a port which was disconnected
+            self.__error = error
+            self.__loop.remove_reader(self.__arduino.fileno())
+        self.__data_event.set()
+
+    async def __waitForData(self, timeout):
+        """Wait until the buffer contains received bytes.
+
+        Parameters
+        ----------
+        timeout : float
+            Maximum waiting time in seconds
+
+        Returns
+        -------
+        received : bool
+            True if the buffer contains received bytes, False after the
+            timeout
+        """
+        deadline = time.monotonic() + timeout
+        while len(self.__buffer) == 0:
+            if self.__error is not None:
+                raise self.__error
+            self.__data_event.clear()
+            try:
+                await asyncio.wait_for(self.__data_event.wait(),
+                                       deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def __readLine(self, timeout):
+        """Wait for a complete line and return it.
+
+        Raises asyncio.TimeoutError if the line is not complete within the
+        timeout in seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while b"\n" not in self.__buffer:
+            if self.__error is not None:
+                raise self.__error
+            self.__data_event.clear()
+            await asyncio.wait_for(self.__data_event.wait(),
+                                   deadline - time.monotonic())
+        end = self.__buffer.index(b"\n") + 1
+        line = bytes(self.__buffer[:end])
+        del self.__buffer[:end]
+        return line
+
+    async def read(self):
+        """Request and read one sample.
+
+        Raises asyncio.TimeoutError if the reply is not complete within
+        reply_timeout.
+
+        Returns
+        -------
+        data : float
+            Voltage values in volts of the photo transistors and pressure
+            values in mbar in order:
+            [Before90° Before180° After90° After180° Pressure]
+        """
+        async with self.__lock:
+            # Discard the rest of a late reply to a former request
+            self.__buffer.clear()
+            outgoing_string = "1"
+            self.__arduino.write(outgoing_string.encode())
+            line = await self.__readLine(self.reply_timeout)
+        data = list(np.float64(line.decode().split(';')))
+        return data
+
+    async def __blocks(self, sample_rate):
+        """Yield blocks of time stamped samples.
+
+        Without sample rate every sample is requested by read(), otherwise
+        the arduino streams binary frames with the given rate. A request
+        without reply or a stream without bytes for reply_timeout yields an
+        empty block, so a silent device never blocks the caller.
+
+        Parameters
+        ----------
+        sample_rate : int
+            Sample rate in Hz of the binary stream, None to request every
+            sample
+
+        Yields
+        ------
+        data : ndarray
+            Arrival time in seconds, voltage values in volts of the photo
+            transistors and pressure values in mbar, one row per sample in
+            order: [Time Before90° Before180° After90° After180° Pressure]
+        """
+        if sample_rate is None:
+            while True:
+                try:
+                    sample = await self.read()
+                except asyncio.TimeoutError:
+                    yield np.zeros((0, 6))
+                    continue
+                yield np.array([[time.monotonic()] + sample])
+        async with self.__lock:
+            self.__dropped_samples = 0
+            self.__corrupted_frames = 0
+            self.__buffer.clear()
+            outgoing_string = "B" + str(int(sample_rate)) + "\n"
+            self.__arduino.write(outgoing_string.encode())
+            frame_rest = b""
+            sample_number = None
+            try:
+                while True:
+                    if not await self.__waitForData(self.reply_timeout):
+                        yield np.zeros((0, 6))
+                        continue
+                    arrival_time = time.monotonic()
+                    frames, frame_rest, corrupted_frames = frm.decodeFrames(
+                        frame_rest + bytes(self.__buffer))
+                    self.__buffer.clear()
+                    self.__corrupted_frames += corrupted_frames
+                    if len(frames) == 0:
+                        continue
+                    sample_time, dropped_samples = frm.calculateSampleTime(
+                        frames['sample_number'], sample_number, arrival_time,
+                        1/int(sample_rate))
+                    self.__dropped_samples += dropped_samples
+                    sample_number = int(frames['sample_number'][-1])
+                    data = np.zeros((len(frames), 6))
+                    data[:, 0] = sample_time
+                    data[:, 1:6] = frm.convertFrames(frames)
+                    yield data
+            finally:
+                # The port may be closed before the generator is finalized
+                if self.__arduino is not None:
+                    outgoing_string = "X"
+                    self.__arduino.write(outgoing_string.encode())
+                    # Discard the frames sent before the command arrived
+                    await asyncio.sleep(0.1)
+                    self.__buffer.clear()
+
+    async def samples(self, sample_rate=None):
+        """Asynchronous iterator of the time stamped samples.
+
+        The stream is stopped when the iterator is closed. To leave the loop
+        early wrap the iterator into contextlib.aclosing(), otherwise the
+        stream runs until the iterator is garbage collected.
+
+        Parameters
+        ----------
+        sample_rate : int
+            Sample rate in Hz of the binary stream. If None every sample is
+            requested by read() (default None)
+
+        Yields
+        ------
+        sample : ndarray
+            Monotonic time in seconds, voltage values in volts of the photo
+            transistors and pressure values in mbar in order:
+            [Time Before90° Before180° After90° After180° Pressure]
+        """
+        blocks = self.__blocks(sample_rate)
+        try:
+            async for data in blocks:
+                for sample in data:
+                    yield sample
+        finally:
+            await blocks.aclose()
+
+    def __appendSamples(self, sample_store, data, start_time):
+        """Evaluate a block of raw samples and append it to the store."""
+        turbidity = evl.calculateTurbidity(data[:, 1:5],
+                                           self.__calibration_value)
+        turbidity_ratio = evl.calculateTurbidityRatio(turbidity)
+        pressure = np.round(data[:, 5] - self.__calibration_value[-1], 1)
+        sample_store.append(data[:, 0] - start_time, data[:, 1:5], pressure,
+                            turbidity, turbidity_ratio)
+        self.__running_statistics.append(np.column_stack([turbidity,
+                                                          pressure]))
+
+    async def measure(self, measurement_duration, sample_rate=None,
+                      tolerance=None):
+        """Measure for the given duration.
+
+        The measurement also ends at the end of the duration, if the device
+        stops sending, at the latest after reply_timeout.
+
+        Parameters
+        ----------
+        measurement_duration : float
+            Duration time of the measurement in seconds
+        sample_rate : int
+            Sample rate in Hz of the binary stream. If None every sample is
+            requested by read() (default None)
+        tolerance : list
+            Standard errors of the mean turbidity before and after the mask
+            and of the mean relative pressure in mbar. If not None the
+            measurement finishes as soon as all standard errors are below
+            the tolerance, after at least calibration_minimum_samples
+            samples (default None)
+
+        Returns
+        -------
+        sample_store : Sample_Store
+            Columnar store of the measurement time, the photo transistor
+            voltages, the relative pressure, the turbidity and the turbidity
+            ratio
+        """
+        sample_store = sst.Sample_Store()
+        self.__running_statistics = rst.Running_Statistics(3)
+        start_time = time.monotonic()
+        blocks = self.__blocks(sample_rate)
+        try:
+            async for data in blocks:
+                if len(data) > 0:
+                    self.__appendSamples(sample_store, data, start_time)
+                if time.monotonic() - start_time >= measurement_duration:
+                    break
+                if tolerance is not None and \
+                        len(self.__running_statistics) >= \
+                        self.calibration_minimum_samples and \
+                        np.all(self.__running_statistics.getStandardError() <
+                               tolerance):
+                    break
+        finally:
+            await blocks.aclose()
+        return sample_store
+
+    async def calibrate(self, measurement_duration, sample_rate=None,
+                        tolerance=None):
+        """Measure the turbidity offset values.
+
+        The mean values are calculated while measuring and the calibration
+        finishes as soon as their standard errors are below the tolerance,
+        like the one of the synchronous class. The measurement duration is
+        the maximum duration. Raises ValueError if no sample was received.
+
+        Parameters
+        ----------
+        measurement_duration : float
+            Duration time of the measurement in seconds
+        sample_rate : int
+            Sample rate in Hz of the binary stream. If None every sample is
+            requested by read() (default None)
+        tolerance : list
+            Standard errors of the mean turbidity before and after the mask
+            and of the mean pressure in mbar, below which the calibration
+            finishes. If None calibration_tolerance is used, with [0, 0, 0]
+            the calibration runs for the measurement duration (default None)
+
+        Returns
+        -------
+        self.__calibration_value : float
+            offset value of the turbidity before and after the mask and the
+            absolute pressure value in mbar
+        """
+        if tolerance is None:
+            tolerance = self.calibration_tolerance
+        self.__calibration_value = [0.000, 0.000, 0.0]
+        await self.measure(measurement_duration, sample_rate, tolerance)
+        if len(self.__running_statistics) == 0:
+            raise ValueError("No samples received for the calibration!")
+        # Mean turbidity before and after the mask and mean absolute pressure
+        # over the calibration time
+        mean = self.__running_statistics.getMean()
+        self.__calibration_value = [round(float(mean[0]), 3),
+                                    round(float(mean[1]), 3),
+                                    round(float(mean[2]), 1)]
+        return self.__calibration_value
+
+    def getDroppedSamples(self):
+        """Return the number of dropped samples of the last stream.
+
+        Returns
+        -------
+        dropped_samples : int
+            Number of streamed samples missing in the sample numbers
+        """
+        dropped_samples = self.__dropped_samples
+        return dropped_samples
+
+    def getCorruptedFrames(self):
+        """Return the number of binary frames with a wrong CRC.
+
+        Returns
+        -------
+        corrupted_frames : int
+            Number of binary frames discarded due to a wrong CRC
+        """
+        corrupted_frames = self.__corrupted_frames
+        return corrupted_frames
@@ -0,0 +1,249 @@
+"""Batch evaluation of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+Re-evaluates recorded measurements without a device, for example after
+changing the total turbidity ratio without mask, the measurement volume or
+the flow detection threshold. Every measurement runs through the same steps
+as the measurement script:
+
+    calculateFlowRate -> integrateTurbidity -> calculateTotalTurbidityRatio
+    -> evaluateMeasurement -> integratePressure
+    -> calculateBreathingResistance
+
+The measurements are distributed over a process pool, the result is a
+structured array with one row per measurement, see results_dtype. Supported
+are the recordings of the Recorder, the .npz files of the Storage module,
+the .csv files of the V1 and the runs of an Archive.
+"""
+import concurrent.futures
+import functools
+import numpy as np
+import os
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Evaluation as evl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Recorder as rec
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Storage as sto
+
+results_dtype = np.dtype([('source', 'U256'), ('run_id', '<i8'),
+                          ('number_of_samples', '<i8'),
+                          ('flow_rate', '<f8'), ('flow_time', '<f8'),
+                          ('start_ind', '<i8'), ('stop_ind', '<i8'),
+                          ('total_turbidity', '<f8', 2),
+                          ('total_turbidity_ratio', '<f8'),
+                          ('filtered_percentage', '<f8'),
+                          ('penetration_percentage', '<f8'),
+                          ('total_pressure', '<f8'),
+                          ('breathing_resistance', '<f8'),
+                          ('equivalent_breathing_resistance', '<f8'),
+                          ('error', 'U128')])
+
+
+def loadSamples(file_name, calibration_value=None):
+    """Load the samples of a measurement needed for the evaluation.
+
+    Parameters
+    ----------
+    file_name : str
+        Recording of the Recorder, .npz file of the Storage module, .csv file
+        of the V1 or .npy payload of an Archive run
+    calibration_value : float
+        Offset value of the turbidity before and after the mask and for
+        recordings the absolute pressure value in mbar. If given the
+        turbidity is recalculated from the transistor voltages, otherwise the
+        saved turbidity or calibration is used (default None)
+
+    Returns
+    -------
+    measurement_time : ndarray
+        Measurement time in seconds
+    turbidity : ndarray
+        Turbidity value before and after the mask, one row per sample
+    pressure : ndarray
+        Relative pressure after the mask in mbar, NaN for the V1
+    """
+    if file_name.endswith(".npy"):
+        samples = np.load(file_name, mmap_mode='r')
+        measurement_time = samples[:, 0]
+        transistor_voltage = samples[:, 1:5]
+        turbidity = samples[:, 5:7]
+        pressure = samples[:, 8]
+    elif file_name.endswith(".npz") or file_name.endswith(".csv"):
+        if file_name.endswith(".npz"):
+            measurement = sto.loadMeasurement(file_name)
+        else:
+            measurement = sto.readCsvMeasurement(file_name)
+        measurement_time = measurement['measurement_time']
+        transistor_voltage = measurement['transistor_voltage']
+        turbidity = measurement['turbidity']
+        pressure = measurement.get('pressure',
+                                   np.full(len(measurement_time), np.nan))
+    else:
+        header, samples = rec.readRecording(file_name)
+        if calibration_value is None:
+            calibration_value = header['calibration_value']
+        measurement_time = samples[:, 0]
+        transistor_voltage = samples[:, 1:5]
+        turbidity = None
+        pressure = np.round(samples[:, 5] - calibration_value[-1], 1)
+    if calibration_value is not None or turbidity is None:
+        turbidity = evl.calculateTurbidity(transistor_voltage,
+                                           calibration_value)
+    return measurement_time, turbidity, pressure
+
+
+def evaluateSamples(measurement_time, turbidity, pressure, measurement_volume,
+                    total_turbidity_ratio_idle,
+                    pressure_noise_derivation=evl.pressure_noise_derivation):
+    """Evaluate the samples of one measurement.
+
+    Parameters
+    ----------
+    measurement_time : float
+        Measurement time in seconds, one value per sample
+    turbidity : float
+        Turbidity value before and after the mask, one row per sample
+    pressure : float
+        Relative pressure after the mask in mbar, one value per sample
+    measurement_volume : float
+        Total measurement volume sucked up with the syringe in liter
+    total_turbidity_ratio_idle : float
+        Total turbidity ratio without mask
+    pressure_noise_derivation : float
+        Typical pressure derivation in mbar between two samples due to noise
+        (default 0.1)
+
+    Returns
+    -------
+    result : ndarray
+        Result of the measurement with dtype results_dtype, the source is
+        empty
+    """
+    result = np.zeros((), results_dtype)
+    result['run_id'] = -1
+    result['number_of_samples'] = len(measurement_time)
+    flow_rate, flow_time, start_ind, stop_ind = evl.calculateFlowRate(
+        pressure, measurement_time, measurement_volume,
+        pressure_noise_derivation)
+    total_turbidity = evl.integrateTurbidity(turbidity, measurement_time,
+                                             start_ind, stop_ind)
+    total_turbidity_ratio = evl.calculateTotalTurbidityRatio(total_turbidity)
+    filtered_percentage, penetration_percentage = evl.evaluateMeasurement(
+        total_turbidity_ratio, total_turbidity_ratio_idle)
+    total_pressure = evl.integratePressure(pressure, measurement_time)
+    breathing_resistance, equivalent_breathing_resistance = \
+        evl.calculateBreathingResistance(total_pressure, measurement_volume)
+    result[['flow_rate', 'flow_time', 'start_ind', 'stop_ind',
+            'total_turbidity', 'total_turbidity_ratio', 'filtered_percentage',
+            'penetration_percentage', 'total_pressure',
+            'breathing_resistance', 'equivalent_breathing_resistance']] = (
+        flow_rate, flow_time, start_ind, stop_ind, total_turbidity,
+        total_turbidity_ratio, filtered_percentage, penetration_percentage,
+        total_pressure, breathing_resistance,
+        equivalent_breathing_resistance)
+    return result
+
+
+def __evaluateFile(file_name, measurement_volume, total_turbidity_ratio_idle,
+                   pressure_noise_derivation, calibration_value):
+    """Evaluate one file, errors are returned in the result."""
+    try:
+        result = evaluateSamples(*loadSamples(file_name, calibration_value),
+                                 measurement_volume,
+                                 total_turbidity_ratio_idle,
+                                 pressure_noise_derivation)
+    except (OSError, ValueError, IndexError, KeyError,
+            ArithmeticError) as error:
+        result = np.zeros((), results_dtype)
+        result['run_id'] = -1
+        for name in results_dtype.names[2:-1]:
+            result[name] = np.nan if results_dtype[name].kind == 'f' else -1
+        result['error'] = repr(error)[:128]
+    result['source'] = file_name
+    return result
+
+
+def evaluateFiles(file_names, measurement_volume, total_turbidity_ratio_idle,
+                  pressure_noise_derivation=evl.pressure_noise_derivation,
+                  calibration_value=None, processes=None):
+    """Evaluate many measurements in a process pool.
+
+    Parameters
+    ----------
+    file_names : list
+        Recordings, .npz, .csv or .npy files of the measurements, see
+        loadSamples()
+    measurement_volume : float
+        Total measurement volume sucked up with the syringe in liter
+    total_turbidity_ratio_idle : float
+        Total turbidity ratio without mask
+    pressure_noise_derivation : float
+        Typical pressure derivation in mbar between two samples due to noise
+        (default 0.1)
+    calibration_value : float
+        Calibration value used for all measurements, None for the saved one
+        (default None)
+    processes : int
+        Number of worker processes. If None one per CPU is used, with a
+        single process the files are evaluated without pool (default None)
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype in the order of the files. A file
+        which cannot be evaluated has NaN values and the error message.
+    """
+    file_names = list(file_names)
+    evaluate = functools.partial(
+        __evaluateFile, measurement_volume=measurement_volume,
+        total_turbidity_ratio_idle=total_turbidity_ratio_idle,
+        pressure_noise_derivation=pressure_noise_derivation,
+        calibration_value=calibration_value)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, max(len(file_names), 1))
+    if processes == 1:
+        results = list(map(evaluate, file_names))
+    else:
+        # Several files per task keep the pickling overhead small
+        chunksize = max(len(file_names)//(4*processes), 1)
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            results = list(executor.map(evaluate, file_names,
+                                        chunksize=chunksize))
+    results = np.array(results, results_dtype).reshape(-1)
+    return results
+
+
+def evaluateArchive(archive, measurement_volume, total_turbidity_ratio_idle,
+                    pressure_noise_derivation=evl.pressure_noise_derivation,
+                    calibration_value=None, processes=None, **conditions):
+    """Evaluate the runs of an Archive in a process pool.
+
+    Parameters
+    ----------
+    archive : Archive
+        Archive of the runs
+    measurement_volume : float
+        Total measurement volume sucked up with the syringe in liter
+    total_turbidity_ratio_idle : float
+        Total turbidity ratio without mask
+    pressure_noise_derivation : float
+        Typical pressure derivation in mbar between two samples due to noise
+        (default 0.1)
+    calibration_value : float
+        Calibration value used for all runs, None for the saved turbidity
+        (default None)
+    processes : int
+        Number of worker processes, None for one per CPU (default None)
+    **conditions
+        Conditions selecting the runs like query() of the Archive
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype, one row per selected run
+    """
+    run_ids = archive.query(**conditions)['run_id']
+    results = evaluateFiles([archive.getPayloadFile(i) for i in run_ids],
+                            measurement_volume, total_turbidity_ratio_idle,
+                            pressure_noise_derivation, calibration_value,
+                            processes)
+    results['run_id'] = run_ids
+    return results
@@ -0,0 +1,467 @@
+"""Benchmarks of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+Every benchmark times a hot path of the acquisition or the evaluation against
+the simulator or against synthetic recordings with a fixed seed, so the
+benchmarks run without hardware and are reproducible. The result of a
+benchmark is the best time of several repetitions in seconds per unit, for
+example per sample or per frame, so lower is better for all results:
+
+    name : Name of the benchmark
+    time : Best time in seconds per unit
+    unit : Unit the time refers to, for example 'sample' or 'frame'
+
+The results are saved as .npy file with dtype results_dtype. A result slower
+than the one of a saved baseline by more than the threshold is reported as
+regression by compareResults().
+"""
+import contextlib
+import csv
+import io
+import numpy as np
+import os
+import tempfile
+import time
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2 as pen
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Evaluation as evl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Port_Pool as ppl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator as sim
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Storage as sto
+
+results_dtype = np.dtype([('name', 'U64'), ('time', '<f8'),
+                          ('unit', 'U16')])
+
+
+def __bestTime(function, repeat):
+    """Return the best time of several calls of a function in seconds."""
+    best_time = np.inf
+    for i in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time
+
+
+@contextlib.contextmanager
+def __simulation(**options):
+    """Run a fast simulator with a device connected to it.
+
+    The bootloader delay of the port pool is skipped while the simulator
+    runs and restored afterwards, so a real device opened later in the
+    same process still waits for its bootloader.
+    """
+    bootloader_delay = ppl.Port_Pool.bootloader_delay
+    ppl.Port_Pool.bootloader_delay = 0.0
+    options.setdefault('seed', 0)
+    simulator = \
+        sim.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator(
+            **options)
+    try:
+        simulator.startSimulation()
+        device = pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2(
+            60e-3, 1.3408, serial_port=simulator.getSerialPort())
+        try:
+            yield device
+        finally:
+            device.closeSerial(keep_open=False)
+    finally:
+        simulator.stopSimulation()
+        ppl.Port_Pool.bootloader_delay = bootloader_delay
+
+
+def makeRecording(number_of_samples, sample_period=0.05, seed=0):
+    """Return a synthetic recording of a measurement.
+
+    The pressure drops by 4 mbar during the middle third of the recording,
+    while the smoke raises the turbidity before the mask and by a fifth of it
+    after the mask.
+
+    Parameters
+    ----------
+    number_of_samples : int
+        Number of samples
+    sample_period : float
+        Time between two samples in seconds (default 0.05)
+    seed : int
+        Seed of the noise generator (default 0)
+
+    Returns
+    -------
+    measurement_time : ndarray
+        Measurement time in seconds
+    transistor_voltage : ndarray
+        Voltage values in volts of the photo transistors in order:
+        [Before90° Before180° After90° After180°]
+    pressure : ndarray
+        Relative pressure after the mask in mbar
+    """
+    number_of_samples = int(number_of_samples)
+    rng = np.random.default_rng(seed)
+    measurement_time = np.arange(number_of_samples)*sample_period
+    flow = np.zeros(number_of_samples)
+    flow[number_of_samples//3:2*number_of_samples//3] = 1.0
+    smoke = np.cumsum(flow)/max(number_of_samples//3, 1)*np.exp(
+        -np.cumsum(1 - flow)/max(number_of_samples//3, 1))
+    transistor_voltage = np.column_stack(
+        [0.4 + 2.4*smoke, 3.5*np.ones(number_of_samples),
+         0.3 + 0.48*smoke, 3.4*np.ones(number_of_samples)])
+    transistor_voltage += rng.normal(0, 2e-3, transistor_voltage.shape)
+    pressure = np.round(-4.0*flow + rng.normal(0, 0.03, number_of_samples),
+                        1)
+    return measurement_time, transistor_voltage, pressure
+
+
+def benchmarkReadData(number_of_samples=200):
+    """Time readData() against the simulator without loop delay.
+
+    Parameters
+    ----------
+    number_of_samples : int
+        Number of requested samples (default 200)
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype
+    """
+    with __simulation(baud_rate=1000000, loop_delay=0.0) as device:
+        device.readData()  # Open the port before timing
+        best_time = __bestTime(
+            lambda: [device.readData() for i in range(number_of_samples)], 3)
+    results = np.array([("readData", best_time/number_of_samples, 'sample')],
+                       results_dtype)
+    return results
+
+
+def benchmarkLiveMeasurement(measurement_duration=2.0):
+    """Time liveMeasurement() end-to-end against the simulator.
+
+    The samples are requested by readData() from a simulator without loop
+    delay, once headless and once with live plot.
+
+    Parameters
+    ----------
+    measurement_duration : float
+        Duration time of each measurement in seconds (default 2.0)
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype, the time per received sample
+    """
+    results = []
+    with __simulation(baud_rate=1000000, loop_delay=0.0) as device:
+        for plot in [False, True]:
+            # Do not print the progress of every measurement
+            with contextlib.redirect_stdout(io.StringIO()):
+                start_time = time.perf_counter()
+                sample_store = device.liveMeasurement(measurement_duration,
+                                                      plot)
+                elapsed_time = time.perf_counter() - start_time
+            results.append(("liveMeasurement" + (" plot" if plot else ""),
+                            elapsed_time/max(len(sample_store), 1),
+                            'sample'))
+    results = np.array(results, results_dtype)
+    return results
+
+
+def benchmarkPlotMeasurement(history_lengths=(1e3, 1e4, 1e5, 1e6),
+                             number_of_frames=20, block_length=5):
+    """Time a frame of plotMeasurement() for several history lengths.
+
+    Every frame appends a block of samples to the measurement like the live
+    measurement does, so the cache of the downsampler is continued and the
+    axes are rescaled in every frame.
+
+    Parameters
+    ----------
+    history_lengths : tuple
+        Numbers of samples already measured (default (1e3, 1e4, 1e5, 1e6))
+    number_of_frames : int
+        Number of timed frames per history length (default 20)
+    block_length : int
+        Number of samples appended per frame (default 5)
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype, the time per frame
+    """
+    # The serial port is only opened at the first use
+    device = pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2(
+        60e-3, 1.3408, calibration_value=[0.114, 0.088, 1013.2],
+        serial_port="benchmark")
+    results = []
+    for history_length in history_lengths:
+        history_length = int(history_length)
+        measurement_time, transistor_voltage, pressure = \
+            makeRecording(history_length + number_of_frames*block_length)
+        turbidity = evl.calculateTurbidity(transistor_voltage,
+                                           device.getCalibrationValue())
+        turbidity_ratio = evl.calculateTurbidityRatio(turbidity)
+        recording = (measurement_time, transistor_voltage, turbidity,
+                     turbidity_ratio, pressure)
+
+        def plotFrames():
+            for i in range(1, number_of_frames + 1):
+                n = history_length + i*block_length
+                device.plotMeasurement(*[line[:n] for line in recording])
+
+        best_time = np.inf
+        for i in range(3):
+            # Plot the history untimed, which also restarts the downsampler
+            device.plotMeasurement(*[line[:history_length]
+                                     for line in recording])
+            best_time = min(best_time, __bestTime(plotFrames, 1))
+        results.append(("plotMeasurement %.0e" % history_length,
+                        best_time/number_of_frames, 'frame'))
+    results = np.array(results, results_dtype)
+    return results
+
+
+def benchmarkTurbidity(number_of_samples=1e5):
+    """Time calculateTurbidity() and calculateTurbidityRatio().
+
+    Parameters
+    ----------
+    number_of_samples : int
+        Number of samples of the recording (default 1e5)
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype, the time per sample
+    """
+    number_of_samples = int(number_of_samples)
+    transistor_voltage = makeRecording(number_of_samples)[1]
+    calibration_value = [0.114, 0.088, 1013.2]
+    turbidity = evl.calculateTurbidity(transistor_voltage, calibration_value)
+    results = np.array(
+        [("calculateTurbidity",
+          __bestTime(lambda: evl.calculateTurbidity(transistor_voltage,
+                                                    calibration_value), 5) /
+          number_of_samples, 'sample'),
+         ("calculateTurbidityRatio",
+          __bestTime(lambda: evl.calculateTurbidityRatio(turbidity), 5) /
+          number_of_samples, 'sample')], results_dtype)
+    return results
+
+
+def benchmarkEvaluation(recording_lengths=(1e3, 1e4, 1e5, 1e6, 1e7)):
+    """Time the integration and the flow rate for several recording lengths.
+
+    Parameters
+    ----------
+    recording_lengths : tuple
+        Numbers of samples of the recordings
+        (default (1e3, 1e4, 1e5, 1e6, 1e7))
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype, the time per sample
+    """
+    results = []
+    for recording_length in recording_lengths:
+        measurement_time, transistor_voltage, pressure = \
+            makeRecording(recording_length)
+        turbidity = evl.calculateTurbidity(transistor_voltage,
+                                           [0.114, 0.088])
+        del transistor_voltage
+        repeat = 5 if recording_length <= 1e6 else 2
+        for name, function in [
+                ("integrateTurbidity",
+                 lambda: evl.integrateTurbidity(turbidity, measurement_time)),
+                ("integratePressure",
+                 lambda: evl.integratePressure(pressure, measurement_time)),
+                ("calculateFlowRate",
+                 lambda: evl.calculateFlowRate(
+                     pressure, measurement_time, 60e-3,
+                     evl.pressure_noise_derivation))]:
+            results.append((name + " %.0e" % recording_length,
+                            __bestTime(function, repeat)/recording_length,
+                            'sample'))
+    results = np.array(results, results_dtype)
+    return results
+
+
+def writeCsvRecording(file_name, number_of_samples):
+    """Write a synthetic recording as .csv file like the V1 saveData().
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the .csv file
+    number_of_samples : int
+        Number of samples
+    """
+    measurement_time, transistor_voltage, pressure = \
+        makeRecording(number_of_samples)
+    turbidity = evl.calculateTurbidity(transistor_voltage, [0.114, 0.088])
+    turbidity_ratio = evl.calculateTurbidityRatio(turbidity)
+    with open(file_name, 'w') as data:
+        wr = csv.writer(data, quoting=csv.QUOTE_ALL)
+        wr.writerow(["Data name: ", "Benchmark"])
+        wr.writerow(["Created on: ", "2026-10-17"])
+        wr.writerow(["Calibration value: ", str([0.114, 0.088])])
+        wr.writerow(["Total turbidity: ", str([1.0, 0.2])])
+        wr.writerow(["Total turbidity ratio: ", str(5.0)])
+        wr.writerow(["Filtered percentage: ", str(73)])
+        wr.writerow(" ")
+        wr.writerow(["Measurement time in s", "Diode voltage in V",
+                     "Turbidity", "Turbidity ratio"])
+        for (i, j, k, m) in zip(measurement_time.tolist(),
+                                transistor_voltage.tolist(),
+                                turbidity.tolist(),
+                                turbidity_ratio.tolist()):
+            wr.writerow([i, j, k, m])
+
+
+def benchmarkReadCsvMeasurement(number_of_samples=2e4):
+    """Time the loading of a .csv file of the V1 by readCsvMeasurement().
+
+    Parameters
+    ----------
+    number_of_samples : int
+        Number of samples of the .csv file (default 2e4)
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype, the time per file
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "Benchmark.csv")
+        writeCsvRecording(file_name, int(number_of_samples))
+        best_time = __bestTime(lambda: sto.readCsvMeasurement(file_name), 3)
+    results = np.array([("readCsvMeasurement %.0e" % number_of_samples,
+                         best_time, 'file')], results_dtype)
+    return results
+
+
+def runBenchmarks(quick=False):
+    """Run all benchmarks.
+
+    Parameters
+    ----------
+    quick : bool
+        Run smaller recordings and shorter measurements only, the results
+        are not comparable to the ones of a full run (default False)
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype
+    """
+    if quick:
+        results = [benchmarkReadData(50), benchmarkLiveMeasurement(0.5),
+                   benchmarkPlotMeasurement((1e3, 1e5)),
+                   benchmarkTurbidity(1e4),
+                   benchmarkEvaluation((1e3, 1e5)),
+                   benchmarkReadCsvMeasurement(2e3)]
+    else:
+        results = [benchmarkReadData(), benchmarkLiveMeasurement(),
+                   benchmarkPlotMeasurement(), benchmarkTurbidity(),
+                   benchmarkEvaluation(), benchmarkReadCsvMeasurement()]
+    results = np.concatenate(results)
+    return results
+
+
+def saveResults(file_name, results):
+    """Save benchmark results as .npy file.
+
+    The file is written to a temporary file first and replaces the old one,
+    so a baseline is never left half written.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the .npy file
+    results : ndarray
+        Results with dtype results_dtype
+    """
+    temporary_file = file_name + ".tmp"
+    with open(temporary_file, 'wb') as file:
+        np.save(file, np.asarray(results, results_dtype))
+    os.replace(temporary_file, file_name)
+
+
+def loadResults(file_name):
+    """Load benchmark results from a .npy file.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the .npy file
+
+    Returns
+    -------
+    results : ndarray
+        Results with dtype results_dtype
+    """
+    results = np.load(file_name, allow_pickle=False)
+    return results
+
+
+def compareResults(results, baseline, threshold=0.2):
+    """Compare benchmark results with a baseline.
+
+    Parameters
+    ----------
+    results : ndarray
+        Results with dtype results_dtype
+    baseline : ndarray
+        Results of the baseline with dtype results_dtype
+    threshold : float
+        Relative slowdown above which a result is a regression (default 0.2)
+
+    Returns
+    -------
+    ratio : ndarray
+        Time of every result divided by the time of the baseline, NaN if the
+        baseline has no result of the same name
+    regression : ndarray
+        True for every result slower than the baseline by more than the
+        threshold
+    """
+    baseline_time = dict(zip(baseline['name'], baseline['time']))
+    ratio = np.array([result_time/baseline_time.get(name, np.nan)
+                      for name, result_time in zip(results['name'],
+                                                   results['time'])])
+    with np.errstate(invalid='ignore'):
+        regression = ratio > 1 + threshold
+    return ratio, regression
+
+
+def printResults(results, baseline=None, threshold=0.2):
+    """Print benchmark results, compared to a baseline if given.
+
+    Parameters
+    ----------
+    results : ndarray
+        Results with dtype results_dtype
+    baseline : ndarray
+        Results of the baseline with dtype results_dtype, None to print the
+        results only (default None)
+    threshold : float
+        Relative slowdown above which a result is a regression (default 0.2)
+
+    Returns
+    -------
+    number_of_regressions : int
+        Number of results slower than the baseline by more than the threshold
+    """
+    if baseline is None:
+        baseline = np.zeros(0, results_dtype)
+    ratio, regression = compareResults(results, baseline, threshold)
+    for result, result_ratio, result_regression in zip(results, ratio,
+                                                       regression):
+        line = "%-32s %12.3e s/%-7s %12.1f /s" % (
+            result['name'], result['time'], result['unit'],
+            1/result['time'])
+        if np.isfinite(result_ratio):
+            line += "  %6.2fx" % result_ratio
+        if result_regression:
+            line += "  REGRESSION"
+        print(line)
+    number_of_regressions = int(np.sum(regression))
+    return number_of_regressions
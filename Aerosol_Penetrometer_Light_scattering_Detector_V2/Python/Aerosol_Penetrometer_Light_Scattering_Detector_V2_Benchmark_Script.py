@@ -0,0 +1,55 @@
+"""Aerosol_Penetrometer_Light_Scattering_Detector_V2_Benchmark_Script.
+
+This script runs the benchmarks of the
+Aerosol_Penetrometer_Light_Scattering_Detector_V2 against the simulator and
+synthetic recordings, so no device has to be connected.
+The script uses the module
+Aerosol_Penetrometer_Light_Scattering_Detector_V2_Benchmark.
+
+The results are compared with the baseline file and every result slower than
+the baseline by more than the threshold is reported as regression. If there
+is no baseline file yet, the results are saved as baseline. Delete the
+baseline file to accept the current results as new baseline. Baselines are
+only comparable on the same computer.
+
+Author
+------
+Sebastian Lifka
+
+Created
+-------
+Oct 17 2026
+
+Modified
+--------
+Oct 17 2026
+"""
+
+import os
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Benchmark as bmk
+
+# =============================================================================
+# Define baseline file, relative slowdown reported as regression and whether
+# only the quick benchmarks with small recordings are run
+# =============================================================================
+baseline_file = "benchmark_baseline.npy"
+threshold = 0.2
+quick = False
+
+# =============================================================================
+# Run benchmarks and compare them with the baseline
+# =============================================================================
+results = bmk.runBenchmarks(quick)
+if os.path.exists(baseline_file):
+    baseline = bmk.loadResults(baseline_file)
+    print()
+    number_of_regressions = bmk.printResults(results, baseline, threshold)
+    print()
+    print(str(number_of_regressions) + " regressions of more than " +
+          str(round(threshold*100)) + " %.")
+else:
+    print()
+    bmk.printResults(results)
+    bmk.saveResults(baseline_file, results)
+    print()
+    print("Results saved as baseline.")
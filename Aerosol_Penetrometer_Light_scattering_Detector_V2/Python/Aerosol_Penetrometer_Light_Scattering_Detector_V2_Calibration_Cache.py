@@ -0,0 +1,192 @@
+"""Calibration cache of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+The calibration values of all devices are kept in one .npy file as
+structured array with one row per calibration, see entry_dtype. The file is
+replaced atomically after every change, so it stays readable if the script
+is interrupted.
+"""
+import numpy as np
+import os
+import time
+
+entry_dtype = np.dtype([('device', 'U64'), ('calibration_time', '<f8'),
+                        ('calibration_value', '<f8', 3),
+                        ('standard_error', '<f8', 3),
+                        ('number_of_samples', '<i8')])
+
+
+class Calibration_Cache:
+    """
+    A persistent cache of calibration values by device and time.
+
+    get() returns the latest calibration of a device which is not expired.
+    Expired calibrations are evicted when the cache is changed, and only the
+    latest maximum_entries calibrations are kept.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __file_name : str
+        File name of the cache
+    __entries : ndarray
+        Calibrations with dtype entry_dtype
+    expiry : float
+        Time in seconds after which a calibration expires (default 3600.0)
+    maximum_entries : int
+        Maximum number of kept calibrations (default 1000)
+
+    Methods
+    -------
+    put(device, calibration_value, standard_error, number_of_samples,
+        calibration_time)
+        Adds a calibration
+    get(device, now)
+        Returns the latest calibration of a device which is not expired
+    evict(now)
+        Removes expired and surplus calibrations
+    getEntries()
+        Returns all calibrations
+    """
+
+    def __init__(self, file_name=None, expiry=3600.0, maximum_entries=1000):
+        """Init function, loads the cache if the file exists.
+
+        Parameters
+        ----------
+        file_name : str
+            File name of the cache. If None 'calibration_cache.npy' next to
+            this module is used, independent of the working directory
+            (default None)
+        expiry : float
+            Time in seconds after which a calibration expires
+            (default 3600.0)
+        maximum_entries : int
+            Maximum number of kept calibrations (default 1000)
+        """
+        if file_name is None:
+            file_name = os.path.join(os.path.dirname(os.path.abspath(
+                __file__)), "calibration_cache.npy")
+        self.__file_name = file_name
+        self.expiry = expiry
+        self.maximum_entries = maximum_entries
+        if os.path.exists(file_name):
+            self.__entries = np.load(file_name, allow_pickle=False)
+        else:
+            self.__entries = np.zeros(0, entry_dtype)
+
+    def __len__(self):
+        """Return the number of calibrations."""
+        return len(self.__entries)
+
+    def __save(self):
+        """Write the cache to a temporary file and replace the old one."""
+        temporary_file = self.__file_name + ".tmp"
+        with open(temporary_file, 'wb') as file:
+            np.save(file, self.__entries)
+        os.replace(temporary_file, self.__file_name)
+
+    def put(self, device, calibration_value, standard_error=(np.nan,)*3,
+            number_of_samples=0, calibration_time=None):
+        """Add a calibration.
+
+        Parameters
+        ----------
+        device : str
+            Key of the device, for example the serial number of the USB
+            serial converter
+        calibration_value : float
+            Offset value of the turbidity before and after the mask and the
+            absolute pressure value in mbar
+        standard_error : float
+            Standard error of the calibration value (default NaN)
+        number_of_samples : int
+            Number of samples of the calibration (default 0)
+        calibration_time : float
+            Time of the calibration in seconds since the epoch, None for now
+            (default None)
+        """
+        if calibration_time is None:
+            calibration_time = time.time()
+        entry = np.zeros(1, entry_dtype)
+        entry[0] = (device, calibration_time, calibration_value,
+                    standard_error, number_of_samples)
+        self.__entries = np.concatenate([self.__entries, entry])
+        self.evict()
+
+    def get(self, device, now=None):
+        """Return the latest calibration of a device which is not expired.
+
+        Parameters
+        ----------
+        device : str
+            Key of the device
+        now : float
+            Current time in seconds since the epoch, None for now
+            (default None)
+
+        Returns
+        -------
+        entry : ndarray
+            Calibration with dtype entry_dtype, None if the device has no
+            valid calibration
+        """
+        if now is None:
+            now = time.time()
+        entries = self.__entries[
+            (self.__entries['device'] == device) &
+            (self.__entries['calibration_time'] > now - self.expiry) &
+            (self.__entries['calibration_time'] <= now)]
+        if len(entries) == 0:
+            return None
+        entry = entries[np.argmax(entries['calibration_time'])]
+        return entry
+
+    def evict(self, now=None):
+        """Remove expired and surplus calibrations.
+
+        Parameters
+        ----------
+        now : float
+            Current time in seconds since the epoch, None for now
+            (default None)
+
+        Returns
+        -------
+        number_of_evicted : int
+            Number of removed calibrations
+        """
+        if now is None:
+            now = time.time()
+        number_of_entries = len(self.__entries)
+        entries = self.__entries[self.__entries['calibration_time'] >
+                                 now - self.expiry]
+        # Keep the latest calibrations
+        entries = entries[np.argsort(entries['calibration_time'],
+                                     kind='stable')]
+        self.__entries = entries[max(len(entries) - self.maximum_entries,
+                                     0):]
+        self.__save()
+        number_of_evicted = number_of_entries - len(self.__entries)
+        return number_of_evicted
+
+    def getEntries(self):
+        """Return all calibrations.
+
+        Returns
+        -------
+        entries : ndarray
+            Calibrations with dtype entry_dtype, oldest first
+        """
+        entries = self.__entries.copy()
+        return entries
@@ -0,0 +1,346 @@
+"""Device manager of the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
+import asyncio
+import warnings
+from serial.tools import list_ports
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2 as pen
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Async as apa
+
+
+class Device_Manager:
+    """
+    A manager running several V2 light scattering detectors in parallel.
+
+    All devices are driven by the asyncio driver from one event loop, so
+    calibration and measurement run concurrently on all devices within one
+    process. Every device has its own result queue, where its calibration
+    values and measurements are put as soon as they are finished. A device
+    which fails is reported by a warning and left out of the following
+    steps until the next connect(), while the other devices keep running.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __serial_ports : list
+        Serial ports of the devices
+    __drivers : dict
+        Asyncio driver of every serial port
+    __devices : dict
+        Asyncio driver of every identified device by serial port
+    __identification : dict
+        Serial number, description and hardware id of the USB serial
+        converter of every identified device by serial port
+    __result_queues : dict
+        Result queue of every identified device by serial port
+    __errors : dict
+        Exception of every failed device by serial port
+    identification_timeout : float
+        Time in seconds a device has to answer the first request, otherwise
+        it is not taken as light scattering detector (default 2.0)
+
+    Methods
+    -------
+    connect()
+        Connects to all devices and identifies them
+    close()
+        Closes all devices
+    getDevices()
+        Returns the drivers of the identified devices
+    getIdentification()
+        Returns the identification of the devices
+    getResultQueue(serial_port)
+        Returns the result queue of a device
+    getErrors()
+        Returns the exceptions of the failed devices
+    calibrate(measurement_duration, sample_rate)
+        Calibrates all devices concurrently
+    measure(measurement_duration, sample_rate)
+        Measures with all devices concurrently
+    run(calibration_duration, measurement_duration, sample_rate)
+        Connects, calibrates, measures and closes all devices
+    """
+
+    identification_timeout = 2.0
+
+    def __init__(self, measurement_volume, total_turbidity_ratio_idle,
+                 serial_ports=None, baud_rate=9600):
+        """Init function.
+
+        Parameters
+        ----------
+        measurement_volume : int
+            Total measurement volume sucked up with the syringe in liter
+        total_turbidity_ratio_idle : float
+            Total turbidity ratio without mask
+        serial_ports : list
+            Serial ports of the devices. If None all ports found by
+            findSerialPorts() of the V2 module are used (default None)
+        baud_rate : int
+            baud rate of the serial port communication (default 9600)
+        """
+        if serial_ports is None:
+            serial_ports = pen.findSerialPorts()
+        if len(serial_ports) == 0:
+            raise ValueError("No device connected!")
+        self.__serial_ports = list(serial_ports)
+        self.__devices = {}
+        self.__identification = {}
+        self.__result_queues = {}
+        self.__errors = {}
+        self.__drivers = {}
+        for serial_port in self.__serial_ports:
+            self.__drivers[serial_port] = \
+                apa.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Async(
+                    measurement_volume, total_turbidity_ratio_idle,
+                    baud_rate=baud_rate, serial_port=serial_port)
+
+    async def __identify(self, serial_port):
+        """Connect to a device and check that it answers like a detector."""
+        device = self.__drivers[serial_port]
+        try:
+            await device.connect()
+            sample = await asyncio.wait_for(device.read(),
+                                            self.identification_timeout)
+            if len(sample) != 5:
+                raise ValueError("Unexpected reply " + str(sample))
+        except (OSError, ValueError, asyncio.TimeoutError) as error:
+            await device.close()
+            warnings.warn(serial_port + " is no light scattering detector: " +
+                          repr(error))
+            return
+        port_info = {}
+        for i in list_ports.comports():
+            if i.device == serial_port:
+                port_info = {'serial_number': i.serial_number,
+                             'description': i.description, 'hwid': i.hwid}
+        self.__identification[serial_port] = port_info
+        self.__devices[serial_port] = device
+        self.__result_queues[serial_port] = asyncio.Queue()
+
+    async def connect(self):
+        """Connect to all devices and identify them.
+
+        Devices which do not answer like a light scattering detector are
+        closed and left out with a warning. The errors of a former run are
+        cleared.
+
+        Returns
+        -------
+        devices : dict
+            Asyncio driver of every identified device by serial port
+        """
+        self.__errors = {}
+        await self.__gather(self.__serial_ports, self.__identify)
+        return self.getDevices()
+
+    async def close(self):
+        """Close all devices."""
+        # Also the devices which failed, closing is a no-op if not connected
+        await self.__gather(list(self.__drivers), self.__close)
+        self.__devices = {}
+
+    async def __close(self, serial_port):
+        """Close one device."""
+        await self.__drivers[serial_port].close()
+
+    async def __gather(self, serial_ports, function, *args):
+        """Run a coroutine function for every device concurrently.
+
+        The exception of a device is reported by a warning and kept as its
+        error, so it does not abort the other devices.
+
+        Parameters
+        ----------
+        serial_ports : list
+            Serial ports of the devices
+        function : callable
+            Coroutine function taking the serial port and the arguments
+        *args
+            Further arguments of the function
+
+        Returns
+        -------
+        results : dict
+            Result of every device which succeeded by serial port
+        """
+        outcomes = await asyncio.gather(
+            *[function(serial_port, *args) for serial_port in serial_ports],
+            return_exceptions=True)
+        results = {}
+        for serial_port, outcome in zip(serial_ports, outcomes):
+            if isinstance(outcome, Exception):
+                self.__errors[serial_port] = outcome
+                warnings.warn(serial_port + " failed: " + repr(outcome))
+            elif isinstance(outcome, BaseException):
+                # Cancellation and interrupts are not errors of the device
+                raise outcome
+            else:
+                results[serial_port] = outcome
+        return results
+
+    def __getWorkingPorts(self):
+        """Return the serial ports of the identified devices without error."""
+        serial_ports = [serial_port for serial_port in self.__devices
+                        if serial_port not in self.__errors]
+        return serial_ports
+
+    def getDevices(self):
+        """Return the drivers of the identified devices.
+
+        Returns
+        -------
+        devices : dict
+            Asyncio driver of every identified device by serial port
+        """
+        devices = dict(self.__devices)
+        return devices
+
+    def getIdentification(self):
+        """Return the identification of the devices.
+
+        Returns
+        -------
+        identification : dict
+            Serial number, description and hardware id of the USB serial
+            converter of every identified device by serial port. The values
+            are missing for ports which are no USB serial converters.
+        """
+        identification = dict(self.__identification)
+        return identification
+
+    def getResultQueue(self, serial_port):
+        """Return the result queue of a device.
+
+        The queue receives the tuples ('calibration', calibration_value) and
+        ('measurement', sample_store) as soon as the device finished.
+
+        Parameters
+        ----------
+        serial_port : str
+            Serial port of the device
+
+        Returns
+        -------
+        result_queue : asyncio.Queue
+            Result queue of the device
+        """
+        result_queue = self.__result_queues[serial_port]
+        return result_queue
+
+    def getErrors(self):
+        """Return the exceptions of the failed devices.
+
+        Returns
+        -------
+        errors : dict
+            Exception of every device which failed since the last connect()
+            by serial port
+        """
+        errors = dict(self.__errors)
+        return errors
+
+    async def __calibrate(self, serial_port, measurement_duration,
+                          sample_rate):
+        """Calibrate one device and put the result into its queue."""
+        calibration_value = await self.__devices[serial_port].calibrate(
+            measurement_duration, sample_rate)
+        await self.__result_queues[serial_port].put(('calibration',
+                                                     calibration_value))
+        return calibration_value
+
+    async def __measure(self, serial_port, measurement_duration,
+                        sample_rate):
+        """Measure with one device and put the result into its queue."""
+        sample_store = await self.__devices[serial_port].measure(
+            measurement_duration, sample_rate)
+        await self.__result_queues[serial_port].put(('measurement',
+                                                     sample_store))
+        return sample_store
+
+    async def calibrate(self, measurement_duration, sample_rate=None):
+        """Calibrate all devices concurrently.
+
+        Parameters
+        ----------
+        measurement_duration : float
+            Duration time of the calibration in seconds
+        sample_rate : int
+            Sample rate in Hz of the binary stream. If None every sample is
+            requested (default None)
+
+        Returns
+        -------
+        calibration_values : dict
+            Calibration value of every device which succeeded by serial port
+        """
+        calibration_values = await self.__gather(
+            self.__getWorkingPorts(), self.__calibrate, measurement_duration,
+            sample_rate)
+        return calibration_values
+
+    async def measure(self, measurement_duration, sample_rate=None):
+        """Measure with all devices concurrently.
+
+        Parameters
+        ----------
+        measurement_duration : float
+            Duration time of the measurement in seconds
+        sample_rate : int
+            Sample rate in Hz of the binary stream. If None every sample is
+            requested (default None)
+
+        Returns
+        -------
+        sample_stores : dict
+            Sample_Store of every device which succeeded by serial port
+        """
+        sample_stores = await self.__gather(
+            self.__getWorkingPorts(), self.__measure, measurement_duration,
+            sample_rate)
+        return sample_stores
+
+    def run(self, calibration_duration, measurement_duration,
+            sample_rate=None):
+        """Connect, calibrate, measure and close all devices.
+
+        Synchronous entry point for scripts, which runs its own event loop.
+
+        Parameters
+        ----------
+        calibration_duration : float
+            Duration time of the calibration in seconds
+        measurement_duration : float
+            Duration time of the measurement in seconds
+        sample_rate : int
+            Sample rate in Hz of the binary stream. If None every sample is
+            requested (default None)
+
+        Returns
+        -------
+        calibration_values : dict
+            Calibration value of every device which succeeded by serial port
+        sample_stores : dict
+            Sample_Store of every device which succeeded by serial port. The
+            exceptions of the other devices are returned by getErrors()
+        """
+        async def runAll():
+            await self.connect()
+            try:
+                calibration_values = await self.calibrate(
+                    calibration_duration, sample_rate)
+                sample_stores = await self.measure(measurement_duration,
+                                                   sample_rate)
+            finally:
+                await self.close()
+            return calibration_values, sample_stores
+        return asyncio.run(runAll())
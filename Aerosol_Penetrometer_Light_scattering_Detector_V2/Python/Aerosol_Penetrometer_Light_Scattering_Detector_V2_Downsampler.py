@@ -0,0 +1,181 @@
+"""Downsampler of the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
+import numpy as np
+
+
+class Downsampler:
+    """
+    A min/max envelope of a line for displaying, cached per zoom level.
+
+    The time axis is split into buckets of the width 2**level seconds, where
+    the zoom level is the smallest one giving at most bucket_count buckets in
+    the shown time range. Of every bucket only the samples with the minimum
+    and the maximum value are plotted, so peaks like the turbidity of the
+    smoke are kept, while the number of plotted points is bounded by twice
+    the bucket count instead of the number of samples. As the buckets are
+    aligned to multiples of their width, the complete buckets of every zoom
+    level are cached and a growing measurement only processes its new
+    samples. The measurement time has to be ascending. A measurement which
+    does not continue the one of the last call, recognized by its first and
+    its last known sample, clears the cache.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __bucket_count : int
+        Maximum number of buckets in the shown time range, for example the
+        width of the axes in pixels
+    __levels : dict
+        Cache of every zoom level: number of samples in complete buckets,
+        bucket number and array index of the points of the complete buckets
+    __number_of_samples : int
+        Number of samples of the last call
+    __first_time : float
+        Time of the first sample of the last call
+    __last_sample : tuple
+        Time and value of the last sample of the last call
+
+    Methods
+    -------
+    getIndices(measurement_time, values, time_range)
+        Returns the array indices of the points to plot
+    reset()
+        Clears the cache
+    """
+
+    def __init__(self, bucket_count=1000):
+        """Init function.
+
+        Parameters
+        ----------
+        bucket_count : int
+            Maximum number of buckets in the shown time range, for example
+            the width of the axes in pixels (default 1000)
+        """
+        self.__bucket_count = bucket_count
+        self.reset()
+
+    def reset(self):
+        """Clear the cache."""
+        self.__levels = {}
+        self.__number_of_samples = 0
+        self.__first_time = None
+        self.__last_sample = None
+
+    def __minMaxIndices(self, bucket, values):
+        """Return the array indices of the minimum and maximum of every bucket.
+
+        Parameters
+        ----------
+        bucket : ndarray
+            Ascending bucket number of every sample
+        values : ndarray
+            Value of every sample
+
+        Returns
+        -------
+        bucket_number : ndarray
+            Bucket number of every point, two points per bucket
+        indices : ndarray
+            Array index of every point, the minimum and the maximum of every
+            bucket in the order of the samples. The first sample is taken for
+            a bucket without valid value.
+        """
+        starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+        counts = np.diff(np.append(starts, len(bucket)))
+        extreme_indices = []
+        for reduce in [np.fmin, np.fmax]:
+            extreme = np.repeat(reduce.reduceat(values, starts), counts)
+            with np.errstate(invalid='ignore'):
+                candidates = np.flatnonzero((values == extreme) |
+                                            np.isnan(extreme))
+            # Keep the first candidate of every bucket
+            first = np.diff(bucket[candidates],
+                            prepend=bucket[candidates[0]] - 1) != 0
+            extreme_indices.append(candidates[first])
+        indices = np.empty(2*len(starts), np.int64)
+        indices[0::2] = np.minimum(*extreme_indices)
+        indices[1::2] = np.maximum(*extreme_indices)
+        bucket_number = np.repeat(bucket[starts], 2)
+        return bucket_number, indices
+
+    def getIndices(self, measurement_time, values, time_range=None):
+        """Return the array indices of the points to plot.
+
+        Parameters
+        ----------
+        measurement_time : float
+            Ascending measurement time in seconds, one value per sample
+        values : float
+            Value of the line, one value per sample
+        time_range : tuple
+            Shown time range (t_min, t_max), for example the x limits of the
+            axes. If None the whole measurement time is shown (default None)
+
+        Returns
+        -------
+        indices : ndarray
+            Ascending array indices of the points to plot, all samples in the
+            time range if they are not more than twice the bucket count. One
+            point beyond each end of the range is included, so the line
+            reaches the border of the axes.
+        """
+        measurement_time = np.asarray(measurement_time, np.float64)
+        values = np.asarray(values, np.float64)
+        if len(measurement_time) == 0:
+            return np.zeros(0, np.int64)
+        # A new or shortened measurement invalidates the cache
+        n = self.__number_of_samples
+        if n > 0 and (len(measurement_time) < n or
+                      measurement_time[0] != self.__first_time or
+                      measurement_time[n - 1] != self.__last_sample[0] or
+                      not np.array_equal(values[n - 1],
+                                         self.__last_sample[1],
+                                         equal_nan=True)):
+            self.reset()
+        self.__number_of_samples = len(measurement_time)
+        self.__first_time = measurement_time[0]
+        self.__last_sample = (measurement_time[-1], values[-1])
+        if time_range is None:
+            time_range = (measurement_time[0], measurement_time[-1])
+        start = np.searchsorted(measurement_time, time_range[0])
+        stop = np.searchsorted(measurement_time, time_range[1], 'right')
+        if stop - start <= 2*self.__bucket_count:
+            return np.arange(max(start - 1, 0),
+                             min(stop + 1, len(measurement_time)))
+        level = int(np.ceil(np.log2((time_range[1] - time_range[0]) /
+                                    self.__bucket_count)))
+        width = 2.0**level
+        processed, buckets, indices = self.__levels.get(
+            level, (0, np.zeros(0, np.int64), np.zeros(0, np.int64)))
+        # Only the samples after the complete buckets are processed
+        bucket = np.floor(measurement_time[processed:]/width).astype(np.int64)
+        new_buckets, new_indices = self.__minMaxIndices(
+            bucket, values[processed:])
+        new_indices += processed
+        # The last bucket may still grow, all others are complete
+        complete = new_buckets != bucket[-1]
+        buckets = np.concatenate([buckets, new_buckets[complete]])
+        indices = np.concatenate([indices, new_indices[complete]])
+        self.__levels[level] = (
+            processed + int(np.searchsorted(bucket, bucket[-1])), buckets,
+            indices)
+        # Points of the shown buckets and of one bucket beyond each end
+        first_bucket = np.floor(time_range[0]/width) - 1
+        last_bucket = np.floor(time_range[1]/width) + 1
+        first = np.searchsorted(buckets, first_bucket)
+        last = np.searchsorted(buckets, last_bucket, 'right')
+        indices = indices[first:last]
+        if first_bucket <= bucket[-1] <= last_bucket:
+            indices = np.concatenate([indices, new_indices[~complete]])
+        return indices
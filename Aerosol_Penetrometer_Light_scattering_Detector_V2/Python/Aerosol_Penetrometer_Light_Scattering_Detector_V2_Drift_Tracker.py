@@ -0,0 +1,123 @@
+"""Drift tracker of the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
+import numpy as np
+
+
+class Drift_Tracker:
+    """
+    An exponentially weighted baseline of several channels over time.
+
+    Every sample moves the baseline towards its values by the weight
+    1 - exp(-dt/time_constant), where dt is the time since the previous
+    sample. So the baseline follows the drift with the same time constant at
+    any sample rate, also across gaps like the measurements, while the noise
+    of the single samples is averaged out. The first sample sets the
+    baseline.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __time_constant : float
+        Time constant in seconds of the exponential weighting
+    __number_of_samples : int
+        Number of samples
+    __baseline : ndarray
+        Exponentially weighted baseline of every channel
+    __last_time : float
+        Time of the last sample
+
+    Methods
+    -------
+    append(measurement_time, values)
+        Updates the baseline by a block of samples
+    getBaseline()
+        Returns the baseline of every channel
+    getDrift(reference)
+        Returns the difference between the baseline and a reference
+    """
+
+    def __init__(self, number_of_channels, time_constant=60.0):
+        """Init function.
+
+        Parameters
+        ----------
+        number_of_channels : int
+            Number of channels
+        time_constant : float
+            Time constant in seconds of the exponential weighting
+            (default 60.0)
+        """
+        self.__time_constant = time_constant
+        self.__number_of_samples = 0
+        self.__baseline = np.full(number_of_channels, np.nan)
+        self.__last_time = None
+
+    def __len__(self):
+        """Return the number of samples."""
+        return self.__number_of_samples
+
+    def append(self, measurement_time, values):
+        """Update the baseline by a block of samples.
+
+        Parameters
+        ----------
+        measurement_time : float
+            Measurement time in seconds, one value per sample
+        values : float
+            Values of the channels, one row per sample and one column per
+            channel
+        """
+        measurement_time = np.asarray(measurement_time, np.float64)
+        values = np.asarray(values, np.float64).reshape(
+            len(measurement_time), len(self.__baseline))
+        for t, value in zip(measurement_time, values):
+            # Samples with invalid values do not move the baseline
+            if not np.all(np.isfinite(value)):
+                continue
+            if self.__last_time is None:
+                self.__baseline = value.copy()
+            else:
+                weight = -np.expm1(-max(t - self.__last_time, 0.0) /
+                                   self.__time_constant)
+                self.__baseline += weight*(value - self.__baseline)
+            self.__last_time = t
+            self.__number_of_samples += 1
+
+    def getBaseline(self):
+        """Return the baseline of every channel.
+
+        Returns
+        -------
+        baseline : ndarray
+            Exponentially weighted baseline of every channel, NaN without
+            samples
+        """
+        baseline = self.__baseline.copy()
+        return baseline
+
+    def getDrift(self, reference):
+        """Return the difference between the baseline and a reference.
+
+        Parameters
+        ----------
+        reference : float
+            Reference value of every channel, for example the calibration
+            value
+
+        Returns
+        -------
+        drift : ndarray
+            Baseline minus reference of every channel, NaN without samples
+        """
+        drift = self.__baseline - np.asarray(reference, np.float64)
+        return drift
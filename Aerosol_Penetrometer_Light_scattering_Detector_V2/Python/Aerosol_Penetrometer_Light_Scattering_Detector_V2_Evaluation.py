@@ -0,0 +1,259 @@
+"""Evaluation of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+The functions work on whole recordings at once: every input may be a single
+sample or an array with one row per sample. They do not need a connected
+device, so the same functions serve the live measurement and the offline
+evaluation of recorded measurements.
+
+Author
+------
+Sebastian Lifka
+
+Created
+-------
+Oct 17 2026
+
+Modified
+--------
+Oct 17 2026
+"""
+import numpy as np
+
+# If the two turbidity values are samller than epsilon, which means both
+# turbiditys are nearly equal the turbidity ratio is set to 1 to avoid devide
+# by zero and excessive fluctuations of the ratio
+epsilon = 5e-3
+# Typical pressure derivation in mbar between two samples due to noise, a
+# larger derivation marks the start or stop of the flow
+pressure_noise_derivation = 0.1
+
+
+def calculateTurbidity(transistor_voltage, calibration_value):
+    """Calculate the turbidity values before and after the mask.
+
+    Parameters
+    ----------
+    transistor_voltage : float
+        Voltage values in volts of the photo transistors, one row per sample
+        in order: [Before90° Before180° After90° After180°]
+    calibration_value : float
+        Offset value of the turbidity before and after the mask in order:
+        [Before After ...]
+
+    Returns
+    -------
+    turbidity : ndarray
+        Turbidity value (90°signal/180°signal) before and after the mask, one
+        row per sample in order: [Before After]. Negative values are set to
+        zero.
+    """
+    transistor_voltage = np.asarray(transistor_voltage, np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Correct the turbidity values by the calibration offset
+        turbidity = transistor_voltage[..., 0::2] / \
+            transistor_voltage[..., 1::2] - \
+            np.asarray(calibration_value[0:2], np.float64)
+    turbidity = np.round(turbidity, 3)
+    turbidity[turbidity < 0] = 0.000
+    return turbidity
+
+
+def calculateTurbidityRatio(turbidity):
+    """Calculate the turbidity ratio before and after the mask.
+
+    Parameters
+    ----------
+    turbidity : float
+        Turbidity value (90°signal/180°signal) before and after the mask, one
+        row per sample in order: [Before After]
+
+    Returns
+    -------
+    turbidity_ratio : ndarray
+        Ratio between the turbidity before and after the mask, one value per
+        sample
+    """
+    turbidity = np.asarray(turbidity, np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        turbidity_ratio = np.round(turbidity[..., 1]/turbidity[..., 0], 3)
+    idle = (turbidity[..., 0] < epsilon) & (turbidity[..., 1] < epsilon)
+    turbidity_ratio = np.where(idle, 1.000, turbidity_ratio)
+    return turbidity_ratio
+
+
+def evaluateMeasurement(total_turbidity_ratio, total_turbidity_ratio_idle):
+    """Calculate the filtered particle percentage of the samples.
+
+    Parameters
+    ----------
+    total_turbidity_ratio : float
+        Ratio of the total, integrated trubidity values before and after the
+        sample, one value per measurement
+    total_turbidity_ratio_idle : float
+        Total turbidity ratio without mask
+
+    Returns
+    -------
+    filtered_percentage : ndarray
+        Filtered particle percentage
+    penetration_percentage : ndarray
+        Particle penetration percentage
+    """
+    total_turbidity_ratio = np.asarray(total_turbidity_ratio, np.float64)
+    filtered_percentage = np.round(
+        (1.000 - total_turbidity_ratio/total_turbidity_ratio_idle)*100, 1)
+    penetration_percentage = np.round(
+        total_turbidity_ratio/total_turbidity_ratio_idle*100, 1)
+    return filtered_percentage, penetration_percentage
+
+
+def calculateFlowRate(pressure, measurement_time, measurement_volume,
+                      pressure_noise_derivation=pressure_noise_derivation):
+    """Calculate the flow rate in l/min and the flow time in seconds.
+
+    Parameters
+    ----------
+    pressure : float
+        Relative pressure after the mask in mbar, one value per sample
+    measurement_time : float
+        Measurement time in seconds, one value per sample
+    measurement_volume : float
+        Total measurement volume sucked up with the syringe in liter
+    pressure_noise_derivation : float
+        Typical pressure derivation in mbar between two samples due to noise
+        (default 0.1)
+
+    Returns
+    -------
+    flow_rate : float
+        Flow rate in l/min, NaN if the flow time is not positive
+    flow_time : float
+        Duration of the flow in seconds
+    start_ind : int
+        Array index of flow start
+    stop_ind : int
+        Array index of flow stop
+    """
+    pressure_derivation = np.diff(np.asarray(pressure, np.float64))
+    with np.errstate(invalid='ignore'):
+        ind = np.flatnonzero(abs(pressure_derivation) >
+                             pressure_noise_derivation)
+    if np.size(ind) == 0:
+        return 0.000, 0.000, 0, np.size(measurement_time)
+    start_ind = int(ind[0])
+    stop_ind = int(np.argmax(pressure_derivation)) + 1
+    flow_time = float(measurement_time[stop_ind] -
+                      measurement_time[start_ind])
+    # Repeated time stamps or stop at the start give no flow time
+    if flow_time <= 0:
+        return np.nan, round(flow_time, 2), start_ind, stop_ind
+    flow_rate = round(measurement_volume/flow_time*60, 3)
+    return flow_rate, round(flow_time, 2), start_ind, stop_ind
+
+
+def integrateTurbidity(turbidity, measurement_time, start_ind=0,
+                       stop_ind=None):
+    """Integrate the turbidity values before and after the mask over time.
+
+    Integration is done by using the trapezoidal rule on the time stamps of
+    the samples, which are not necessarily uniformly spaced.
+
+    Parameters
+    ----------
+    turbidity : float
+        Turbidity value (90°signal/180°signal) before and after the mask, one
+        row per sample in order: [Before After]
+    measurement_time : float
+        Measurement time in seconds, one value per sample
+    start_ind : int
+        Array index of the first sample (default 0)
+    stop_ind : int
+        Array index after the last sample, None for all samples (default
+        None)
+
+    Returns
+    -------
+    total_turbidity : ndarray
+        Integrated turbidity values over time in order: [Before After]
+    """
+    turbidity = np.asarray(turbidity)[start_ind:stop_ind]
+    measurement_time = np.asarray(measurement_time)[start_ind:stop_ind]
+    total_turbidity = np.round(np.trapz(turbidity, measurement_time, axis=0),
+                               3)
+    return total_turbidity
+
+
+def calculateTotalTurbidityRatio(total_turbidity):
+    """Calculate ratio of total turbidities before and after the mask.
+
+    Parameters
+    ----------
+    total_turbidity : float
+        Integrated turbidity values over time in order: [Before After], or an
+        array with one row per measurement
+
+    Returns
+    -------
+    total_turbidity_ratio : ndarray
+        Ratio of the total, integrated trubidity values before and after the
+        sample
+    """
+    total_turbidity = np.asarray(total_turbidity, np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total_turbidity_ratio = np.round(
+            total_turbidity[..., 1]/total_turbidity[..., 0], 3)
+    return total_turbidity_ratio
+
+
+def integratePressure(pressure, measurement_time, start_ind=0,
+                      stop_ind=None):
+    """Integrate the relative pressure over time.
+
+    Integration is done by using the trapezoidal rule on the time stamps of
+    the samples.
+
+    Parameters
+    ----------
+    pressure : float
+        Relative pressure after the mask in mbar, one value per sample
+    measurement_time : float
+        Measurement time in seconds, one value per sample
+    start_ind : int
+        Array index of the first sample (default 0)
+    stop_ind : int
+        Array index after the last sample, None for all samples (default
+        None)
+
+    Returns
+    -------
+    total_pressure : float
+        Negative relative pressure integrated over time in mbar s
+    """
+    total_pressure = round(float(np.trapz(
+        np.asarray(pressure)[start_ind:stop_ind],
+        np.asarray(measurement_time)[start_ind:stop_ind])), 3)*-1
+    return total_pressure
+
+
+def calculateBreathingResistance(total_pressure, measurement_volume):
+    """Calculate the breathing resistance in mbar/l/min.
+
+    Parameters
+    ----------
+    total_pressure : float
+        Negative relative pressure integrated over time in mbar s
+    measurement_volume : float
+        Total measurement volume sucked up with the syringe in liter
+
+    Returns
+    -------
+    breathing_resistance : float
+        Breathing resistance of the mask in mbar/l/min
+    equivalent_breathing_resistance : float
+        Aquivalent breathing resistance in mbar @ 30 l/min as it is specified
+        in EN149
+    """
+    breathing_resistance = round((total_pressure/60)/measurement_volume, 3)
+    # Equivalent br. res. with smoke
+    equivalent_breathing_resistance = round(breathing_resistance/6 - 1, 3)
+    return breathing_resistance, equivalent_breathing_resistance
@@ -0,0 +1,244 @@
+"""Flow detector of the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
+import numpy as np
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Evaluation as evl
+
+
+class Flow_Detector:
+    """
+    An online detector of the flow start and stop in the pressure signal.
+
+    The detector follows the rules of calculateFlowRate() on the streamed
+    pressure: the flow starts at the first pressure derivation above the
+    noise derivation and stops after the largest positive derivation, when
+    the pressure rises back after the syringe is empty. Both indices equal
+    the ones of calculateFlowRate() on all samples received so far. The stop
+    is only confirmed, when the pressure dropped by at least the minimum
+    drop, recovered at least half of its drop and no derivation exceeded the
+    noise derivation for the hold-off time. So neither a noise spike before
+    the flow nor a bouncing syringe ends the measurement.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __pressure_noise_derivation : float
+        Typical pressure derivation in mbar between two samples due to noise
+    __hold_off : float
+        Time in seconds without pressure jump before the stop is confirmed
+    __minimum_drop : float
+        Minimum pressure drop in mbar of a flow
+    __number_of_samples : int
+        Number of received samples
+    __last_time : float
+        Time of the last sample
+    __last_pressure : float
+        Pressure of the last sample
+    __start_ind : int
+        Array index of the flow start, None before the flow
+    __start_time : float
+        Time of the flow start
+    __start_pressure : float
+        Pressure at the flow start
+    __max_drop : float
+        Largest pressure drop below the pressure at the flow start
+    __max_derivation : float
+        Largest pressure derivation between two samples
+    __stop_ind : int
+        Array index of the flow stop, after the largest derivation
+    __stop_time : float
+        Time of the flow stop
+    __jump_time : float
+        Time of the last derivation above the noise derivation
+
+    Methods
+    -------
+    append(measurement_time, pressure)
+        Processes a block of samples
+    isStarted()
+        Returns True if the flow started
+    isStopped()
+        Returns True if the flow stop is confirmed
+    getStartStop()
+        Returns the array indices of flow start and stop
+    getStopTime()
+        Returns the time of the confirmed flow stop
+    getFlowRate(measurement_volume)
+        Returns flow rate, flow time, start and stop index
+    """
+
+    def __init__(self, hold_off=0.5, minimum_drop=0.5,
+                 pressure_noise_derivation=evl.pressure_noise_derivation):
+        """Init function.
+
+        Parameters
+        ----------
+        hold_off : float
+            Time in seconds without pressure jump before the stop is
+            confirmed (default 0.5)
+        minimum_drop : float
+            Minimum pressure drop in mbar of a flow (default 0.5)
+        pressure_noise_derivation : float
+            Typical pressure derivation in mbar between two samples due to
+            noise (default 0.1)
+        """
+        self.__pressure_noise_derivation = pressure_noise_derivation
+        self.__hold_off = hold_off
+        self.__minimum_drop = minimum_drop
+        self.__number_of_samples = 0
+        self.__last_time = None
+        self.__last_pressure = None
+        self.__start_ind = None
+        self.__start_time = None
+        self.__start_pressure = None
+        self.__max_drop = 0.0
+        self.__max_derivation = -np.inf
+        self.__stop_ind = None
+        self.__stop_time = None
+        self.__jump_time = None
+
+    def append(self, measurement_time, pressure):
+        """Process a block of samples.
+
+        Parameters
+        ----------
+        measurement_time : float
+            Measurement time in seconds, one value per sample
+        pressure : float
+            Relative pressure after the mask in mbar, one value per sample
+        """
+        measurement_time = np.asarray(measurement_time, np.float64)
+        pressure = np.asarray(pressure, np.float64)
+        if len(pressure) == 0:
+            return
+        offset = self.__number_of_samples
+        self.__number_of_samples += len(pressure)
+        if self.__last_time is not None:
+            # Continue with the derivation from the last sample
+            measurement_time = np.append(self.__last_time, measurement_time)
+            pressure = np.append(self.__last_pressure, pressure)
+            offset -= 1
+        # Derivation k lies between the samples offset + k and offset + k + 1
+        derivation = np.diff(pressure)
+        self.__last_time = measurement_time[-1]
+        self.__last_pressure = pressure[-1]
+        if len(derivation) == 0:
+            return
+        with np.errstate(invalid='ignore'):
+            jumps = np.flatnonzero(abs(derivation) >
+                                   self.__pressure_noise_derivation)
+        first = 0
+        if len(jumps) > 0:
+            if self.__start_ind is None:
+                first = int(jumps[0])
+                self.__start_ind = offset + first
+                self.__start_time = measurement_time[jumps[0]]
+                self.__start_pressure = pressure[jumps[0]]
+            self.__jump_time = measurement_time[jumps[-1] + 1]
+        k = int(np.argmax(derivation))
+        # The first largest derivation is kept like np.argmax() does
+        if derivation[k] > self.__max_derivation:
+            self.__max_derivation = derivation[k]
+            self.__stop_ind = offset + k + 1
+            self.__stop_time = measurement_time[k + 1]
+        if self.__start_ind is not None:
+            self.__max_drop = max(self.__max_drop, float(np.nanmax(
+                self.__start_pressure - pressure[first:])))
+
+    def isStarted(self):
+        """Return True if the flow started.
+
+        Returns
+        -------
+        started : bool
+            True if a pressure derivation exceeded the noise derivation
+        """
+        started = self.__start_ind is not None
+        return started
+
+    def isStopped(self):
+        """Return True if the flow stop is confirmed.
+
+        Returns
+        -------
+        stopped : bool
+            True if the pressure dropped by at least the minimum drop, rose
+            back, recovered at least half of its drop and stayed without
+            jump for the hold-off time
+        """
+        stopped = bool(
+            self.__start_ind is not None and
+            self.__stop_ind > self.__start_ind and
+            self.__max_drop >= self.__minimum_drop and
+            self.__max_derivation > self.__pressure_noise_derivation and
+            self.__start_pressure - self.__last_pressure <
+            self.__max_drop/2 and
+            self.__last_time - self.__jump_time >= self.__hold_off)
+        return stopped
+
+    def getStartStop(self):
+        """Return the array indices of flow start and stop.
+
+        Returns
+        -------
+        start_ind : int
+            Array index of flow start, 0 if no flow was detected
+        stop_ind : int
+            Array index of flow stop, the number of samples if no flow was
+            detected
+        """
+        if self.__start_ind is None:
+            return 0, self.__number_of_samples
+        return self.__start_ind, self.__stop_ind
+
+    def getStopTime(self):
+        """Return the time of the confirmed flow stop.
+
+        Returns
+        -------
+        stop_time : float
+            Measurement time of the flow stop in seconds, None if the stop is
+            not confirmed
+        """
+        stop_time = self.__stop_time if self.isStopped() else None
+        return stop_time
+
+    def getFlowRate(self, measurement_volume):
+        """Return flow rate, flow time, start and stop index.
+
+        The values equal the ones of calculateFlowRate() on all samples
+        received so far.
+
+        Parameters
+        ----------
+        measurement_volume : float
+            Total measurement volume sucked up with the syringe in liter
+
+        Returns
+        -------
+        flow_rate : float
+            Flow rate in l/min, NaN if the flow time is not positive
+        flow_time : float
+            Duration of the flow in seconds
+        start_ind : int
+            Array index of flow start
+        stop_ind : int
+            Array index of flow stop
+        """
+        start_ind, stop_ind = self.getStartStop()
+        if self.__start_ind is None:
+            return 0.000, 0.000, start_ind, stop_ind
+        flow_time = float(self.__stop_time - self.__start_time)
+        if flow_time <= 0:
+            return np.nan, round(flow_time, 2), start_ind, stop_ind
+        flow_rate = round(measurement_volume/flow_time*60, 3)
+        return flow_rate, round(flow_time, 2), start_ind, stop_ind
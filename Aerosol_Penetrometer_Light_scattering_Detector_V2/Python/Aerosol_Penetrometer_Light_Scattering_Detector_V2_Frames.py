@@ -0,0 +1,215 @@
+"""Binary frames of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+In the binary stream the arduino sends one frame of 18 bytes per sample
+(little endian):
+
+    0xAA 0x55 | uint16 sample number | 4x uint16 ADC values | uint32 pressure
+    | uint16 CRC
+
+The ADC values are the raw 10 bit values in order
+[Before90° Before180° After90° After180°], the pressure is given in Pa/256
+and the CRC-16/CCITT-FALSE is calculated over the first 16 bytes. Whole
+buffers of frames are decoded at once with a structured NumPy data type.
+
+Author
+------
+Sebastian Lifka
+
+Created
+-------
+Oct 17 2026
+
+Modified
+--------
+Oct 17 2026
+"""
+import numpy as np
+
+frame_dtype = np.dtype([('sync', '<u2'), ('sample_number', '<u2'),
+                        ('transistor_value', '<u2', 4), ('pressure', '<u4'),
+                        ('crc', '<u2')])
+frame_size = frame_dtype.itemsize
+sync = 0x55AA  # Sync bytes 0xAA 0x55 read as little endian uint16
+
+
+def __crcTable():
+    """Return the lookup table of the CRC-16/CCITT-FALSE."""
+    crc_table = np.arange(256, dtype=np.uint16) << 8
+    for i in range(8):
+        crc_table = np.where(crc_table & 0x8000, (crc_table << 1) ^ 0x1021,
+                             crc_table << 1).astype(np.uint16)
+    return crc_table
+
+
+crc_table = __crcTable()
+
+
+def calculateCrc(data):
+    """Calculate the CRC-16/CCITT-FALSE of many byte strings at once.
+
+    Parameters
+    ----------
+    data : ndarray
+        Bytes (uint8), one row per byte string
+
+    Returns
+    -------
+    crc : ndarray
+        CRC of every row (uint16)
+    """
+    data = np.atleast_2d(data)
+    crc = np.full(len(data), 0xFFFF, np.uint16)
+    for i in range(data.shape[1]):
+        crc = (crc << 8) ^ crc_table[(crc >> 8) ^ data[:, i]]
+    return crc
+
+
+def encodeFrames(sample_number, transistor_value, pressure):
+    """Encode samples into binary frames like the arduino does.
+
+    Parameters
+    ----------
+    sample_number : int
+        Sample numbers, one value per sample
+    transistor_value : int
+        Raw 10 bit ADC values of the photo transistors, one row per sample
+    pressure : float
+        Absolute pressure after the mask in mbar, one value per sample
+
+    Returns
+    -------
+    buffer : bytes
+        Binary frames of the samples
+    """
+    frames = np.zeros(np.size(sample_number), frame_dtype)
+    frames['sync'] = sync
+    frames['sample_number'] = np.asarray(sample_number) % 65536
+    frames['transistor_value'] = transistor_value
+    frames['pressure'] = np.round(np.asarray(pressure)*1e2*256)
+    frame_bytes = frames.view(np.uint8).reshape(-1, frame_size)
+    frames['crc'] = calculateCrc(frame_bytes[:, :frame_size - 2])
+    buffer = frames.tobytes()
+    return buffer
+
+
+def decodeFrames(buffer):
+    """Decode all complete frames of a buffer.
+
+    If the buffer consists of aligned, valid frames only, the frames are a
+    view on the buffer. Otherwise the frames are searched by the sync bytes
+    and their CRC. The bytes skipped between the valid frames are counted as
+    corrupted frames in whole frame lengths, so also frames with a disturbed
+    sync byte are counted.
+
+    Parameters
+    ----------
+    buffer : bytes
+        Received bytes
+
+    Returns
+    -------
+    frames : ndarray
+        Valid frames (frame_dtype)
+    rest : bytes
+        Bytes after the last valid frame, which may belong to an incomplete
+        frame and have to be put in front of the next buffer
+    corrupted_frames : int
+        Number of frames lost by corruption
+    """
+    number_of_frames = len(buffer) // frame_size
+    # Fast path: the buffer starts with a frame and contains only frames
+    if number_of_frames > 0:
+        frames = np.frombuffer(buffer, frame_dtype, number_of_frames)
+        frame_bytes = np.frombuffer(
+            buffer, np.uint8, number_of_frames*frame_size).reshape(
+                -1, frame_size)
+        if (np.all(frames['sync'] == sync) and
+                np.all(calculateCrc(frame_bytes[:, :frame_size - 2]) ==
+                       frames['crc'])):
+            rest = buffer[number_of_frames*frame_size:]
+            return frames, rest, 0
+    data = np.frombuffer(buffer, np.uint8)
+    candidates = np.flatnonzero((data[:-1] == 0xAA) & (data[1:] == 0x55))
+    candidates = candidates[candidates + frame_size <= len(data)]
+    frame_bytes = data[candidates[:, None] + np.arange(frame_size)]
+    crc = frame_bytes[:, -2].astype(np.uint16) | \
+        (frame_bytes[:, -1].astype(np.uint16) << 8)
+    valid = calculateCrc(frame_bytes[:, :frame_size - 2]) == crc
+    starts = candidates[valid]
+    frames = frame_bytes[valid].copy().view(frame_dtype).ravel()
+    # Skipped bytes before every valid frame, a gap shorter than a frame is
+    # the rest of a shortened frame
+    ends = np.concatenate([[0], starts[:-1] + frame_size])
+    gaps = np.maximum(starts - ends, 0)
+    corrupted_frames = int(np.sum(-(-gaps // frame_size)))
+    if np.size(starts):
+        end = starts[-1] + frame_size
+    else:
+        end = 0
+    # Skip the bytes after the last valid frame only in whole frame lengths
+    # and keep the bytes which may belong to an incomplete frame, the rest
+    # of the gap is counted with the next buffer
+    skipped_frames = max(len(data) - frame_size + 1 - end, 0) // frame_size
+    corrupted_frames += skipped_frames
+    rest = buffer[end + skipped_frames*frame_size:]
+    return frames, rest, corrupted_frames
+
+
+def convertFrames(frames):
+    """Convert frames into voltages and pressure.
+
+    Parameters
+    ----------
+    frames : ndarray
+        Frames (frame_dtype)
+
+    Returns
+    -------
+    data : ndarray
+        Voltage values in volts of the photo transistors and pressure values
+        in mbar, one row per frame in order:
+        [Before90° Before180° After90° After180° Pressure]
+    """
+    data = np.empty((len(frames), 5))
+    data[:, 0:4] = frames['transistor_value']*(5.0/1023.0)
+    data[:, 4] = frames['pressure']/256*1e-2
+    return data
+
+
+def calculateSampleTime(sample_number, last_sample_number, arrival_time,
+                        sample_period):
+    """Calculate the time of streamed samples arrived at once.
+
+    The time of the last sample is the arrival time, the time of the other
+    samples is calculated back by the sample numbers and the sample period.
+    The sample numbers are compared modulo 65536 like the 16 bit sample
+    numbers of the frames.
+
+    Parameters
+    ----------
+    sample_number : ndarray
+        Sample numbers of the samples
+    last_sample_number : int
+        Sample number of the previous sample, None for the first samples
+    arrival_time : float
+        Monotonic time in seconds when the samples arrived
+    sample_period : float
+        Sample period of the stream in seconds
+
+    Returns
+    -------
+    sample_time : ndarray
+        Monotonic time of the samples in seconds
+    dropped_samples : int
+        Number of sample numbers missing since the previous sample
+    """
+    sample_number = np.asarray(sample_number, np.int64)
+    if len(sample_number) == 0:
+        return np.zeros(0), 0
+    if last_sample_number is None:
+        last_sample_number = sample_number[0] - 1
+    steps = np.diff(sample_number, prepend=last_sample_number) % 65536
+    dropped_samples = int(np.sum(np.maximum(steps - 1, 0)))
+    samples_before_last = np.cumsum(steps[::-1])[::-1] - steps
+    sample_time = arrival_time - samples_before_last*sample_period
+    return sample_time, dropped_samples
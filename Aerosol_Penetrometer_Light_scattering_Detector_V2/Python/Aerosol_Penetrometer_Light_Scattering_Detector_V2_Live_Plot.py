@@ -0,0 +1,293 @@
+"""Live plot of the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
+import numpy as np
+import matplotlib.pyplot as plt
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Downsampler as dsp
+
+
+class Live_Plot:
+    """
+    A persistent live plot of the measurement values.
+
+    The axes, titles, legends and line artists are created once. Every update
+    only sets the new data of the lines and blits them onto the saved
+    background, so the cost of a frame does not depend on the axes
+    decoration. The axes are rescaled, followed by one full redraw, only when
+    the data leave the current limits. Every line only shows the min/max
+    envelope of the samples in the shown time range, so the number of plotted
+    points is bounded by the width of the figure in pixels. After the live
+    update is stopped, the envelope is refined when the axes are zoomed.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __figure : Figure
+        Figure of the live plot
+    __axes : list
+        Axes of the pressure, the photo transistor voltages and the turbidity
+    __lines : list
+        Line artists of each axes
+    __downsamplers : list
+        Downsampler of every line of each axes
+    __data : list
+        Measurement time and the values of every line of each axes
+    __text : Text
+        Text artist in the pressure axes, for example for the live estimate
+    __limits : ndarray
+        Minimum and maximum of the plotted data of each axes in order:
+        [[t_min t_max y_min y_max]...]
+    __number_of_samples : int
+        Number of samples already included in the limits
+    __background : object
+        Saved background of the figure without the lines
+    __calibrated : bool
+        True if the values are corrected by the calibration value
+
+    Methods
+    -------
+    update(measurement_time, transistor_voltage, turbidity, turbidity_ratio,
+           pressure)
+        Updates the lines with the measurement values
+    setText(text)
+        Sets the text shown in the pressure axes
+    stop()
+        Stops the live update and draws the lines statically
+    isOpen()
+        Returns True if the figure is still open
+    getCalibrated()
+        Returns True if the plot shows calibrated values
+    """
+
+    # Relative margin added to the limits when the axes are rescaled
+    margin = 0.2
+
+    def __init__(self, calibrated):
+        """Init function.
+
+        Parameters
+        ----------
+        calibrated : bool
+            True if the values are corrected by the calibration value
+        """
+        plt.ion()  # Enable plot live update
+        self.__calibrated = calibrated
+        self.__figure = plt.gcf()
+        self.__figure.clf()
+        self.__axes = [self.__figure.add_subplot(311),
+                       self.__figure.add_subplot(312),
+                       self.__figure.add_subplot(313)]
+        self.__lines = [self.__axes[0].plot([], [], animated=True),
+                        self.__axes[1].plot(np.zeros((0, 4)),
+                                            np.zeros((0, 4)), animated=True),
+                        self.__axes[2].plot(np.zeros((0, 3)),
+                                            np.zeros((0, 3)), animated=True)]
+        # One bucket of the envelope per pixel of the figure width
+        width = int(self.__figure.get_figwidth()*self.__figure.dpi)
+        self.__downsamplers = [[dsp.Downsampler(width) for line in lines]
+                               for lines in self.__lines]
+        self.__data = [None, None, None]
+        self.__text = self.__axes[0].text(0.01, 0.95, "", va='top',
+                                          transform=self.__axes[0].transAxes,
+                                          animated=True)
+        if not calibrated:
+            self.__axes[0].set_title("Absolute pressure after mask")
+            self.__axes[0].set_ylabel("Absolute pressure in mbar")
+            self.__axes[2].set_title("Turbidity and turbidity ratio " +
+                                     "(before/after mask)")
+            self.__axes[2].set_ylabel("Turbidity, turbidity ratio")
+        else:
+            self.__axes[0].set_title("Relative pressure after mask")
+            self.__axes[0].set_ylabel("Relative pressure in mbar")
+            self.__axes[2].set_title("Corrected turbidity and turbidity " +
+                                     "ratio (before/after mask)")
+            self.__axes[2].set_ylabel("Corrected turbidity, turbidity ratio")
+        self.__axes[1].set_title("Photo transistor voltage")
+        self.__axes[1].set_ylabel("Photo transistor voltage in V")
+        self.__axes[1].legend(["Before 90°", "Before 180°", "After 90°",
+                               "After 180°"])
+        self.__axes[2].legend(["Before", "After", "Ratio"])
+        for ax in self.__axes:
+            ax.grid(True)
+            ax.set_xlabel("Time in s")
+        self.__limits = np.tile([np.inf, -np.inf, np.inf, -np.inf], (3, 1))
+        self.__number_of_samples = 0
+        self.__figure.tight_layout()
+        self.__redraw()
+        plt.show(block=False)
+
+    def __redraw(self):
+        """Draw the whole figure and save the background without lines."""
+        self.__figure.canvas.draw()
+        self.__background = self.__figure.canvas.copy_from_bbox(
+            self.__figure.bbox)
+
+    def __rescale(self, values):
+        """Extend the limits by the new values.
+
+        Parameters
+        ----------
+        values : list
+            New time and y values of each axes in order: [[t, y]...]
+
+        Returns
+        -------
+        rescale : bool
+            True if the new values left the current limits of any axes
+        """
+        rescale = False
+        for i, (t, y) in enumerate(values):
+            y = y[np.isfinite(y)]
+            if np.size(t) == 0 or np.size(y) == 0:
+                continue
+            first_data = not np.isfinite(self.__limits[i, 0])
+            new_limits = [min(self.__limits[i, 0], np.min(t)),
+                          max(self.__limits[i, 1], np.max(t)),
+                          min(self.__limits[i, 2], np.min(y)),
+                          max(self.__limits[i, 3], np.max(y))]
+            self.__limits[i] = new_limits
+            x_lim = self.__axes[i].get_xlim()
+            y_lim = self.__axes[i].get_ylim()
+            if (first_data or new_limits[0] < x_lim[0] or
+                    new_limits[1] > x_lim[1] or new_limits[2] < y_lim[0] or
+                    new_limits[3] > y_lim[1]):
+                t_range = max(new_limits[1] - new_limits[0], 1.0)
+                y_range = max(new_limits[3] - new_limits[2], 1e-2)
+                self.__axes[i].set_xlim(new_limits[0],
+                                        new_limits[1] + self.margin*t_range)
+                self.__axes[i].set_ylim(new_limits[2] - self.margin*y_range,
+                                        new_limits[3] + self.margin*y_range)
+                rescale = True
+        return rescale
+
+    def update(self, measurement_time, transistor_voltage, turbidity,
+               turbidity_ratio, pressure):
+        """Update the lines with the measurement values.
+
+        Parameters
+        ----------
+        measurement_time : float
+            Measurement time in seconds
+        transistor_voltage : float
+            Voltage values in volts of the photo transistors in order:
+            [Before90° Before180° After90° After180°]
+        turbidity : float
+            Turbidity value (90°signal/180°signal) before and after the mask in
+            order: [Before After]
+        turbidity_ratio : float
+            Ratio between the turbidity before and after the mask
+        pressure : float
+            Relative pressure after the mask in mbar
+        """
+        measurement_time = np.asarray(measurement_time)
+        transistor_voltage = np.asarray(transistor_voltage)
+        turbidity = np.asarray(turbidity)
+        turbidity_ratio = np.asarray(turbidity_ratio)
+        pressure = np.asarray(pressure)
+        # Only the samples added since the last update can change the limits
+        n = min(self.__number_of_samples, len(measurement_time))
+        rescale = self.__rescale(
+            [[measurement_time[n:], pressure[n:]],
+             [measurement_time[n:], transistor_voltage[n:]],
+             [measurement_time[n:], np.append(turbidity[n:].ravel(),
+                                              turbidity_ratio[n:])]])
+        self.__number_of_samples = len(measurement_time)
+        self.__data = [[measurement_time, [pressure]],
+                       [measurement_time, transistor_voltage.T],
+                       [measurement_time, [turbidity[:, 0], turbidity[:, 1],
+                                           turbidity_ratio]]]
+        for i in range(3):
+            self.__setLines(i)
+        canvas = self.__figure.canvas
+        if rescale:
+            self.__redraw()
+        else:
+            canvas.restore_region(self.__background)
+        for lines in self.__lines:
+            for line in lines:
+                line.axes.draw_artist(line)
+        self.__axes[0].draw_artist(self.__text)
+        canvas.blit(self.__figure.bbox)
+        canvas.flush_events()
+
+    def __setLines(self, i):
+        """Set the envelope of the shown time range as data of the lines.
+
+        Parameters
+        ----------
+        i : int
+            Index of the axes
+        """
+        if self.__data[i] is None:
+            return
+        measurement_time, values = self.__data[i]
+        time_range = self.__axes[i].get_xlim()
+        for line, downsampler, value in zip(self.__lines[i],
+                                            self.__downsamplers[i], values):
+            indices = downsampler.getIndices(measurement_time, value,
+                                             time_range)
+            line.set_data(measurement_time[indices], value[indices])
+
+    def __zoom(self, ax):
+        """Refine the envelope of the lines to the new x limits.
+
+        Parameters
+        ----------
+        ax : Axes
+            Axes whose x limits changed
+        """
+        self.__setLines(self.__axes.index(ax))
+
+    def setText(self, text):
+        """Set the text shown in the pressure axes.
+
+        The text is drawn with the next update.
+
+        Parameters
+        ----------
+        text : str
+            Text shown in the upper left corner of the pressure axes
+        """
+        self.__text.set_text(text)
+
+    def stop(self):
+        """Stop the live update and draw the lines statically."""
+        for lines in self.__lines:
+            for line in lines:
+                line.set_animated(False)
+        self.__text.set_animated(False)
+        for ax in self.__axes:
+            ax.callbacks.connect('xlim_changed', self.__zoom)
+        self.__figure.canvas.draw_idle()
+        plt.pause(1e-3)  # Some time to draw figure
+
+    def isOpen(self):
+        """Return True if the figure is still open.
+
+        Returns
+        -------
+        is_open : bool
+            True if the figure is still open
+        """
+        is_open = plt.fignum_exists(self.__figure.number)
+        return is_open
+
+    def getCalibrated(self):
+        """Return True if the plot shows calibrated values.
+
+        Returns
+        -------
+        calibrated : bool
+            True if the values are corrected by the calibration value
+        """
+        calibrated = self.__calibrated
+        return calibrated
@@ -6,7 +6,9 @@ The script uses the class Aerosol_Penetrometer_Light_Scattering_Detector_V2.
 
 First the sample is inserted, and then the device is flushed with air three
 times. Second an offset calibration is carried out.
-Therefore the device measures the offset over the given calibration time.
+Therefore the device measures the offset until its mean values converged,
+at most over the given calibration time. A calibration of the same device
+from the calibration cache is reused, if a short drift check agrees with it.
 During calibration no air should be sucked in.
 After calibration the measurement starts. The smoke of the e-cigarette is
 sucked through the device.
@@ -27,11 +29,14 @@ Jun 23 2021
 """
 
 import Aerosol_Penetrometer_Light_Scattering_Detector_V2 as pen
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Calibration_Cache \
+    as cch
 
 # =============================================================================
 # Define measurement and calibration durations in seconds, measurement volume
 # in liter, initial breathing resistance in mbar/l/min and total turbidity
-# ratio without mask
+# ratio without mask. The measurement finishes automatically shortly after
+# the flow stopped, the measurement duration is the maximum duration.
 # =============================================================================
 measurement_duration = 10
 calibration_duration = 10
@@ -44,26 +49,31 @@ total_turbidity_ratio_idle = 1.3408  # Mean value of five measurements without
 # =============================================================================
 x = pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2(
     measurement_volume, total_turbidity_ratio_idle)
+cache = cch.Calibration_Cache()
 
 # =============================================================================
-# Do calibration before every single measurement
+# Do calibration before every single measurement, a cached calibration is
+# reused if it did not drift
 # =============================================================================
 print()
 print("Insert sample and flush device three times.")
 input("Press Enter to start calibration...")
-calibration_value = x.calibrate(calibration_duration)
+calibration_value = x.calibrateCached(cache, calibration_duration)
 print()
 print("Calibration value: ")
 print("Turbidity before mask: " + str(calibration_value[0]))
 print("Turbidity after mask: " + str(calibration_value[1]))
 print("Absolute pressure after mask: " + str(calibration_value[2]) + " mbar")
+standard_error, number_of_samples = x.getCalibrationConfidence()
+print("Standard errors: " + str(standard_error) + " from " +
+      str(number_of_samples) + " samples")
 
 # =============================================================================
 # Start of measurement
 # =============================================================================
 input("Press Enter to start measurement...")
 transistor_voltage, turbidity, turbidity_ratio, pressure, measurement_time = \
-                                        x.liveMeasurement(measurement_duration)
+                        x.liveMeasurement(measurement_duration, auto_stop=True)
 
 print()
 print("Flush device once, remove sample then flush device three times.")
@@ -0,0 +1,214 @@
+"""Port pool of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+Opening the serial port resets the arduino nano (DTR), which then spends
+about two seconds in its bootloader. The process-wide pool port_pool keeps
+the ports open between measurements and hands the same warmed up connection
+to every instance using the port, so the reset happens only once per port
+and process.
+"""
+import atexit
+import os
+import serial
+import threading
+import time
+
+
+class Port_Pool:
+    """
+    A process-wide pool of open serial connections.
+
+    Every port is opened once and kept open until it is closed. A port
+    whose handle became stale, for example because the device was unplugged,
+    is reopened by the next acquire(). After opening, waitUntilReady() waits
+    for the rest of the bootloader delay only, a warmed up port is ready at
+    once.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __connections : dict
+        Serial object of every open port by port name
+    __open_time : dict
+        Monotonic time in seconds when each port was opened
+    __warmed_up : dict
+        True for every port whose bootloader delay has passed
+    __lock : threading.Lock
+        Lock of the pool
+    bootloader_delay : float
+        Time in seconds the arduino needs to start after the serial port was
+        opened (default 2.0)
+
+    Methods
+    -------
+    acquire(serial_port, baud_rate, timeout)
+        Returns an open connection of the port
+    isStale(serial_port)
+        Returns True if the open handle of the port is no longer usable
+    isWarmedUp(serial_port)
+        Returns True if the bootloader delay of the port has passed
+    waitUntilReady(serial_port)
+        Waits for the rest of the bootloader delay
+    close(serial_port)
+        Closes a port
+    closeAll()
+        Closes all ports
+    """
+
+    bootloader_delay = 2.0
+
+    def __init__(self):
+        """Init function."""
+        self.__connections = {}
+        self.__open_time = {}
+        self.__warmed_up = {}
+        self.__lock = threading.Lock()
+
+    def acquire(self, serial_port, baud_rate=9600, timeout=None):
+        """Return an open connection of the port.
+
+        An open connection is reused, a stale one is closed and reopened.
+
+        Parameters
+        ----------
+        serial_port : str
+            Serial port of the arduino
+        baud_rate : int
+            baud rate of the serial port communication (default 9600)
+        timeout : float
+            Read timeout in seconds, None to wait until the requested bytes
+            are received (default None)
+
+        Returns
+        -------
+        arduino : serial object
+            Serial object of the arduino
+        """
+        with self.__lock:
+            if serial_port in self.__connections and \
+                    self.isStale(serial_port):
+                self.__close(serial_port)
+            if serial_port not in self.__connections:
+                self.__connections[serial_port] = serial.Serial(
+                    serial_port, baud_rate, timeout=timeout)
+                self.__open_time[serial_port] = time.monotonic()
+                self.__warmed_up[serial_port] = False
+            arduino = self.__connections[serial_port]
+            if arduino.baudrate != baud_rate:
+                # Reconfigure without reopening, which would reset the arduino
+                arduino.baudrate = baud_rate
+            if arduino.timeout != timeout:
+                arduino.timeout = timeout
+        return arduino
+
+    def isStale(self, serial_port):
+        """Return True if the open handle of the port is no longer usable.
+
+        Parameters
+        ----------
+        serial_port : str
+            Serial port of the arduino
+
+        Returns
+        -------
+        stale : bool
+            True if the port is not open, the device node vanished or the
+            handle fails
+        """
+        arduino = self.__connections.get(serial_port)
+        if arduino is None or not arduino.is_open or \
+                not os.path.exists(serial_port):
+            return True
+        try:
+            arduino.in_waiting
+        except (serial.SerialException, OSError):
+            # The device was unplugged, maybe replugged under the same name
+            return True
+        return False
+
+    def isWarmedUp(self, serial_port):
+        """Return True if the bootloader delay of the port has passed.
+
+        Parameters
+        ----------
+        serial_port : str
+            Serial port of the arduino
+
+        Returns
+        -------
+        warmed_up : bool
+            True if the arduino is ready to answer
+        """
+        if serial_port not in self.__open_time:
+            return False
+        if not self.__warmed_up[serial_port]:
+            self.__warmed_up[serial_port] = \
+                time.monotonic() - self.__open_time[serial_port] >= \
+                self.bootloader_delay
+        warmed_up = self.__warmed_up[serial_port]
+        return warmed_up
+
+    def waitUntilReady(self, serial_port):
+        """Wait for the rest of the bootloader delay.
+
+        Parameters
+        ----------
+        serial_port : str
+            Serial port of the arduino
+
+        Returns
+        -------
+        waiting_time : float
+            Time waited in seconds, zero for a warmed up port
+        """
+        waiting_time = 0.0
+        if serial_port in self.__open_time and \
+                not self.isWarmedUp(serial_port):
+            waiting_time = self.__open_time[serial_port] + \
+                self.bootloader_delay - time.monotonic()
+            time.sleep(max(waiting_time, 0.0))
+            self.__warmed_up[serial_port] = True
+        return max(waiting_time, 0.0)
+
+    def __close(self, serial_port):
+        """Close a port without locking."""
+        arduino = self.__connections.pop(serial_port)
+        self.__open_time.pop(serial_port)
+        self.__warmed_up.pop(serial_port)
+        try:
+            arduino.close()
+        except (serial.SerialException, OSError):
+            pass
+
+    def close(self, serial_port):
+        """Close a port.
+
+        Parameters
+        ----------
+        serial_port : str
+            Serial port of the arduino
+        """
+        with self.__lock:
+            if serial_port in self.__connections:
+                self.__close(serial_port)
+
+    def closeAll(self):
+        """Close all ports."""
+        with self.__lock:
+            for serial_port in list(self.__connections):
+                self.__close(serial_port)
+
+
+# Process-wide pool shared by all instances
+port_pool = Port_Pool()
+atexit.register(port_pool.closeAll)
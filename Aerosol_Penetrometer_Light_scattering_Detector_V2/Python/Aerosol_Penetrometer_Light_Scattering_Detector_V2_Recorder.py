@@ -0,0 +1,212 @@
+"""Recorder of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+A recording is an append-only binary file: a header of fixed size holds the
+calibration value, the measurement volume and the total turbidity ratio
+without mask, followed by the raw samples as rows of float64 in order
+[Time Before90° Before180° After90° After180° Pressure]. The time is given
+in seconds since the start of the measurement and the pressure is the
+absolute pressure in mbar. The number of samples follows from the file size,
+so a recording stays readable after a crash.
+"""
+import numpy as np
+import os
+import queue
+import threading
+
+magic = b"APLSDV2R"
+version = 1
+sample_width = 6
+header_dtype = np.dtype([('magic', 'S8'), ('version', '<u4'),
+                         ('sample_width', '<u4'),
+                         ('calibration_value', '<f8', 3),
+                         ('measurement_volume', '<f8'),
+                         ('total_turbidity_ratio_idle', '<f8'),
+                         ('start_time', '<f8')])
+
+
+def readRecording(file_name):
+    """Read a recording by memory-mapping.
+
+    Parameters
+    ----------
+    file_name : str
+        File name of the recording
+
+    Returns
+    -------
+    header : dict
+        Calibration value, measurement volume, total turbidity ratio without
+        mask and the wall clock time of the start in seconds since the epoch
+    samples : ndarray
+        Memory-mapped raw samples with one row per sample in order:
+        [Time Before90° Before180° After90° After180° Pressure]. An
+        incomplete last sample of an interrupted recording is left out.
+    """
+    header = np.fromfile(file_name, header_dtype, 1)
+    if len(header) == 0 or header['magic'][0] != magic:
+        raise ValueError(file_name + " is no recording!")
+    header = header[0]
+    number_of_samples = (os.path.getsize(file_name) -
+                         header_dtype.itemsize) // (8*sample_width)
+    if number_of_samples > 0:
+        samples = np.memmap(file_name, np.float64, 'r',
+                            header_dtype.itemsize,
+                            (number_of_samples, sample_width))
+    else:
+        samples = np.zeros((0, sample_width))
+    header = {'calibration_value': list(header['calibration_value']),
+              'measurement_volume': float(header['measurement_volume']),
+              'total_turbidity_ratio_idle':
+                  float(header['total_turbidity_ratio_idle']),
+              'start_time': float(header['start_time'])}
+    return header, samples
+
+
+class Recorder:
+    """
+    An append-only recorder writing the raw samples in a background thread.
+
+    append() only puts the block of samples into a queue, a writer thread
+    collects all queued blocks and writes them by one call, so the disk
+    writes are batched and never stall the acquisition. Every batch is
+    flushed to the operating system, the recorded samples survive a crash of
+    the interpreter. The queue holds at most maximum_queued_blocks blocks,
+    if the disk is slower than the acquisition append() waits for the
+    writer. So the memory use does not depend on the duration of the
+    recording.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __file : file object
+        Recording opened for appending
+    __queue : queue.Queue
+        Blocks of samples waiting to be written
+    __thread : threading.Thread
+        Writer thread
+    __written_samples : int
+        Number of samples written to the file
+    __error : Exception
+        Exception raised by the writer thread, None if no error occurred
+    maximum_queued_blocks : int
+        Maximum number of blocks waiting to be written (default 1024)
+
+    Methods
+    -------
+    append(samples)
+        Queues a block of raw samples for writing
+    close()
+        Writes all queued samples and closes the recording
+    getWrittenSamples()
+        Returns the number of samples written to the file
+    """
+
+    maximum_queued_blocks = 1024
+
+    def __init__(self, file_name, calibration_value, measurement_volume,
+                 total_turbidity_ratio_idle, start_time):
+        """Init function, creates the recording and writes the header.
+
+        Parameters
+        ----------
+        file_name : str
+            File name of the recording
+        calibration_value : float
+            offset value of the turbidity before and after the mask and the
+            absolute pressure value in mbar
+        measurement_volume : float
+            Total measurement volume sucked up with the syringe in liter
+        total_turbidity_ratio_idle : float
+            Total turbidity ratio without mask
+        start_time : float
+            Wall clock time of the start in seconds since the epoch
+        """
+        header = np.zeros(1, header_dtype)
+        header['magic'] = magic
+        header['version'] = version
+        header['sample_width'] = sample_width
+        header['calibration_value'] = calibration_value
+        header['measurement_volume'] = measurement_volume
+        header['total_turbidity_ratio_idle'] = total_turbidity_ratio_idle
+        header['start_time'] = start_time
+        self.__file = open(file_name, 'wb')
+        self.__file.write(header.tobytes())
+        self.__file.flush()
+        self.__queue = queue.Queue(self.maximum_queued_blocks)
+        self.__written_samples = 0
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__write, daemon=True)
+        self.__thread.start()
+
+    def __write(self):
+        """Write the queued blocks until None is queued."""
+        running = True
+        while running:
+            blocks = [self.__queue.get()]
+            # Collect everything queued meanwhile into one write
+            while True:
+                try:
+                    blocks.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            if any([i is None for i in blocks]):
+                running = False
+                blocks = [i for i in blocks if i is not None]
+            if len(blocks) == 0 or self.__error is not None:
+                continue
+            try:
+                samples = np.concatenate(blocks)
+                self.__file.write(samples.tobytes())
+                self.__file.flush()
+                self.__written_samples += len(samples)
+            except OSError as error:
+                self.__error = error
+
+    def append(self, samples):
+        """Queue a block of raw samples for writing.
+
+        Waits for the writer thread if the queue is full.
+
+        Parameters
+        ----------
+        samples : ndarray
+            Raw samples with one row per sample in order:
+            [Time Before90° Before180° After90° After180° Pressure]
+        """
+        if self.__error is not None:
+            raise self.__error
+        samples = np.asarray(samples, np.float64).reshape(-1, sample_width)
+        if len(samples) > 0:
+            self.__queue.put(samples)
+
+    def close(self):
+        """Write all queued samples and close the recording."""
+        if self.__file.closed:
+            return
+        self.__queue.put(None)
+        self.__thread.join()
+        self.__file.close()
+        if self.__error is not None:
+            raise self.__error
+
+    def getWrittenSamples(self):
+        """Return the number of samples written to the file.
+
+        Returns
+        -------
+        written_samples : int
+            Number of samples written to the file
+        """
+        written_samples = self.__written_samples
+        return written_samples
@@ -0,0 +1,135 @@
+"""Running integrator of the
+Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+"""
+import numpy as np
+
+
+class Running_Integrator:
+    """
+    A running trapezoid integrator of several channels over time.
+
+    Every appended block of samples extends the cumulative integral from the
+    first sample to each sample by the trapezoidal rule, continuing from the
+    last sample of the previous block. The cost of a block only depends on
+    its length, and the integral between any two samples is the difference
+    of two cumulative values. So the totals of integrateTurbidity() and
+    integratePressure() are available at once while or after measuring,
+    also for the samples of the flow only.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __chunk_size : int
+        Minimum number of samples the array grows by
+    __number_of_samples : int
+        Number of integrated samples
+    __cumulative : ndarray
+        Preallocated cumulative integral from the first sample to each
+        sample, one row per sample and one column per channel
+    __last_time : float
+        Time of the last sample
+    __last_values : ndarray
+        Values of the last sample
+
+    Methods
+    -------
+    append(measurement_time, values)
+        Integrates a block of samples
+    getTotal(start_ind, stop_ind)
+        Returns the integral between two samples
+    """
+
+    def __init__(self, number_of_channels, chunk_size=4096):
+        """Init function.
+
+        Parameters
+        ----------
+        number_of_channels : int
+            Number of integrated channels
+        chunk_size : int
+            Minimum number of samples the array grows by (default 4096)
+        """
+        self.__chunk_size = chunk_size
+        self.__number_of_samples = 0
+        self.__cumulative = np.zeros((chunk_size, number_of_channels))
+        self.__last_time = None
+        self.__last_values = None
+
+    def __len__(self):
+        """Return the number of integrated samples."""
+        return self.__number_of_samples
+
+    def append(self, measurement_time, values):
+        """Integrate a block of samples.
+
+        Parameters
+        ----------
+        measurement_time : float
+            Measurement time in seconds, one value per sample
+        values : float
+            Values of the channels, one row per sample and one column per
+            channel
+        """
+        measurement_time = np.asarray(measurement_time, np.float64)
+        if len(measurement_time) == 0:
+            return
+        values = np.asarray(values, np.float64).reshape(
+            len(measurement_time), -1)
+        n = self.__number_of_samples
+        if n + len(values) > len(self.__cumulative):
+            grown = np.zeros((max(2*len(self.__cumulative),
+                                  n + len(values) + self.__chunk_size),
+                              self.__cumulative.shape[1]))
+            grown[:n] = self.__cumulative[:n]
+            self.__cumulative = grown
+        if self.__last_time is None:
+            # The integral up to the first sample is zero
+            time_steps = np.append(0.0, np.diff(measurement_time))
+            previous = np.vstack([values[:1], values[:-1]])
+            start = 0.0
+        else:
+            time_steps = np.diff(measurement_time, prepend=self.__last_time)
+            previous = np.vstack([self.__last_values, values[:-1]])
+            start = self.__cumulative[n - 1]
+        areas = 0.5*(values + previous)*time_steps[:, np.newaxis]
+        self.__cumulative[n:n + len(values)] = start + np.cumsum(areas, 0)
+        self.__number_of_samples += len(values)
+        self.__last_time = measurement_time[-1]
+        self.__last_values = values[-1].copy()
+
+    def getTotal(self, start_ind=0, stop_ind=None):
+        """Return the integral between two samples.
+
+        Parameters
+        ----------
+        start_ind : int
+            Array index of the first sample (default 0)
+        stop_ind : int
+            Array index after the last sample, None for all samples (default
+            None)
+
+        Returns
+        -------
+        total : ndarray
+            Integral of every channel from the first to the last sample, zero
+            for less than two samples
+        """
+        if stop_ind is None or stop_ind > self.__number_of_samples:
+            stop_ind = self.__number_of_samples
+        if stop_ind - start_ind < 2:
+            total = np.zeros(self.__cumulative.shape[1])
+        else:
+            total = self.__cumulative[stop_ind - 1] - \
+                self.__cumulative[start_ind]
+        return total
@@ -0,0 +1,124 @@
+"""Running statistics of the
+Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+"""
+import numpy as np
+
+
+class Running_Statistics:
+    """
+    Running mean and variance of several channels by Welford's method.
+
+    Every appended block is reduced to its count, mean and sum of squared
+    deviations, which are merged into the running values (Chan et al.). The
+    memory use is constant and the result is numerically stable, also for a
+    small variance on a large offset like the turbidity without smoke.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __number_of_samples : int
+        Number of samples
+    __mean : ndarray
+        Mean value of every channel
+    __squares : ndarray
+        Sum of the squared deviations from the mean of every channel
+
+    Methods
+    -------
+    append(values)
+        Adds a block of samples
+    getMean()
+        Returns the mean value of every channel
+    getVariance()
+        Returns the sample variance of every channel
+    getStandardError()
+        Returns the standard error of the mean of every channel
+    """
+
+    def __init__(self, number_of_channels):
+        """Init function.
+
+        Parameters
+        ----------
+        number_of_channels : int
+            Number of channels
+        """
+        self.__number_of_samples = 0
+        self.__mean = np.zeros(number_of_channels)
+        self.__squares = np.zeros(number_of_channels)
+
+    def __len__(self):
+        """Return the number of samples."""
+        return self.__number_of_samples
+
+    def append(self, values):
+        """Add a block of samples.
+
+        Parameters
+        ----------
+        values : float
+            Values of the channels, one row per sample and one column per
+            channel
+        """
+        values = np.asarray(values, np.float64).reshape(
+            -1, len(self.__mean))
+        if len(values) == 0:
+            return
+        n_a = self.__number_of_samples
+        n_b = len(values)
+        mean_b = np.mean(values, 0)
+        squares_b = np.sum((values - mean_b)**2, 0)
+        delta = mean_b - self.__mean
+        self.__number_of_samples = n_a + n_b
+        self.__mean = self.__mean + delta*n_b/self.__number_of_samples
+        self.__squares = self.__squares + squares_b + \
+            delta**2*n_a*n_b/self.__number_of_samples
+
+    def getMean(self):
+        """Return the mean value of every channel.
+
+        Returns
+        -------
+        mean : ndarray
+            Mean value of every channel, NaN without samples
+        """
+        mean = self.__mean.copy() if self.__number_of_samples > 0 else \
+            np.full(len(self.__mean), np.nan)
+        return mean
+
+    def getVariance(self):
+        """Return the sample variance of every channel.
+
+        Returns
+        -------
+        variance : ndarray
+            Sample variance of every channel, NaN for less than two samples
+        """
+        if self.__number_of_samples < 2:
+            return np.full(len(self.__mean), np.nan)
+        variance = self.__squares/(self.__number_of_samples - 1)
+        return variance
+
+    def getStandardError(self):
+        """Return the standard error of the mean of every channel.
+
+        Returns
+        -------
+        standard_error : ndarray
+            Standard error of the mean of every channel, NaN for less than
+            two samples
+        """
+        standard_error = np.sqrt(self.getVariance() /
+                                 max(self.__number_of_samples, 1))
+        return standard_error
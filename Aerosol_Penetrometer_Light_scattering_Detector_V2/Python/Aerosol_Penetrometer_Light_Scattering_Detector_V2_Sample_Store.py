@@ -0,0 +1,261 @@
+"""Sample store of the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
+import numpy as np
+
+
+class Sample_Store:
+    """
+    A growable columnar store for the samples of a measurement.
+
+    Every quantity is kept in its own preallocated NumPy array, which grows in
+    chunks when it is full. The getter functions return views on the filled
+    part of the arrays, so the evaluation functions work on the samples
+    without copying them. For compatibility the store can be unpacked like
+    the former return value of liveMeasurement():
+    transistor_voltage, turbidity, turbidity_ratio, pressure, measurement_time
+    With a maximum number of samples the store keeps only the latest samples,
+    for example for the live plot while the samples are recorded to disk.
+    Then the arrays hold at most twice the maximum number of samples and the
+    latest samples are moved to the front when they are full.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __chunk_size : int
+        Minimum number of samples the arrays grow by
+    __maximum_samples : int
+        Maximum number of kept samples, None to keep all samples
+    __number_of_samples : int
+        Number of samples in the arrays
+    __appended_samples : int
+        Number of samples appended to the store
+    __columns : dict
+        Preallocated arrays of the quantities:
+        measurement_time : Measurement time in seconds (float64)
+        transistor_voltage : Voltage values in volts of the photo
+        transistors, one row per sample in order:
+        [Before90° Before180° After90° After180°] (float32)
+        pressure : Relative pressure after the mask in mbar (float64)
+        turbidity : Turbidity value (90°signal/180°signal) before and after
+        the mask, one row per sample in order: [Before After] (float32)
+        turbidity_ratio : Ratio between the turbidity before and after the
+        mask (float32)
+
+    Methods
+    -------
+    append(measurement_time, transistor_voltage, pressure, turbidity,
+           turbidity_ratio)
+        Appends a block of samples
+    getMeasurementTime()
+        Returns the measurement time
+    getTransistorVoltage()
+        Returns the photo transistor voltages
+    getPressure()
+        Returns the relative pressure
+    getTurbidity()
+        Returns the turbidity values
+    getTurbidityRatio()
+        Returns the turbidity ratio
+    getMemoryUsage()
+        Returns the allocated memory in bytes
+    getDiscardedSamples()
+        Returns the number of discarded oldest samples
+    """
+
+    def __init__(self, chunk_size=4096, maximum_samples=None):
+        """Init function.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Minimum number of samples the arrays grow by (default 4096)
+        maximum_samples : int
+            Maximum number of kept samples, the oldest samples are discarded.
+            If None all samples are kept (default None)
+        """
+        self.__chunk_size = chunk_size
+        self.__maximum_samples = maximum_samples
+        self.__number_of_samples = 0
+        self.__appended_samples = 0
+        self.__columns = {
+            'measurement_time': np.zeros(chunk_size, np.float64),
+            'transistor_voltage': np.zeros((chunk_size, 4), np.float32),
+            'pressure': np.zeros(chunk_size, np.float64),
+            'turbidity': np.zeros((chunk_size, 2), np.float32),
+            'turbidity_ratio': np.zeros(chunk_size, np.float32)}
+
+    def __len__(self):
+        """Return the number of samples."""
+        return self.__number_of_samples - self.__getStart()
+
+    def __getStart(self):
+        """Return the array index of the first kept sample."""
+        if self.__maximum_samples is None:
+            return 0
+        start = max(self.__number_of_samples - self.__maximum_samples, 0)
+        return start
+
+    def __iter__(self):
+        """Unpack like the former return value of liveMeasurement()."""
+        return iter((self.getTransistorVoltage(), self.getTurbidity(),
+                     self.getTurbidityRatio(), self.getPressure(),
+                     self.getMeasurementTime()))
+
+    def __getColumn(self, name):
+        """Return a view on the kept samples of a quantity."""
+        column = self.__columns[name][self.__getStart():
+                                      self.__number_of_samples]
+        return column
+
+    def __grow(self, number_of_samples):
+        """Enlarge the arrays to hold at least the given number of samples."""
+        capacity = len(self.__columns['measurement_time'])
+        if number_of_samples <= capacity:
+            return
+        # Grow at least by the current capacity to keep appending amortized
+        # constant in time
+        capacity = max(number_of_samples, capacity + max(capacity,
+                                                         self.__chunk_size))
+        if self.__maximum_samples is not None:
+            capacity = max(number_of_samples,
+                           min(capacity, 2*self.__maximum_samples))
+        n = self.__number_of_samples
+        for name, old in self.__columns.items():
+            new = np.zeros((capacity,) + old.shape[1:], old.dtype)
+            new[:n] = old[:n]
+            self.__columns[name] = new
+
+    def append(self, measurement_time, transistor_voltage, pressure,
+               turbidity, turbidity_ratio):
+        """Append a block of samples.
+
+        Parameters
+        ----------
+        measurement_time : float
+            Measurement time in seconds, one value per sample
+        transistor_voltage : float
+            Voltage values in volts of the photo transistors, one row per
+            sample in order: [Before90° Before180° After90° After180°]
+        pressure : float
+            Relative pressure after the mask in mbar, one value per sample
+        turbidity : float
+            Turbidity value (90°signal/180°signal) before and after the mask,
+            one row per sample in order: [Before After]
+        turbidity_ratio : float
+            Ratio between the turbidity before and after the mask, one value
+            per sample
+        """
+        values = {'measurement_time': measurement_time,
+                  'transistor_voltage': transistor_voltage,
+                  'pressure': pressure, 'turbidity': turbidity,
+                  'turbidity_ratio': turbidity_ratio}
+        number_of_new = np.size(measurement_time)
+        self.__appended_samples += number_of_new
+        n = self.__number_of_samples
+        maximum = self.__maximum_samples
+        if maximum is not None and number_of_new > maximum:
+            # Only the latest samples of the block are kept
+            values = {name: np.asarray(value)[-maximum:]
+                      for name, value in values.items()}
+            number_of_new = maximum
+        if maximum is not None and n + number_of_new > 2*maximum:
+            # Move the samples which stay kept to the front
+            keep = maximum - number_of_new
+            for column in self.__columns.values():
+                column[:keep] = column[n - keep:n]
+            n = keep
+        m = n + number_of_new
+        self.__grow(m)
+        for name, value in values.items():
+            self.__columns[name][n:m] = value
+        self.__number_of_samples = m
+
+    def getMeasurementTime(self):
+        """Return the measurement time.
+
+        Returns
+        -------
+        measurement_time : ndarray
+            View on the measurement time in seconds
+        """
+        measurement_time = self.__getColumn('measurement_time')
+        return measurement_time
+
+    def getTransistorVoltage(self):
+        """Return the photo transistor voltages.
+
+        Returns
+        -------
+        transistor_voltage : ndarray
+            View on the voltage values in volts of the photo transistors in
+            order: [Before90° Before180° After90° After180°]
+        """
+        transistor_voltage = self.__getColumn('transistor_voltage')
+        return transistor_voltage
+
+    def getPressure(self):
+        """Return the relative pressure.
+
+        Returns
+        -------
+        pressure : ndarray
+            View on the relative pressure after the mask in mbar
+        """
+        pressure = self.__getColumn('pressure')
+        return pressure
+
+    def getTurbidity(self):
+        """Return the turbidity values.
+
+        Returns
+        -------
+        turbidity : ndarray
+            View on the turbidity value (90°signal/180°signal) before and
+            after the mask in order: [Before After]
+        """
+        turbidity = self.__getColumn('turbidity')
+        return turbidity
+
+    def getTurbidityRatio(self):
+        """Return the turbidity ratio.
+
+        Returns
+        -------
+        turbidity_ratio : ndarray
+            View on the ratio between the turbidity before and after the mask
+        """
+        turbidity_ratio = self.__getColumn('turbidity_ratio')
+        return turbidity_ratio
+
+    def getMemoryUsage(self):
+        """Return the allocated memory in bytes.
+
+        Returns
+        -------
+        memory_usage : int
+            Allocated memory of all arrays in bytes
+        """
+        memory_usage = sum([i.nbytes for i in self.__columns.values()])
+        return memory_usage
+
+    def getDiscardedSamples(self):
+        """Return the number of discarded oldest samples.
+
+        Returns
+        -------
+        discarded_samples : int
+            Number of appended samples which are no longer kept, zero
+            without maximum number of samples
+        """
+        discarded_samples = self.__appended_samples - len(self)
+        return discarded_samples
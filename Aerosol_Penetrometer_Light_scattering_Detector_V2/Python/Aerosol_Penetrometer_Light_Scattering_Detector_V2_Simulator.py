@@ -0,0 +1,399 @@
+"""Simulator for the Aerosol_Penetrometer_Light_Scattering_Detector_V2."""
+import numpy as np
+import os
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Frames as frm
+import queue
+import threading
+import time
+import tty
+
+
+class Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator:
+    """
+    A software stand-in for the Arduino of the V2 light scattering detector.
+
+    The simulator opens a pseudo terminal and answers on it like the V2
+    firmware does, so the V2 class can be used without hardware by passing
+    getSerialPort() as serial_port.
+    The firmware loop is reproduced tick by tick: all bytes received since the
+    last tick are read as one command, "1" is answered with the photo
+    transistor voltages and the absolute pressure, "2" probes the pressure
+    sensor, "S<rate>" starts streaming numbered samples with <rate> Hz
+    without loop delay, "B<rate>" does the same with binary frames and "X"
+    stops streaming. Everything else is ignored.
+    Replies are delayed by the transmission time at the given baud rate and
+    both directions by the latency of the USB serial converter.
+
+    Author
+    ------
+    Sebastian Lifka
+
+    Created
+    -------
+    Oct 17 2026
+
+    Modified
+    --------
+    Oct 17 2026
+
+    Attributes
+    ----------
+    __baud_rate : int
+        Baud rate used to calculate the transmission time of the replies
+    __loop_delay : float
+        Delay at the end of each firmware loop in seconds (default 50e-3)
+    __pressure_sensor : bool
+        True if the simulated pressure sensor is connected
+    __ambient_pressure : float
+        Absolute ambient pressure in mbar
+    __pressure_drop : float
+        Pressure drop after the mask during the syringe flow in mbar
+    __flow_duration : float
+        Duration of the syringe flow in seconds
+    __penetration : float
+        Fraction of the smoke passing the mask
+    __turbidity_peak : float
+        Maximum turbidity increase before the mask due to the smoke
+    __voltage_noise : float
+        Standard deviation of the photo transistor voltage noise in volts
+    __pressure_noise : float
+        Standard deviation of the pressure noise in mbar
+    __frame_error_rate : float
+        Probability of a corrupted byte in a binary frame
+    __latency : float
+        Latency of the USB serial converter in each direction in seconds
+    __flow_start : float
+        Monotonic time of the flow start in seconds, None if no flow is
+        scheduled
+    __stream_period : float
+        Sample period of the stream in seconds, None if not streaming
+    __binary_frames : bool
+        True if the stream sends binary frames
+    __sample_number : int
+        Number of the next streamed sample
+
+    Methods
+    -------
+    startSimulation()
+        Opens the pseudo terminal and starts the firmware loop
+    stopSimulation()
+        Stops the firmware loop and closes the pseudo terminal
+    getSerialPort()
+        Returns the serial port name of the simulated device
+    startFlow(delay)
+        Schedules the syringe flow with the e-cigarette smoke
+    getSignal(t)
+        Returns the noise free sensor signals at a given time
+    getStreamedSamples()
+        Returns the number of samples sent since the stream was started
+    """
+
+    # Idle values of the photo transistors and the turbidity (90°/180°)
+    # before and after the mask
+    voltage_180_idle = [3.6, 3.4]
+    turbidity_idle = [0.12, 0.09]
+    # Time constants of the smoke concentration and the pressure in seconds
+    smoke_rise_time = 0.3
+    smoke_decay_time = 1.5
+    pressure_time = 0.1
+    # Size of the hardware serial transmit buffer of the arduino in bytes
+    transmit_buffer_size = 64
+    # Timeout of Serial.readStringUntil() in seconds
+    command_timeout = 20e-3
+
+    def __init__(self, baud_rate=9600, loop_delay=50e-3, pressure_sensor=True,
+                 ambient_pressure=1013.25, pressure_drop=4.0,
+                 flow_duration=3.0, penetration=0.2, turbidity_peak=0.6,
+                 voltage_noise=2e-3, pressure_noise=0.03,
+                 frame_error_rate=0.0, latency=0.0, seed=None):
+        """Init function.
+
+        Parameters
+        ----------
+        baud_rate : int
+            Baud rate used to calculate the transmission time of the replies
+            (default 9600)
+        loop_delay : float
+            Delay at the end of each firmware loop in seconds (default 50e-3)
+        pressure_sensor : bool
+            True if the simulated pressure sensor is connected (default True)
+        ambient_pressure : float
+            Absolute ambient pressure in mbar (default 1013.25)
+        pressure_drop : float
+            Pressure drop after the mask during the syringe flow in mbar
+            (default 4.0)
+        flow_duration : float
+            Duration of the syringe flow in seconds (default 3.0)
+        penetration : float
+            Fraction of the smoke passing the mask (default 0.2)
+        turbidity_peak : float
+            Maximum turbidity increase before the mask due to the smoke
+            (default 0.6)
+        voltage_noise : float
+            Standard deviation of the photo transistor voltage noise in volts
+            (default 2e-3)
+        pressure_noise : float
+            Standard deviation of the pressure noise in mbar (default 0.03)
+        frame_error_rate : float
+            Probability of a corrupted byte in a binary frame, to test the
+            CRC check (default 0.0)
+        latency : float
+            Latency of the USB serial converter in each direction in
+            seconds, for example 16e-3 for the default latency timer of an
+            FTDI converter (default 0.0)
+        seed : int
+            Seed of the noise generator (default None)
+        """
+        self.__baud_rate = baud_rate
+        self.__loop_delay = loop_delay
+        self.__pressure_sensor = pressure_sensor
+        self.__ambient_pressure = ambient_pressure
+        self.__pressure_drop = pressure_drop
+        self.__flow_duration = flow_duration
+        self.__penetration = penetration
+        self.__turbidity_peak = turbidity_peak
+        self.__voltage_noise = voltage_noise
+        self.__pressure_noise = pressure_noise
+        self.__frame_error_rate = frame_error_rate
+        self.__latency = latency
+        self.__flow_start = None
+        self.__stream_period = None
+        self.__binary_frames = False
+        self.__sample_number = 0
+        self.__rng = np.random.default_rng(seed)
+        self.__master = None
+        self.__slave = None
+        self.__running = False
+        self.__tx_queue = queue.Queue()
+        self.__tx_busy_until = 0.0
+        self.__rx_queue = []
+
+    def startSimulation(self):
+        """Open the pseudo terminal and start the firmware loop.
+
+        Returns
+        -------
+        serial_port : str
+            Serial port name of the simulated device
+        """
+        self.__master, self.__slave = os.openpty()
+        tty.setraw(self.__slave)
+        os.set_blocking(self.__master, False)
+        self.__running = True
+        self.__loop_thread = threading.Thread(target=self.__loop, daemon=True)
+        self.__tx_thread = threading.Thread(target=self.__transmitLoop,
+                                            daemon=True)
+        self.__loop_thread.start()
+        self.__tx_thread.start()
+        return self.getSerialPort()
+
+    def stopSimulation(self):
+        """Stop the firmware loop and close the pseudo terminal."""
+        if not self.__running:
+            return
+        self.__running = False
+        self.__tx_queue.put(None)
+        self.__loop_thread.join()
+        self.__tx_thread.join()
+        os.close(self.__master)
+        os.close(self.__slave)
+
+    def getSerialPort(self):
+        """Return the serial port name of the simulated device.
+
+        Returns
+        -------
+        serial_port : str
+            Serial port name of the simulated device
+        """
+        serial_port = os.ttyname(self.__slave)
+        return serial_port
+
+    def startFlow(self, delay=0.0):
+        """Schedule the syringe flow with the e-cigarette smoke.
+
+        Parameters
+        ----------
+        delay : float
+            Time until the flow starts in seconds (default 0.0)
+        """
+        self.__flow_start = time.monotonic() + delay
+
+    def getSignal(self, t):
+        """Return the noise free sensor signals at a given time.
+
+        Parameters
+        ----------
+        t : float
+            Monotonic time in seconds
+
+        Returns
+        -------
+        transistor_voltage : float
+            Voltage values in volts of the photo transistors in order:
+            [Before90° Before180° After90° After180°]
+        pressure : float
+            Absolute pressure after the mask in mbar
+        """
+        flow = 0.000
+        smoke = 0.000
+        if self.__flow_start is not None and t > self.__flow_start:
+            t_flow = t - self.__flow_start
+            t_stop = max(t_flow - self.__flow_duration, 0.0)
+            # First order step response of the flow and the smoke
+            # concentration, decaying after the syringe is emptied
+            flow = (1 - np.exp(-min(t_flow, self.__flow_duration) /
+                               self.pressure_time)) * \
+                np.exp(-t_stop/self.pressure_time)
+            smoke = (1 - np.exp(-min(t_flow, self.__flow_duration) /
+                                self.smoke_rise_time)) * \
+                np.exp(-t_stop/self.smoke_decay_time)
+        turbidity = [self.turbidity_idle[0] + self.__turbidity_peak*smoke,
+                     self.turbidity_idle[1] +
+                     self.__turbidity_peak*smoke*self.__penetration]
+        transistor_voltage = []
+        for i in range(2):
+            # The smoke scatters light away from the 180° transistor
+            voltage_180 = self.voltage_180_idle[i] * \
+                (1 - 0.3*(turbidity[i] - self.turbidity_idle[i]))
+            transistor_voltage += [turbidity[i]*voltage_180, voltage_180]
+        pressure = self.__ambient_pressure - self.__pressure_drop*flow
+        return transistor_voltage, pressure
+
+    def getStreamedSamples(self):
+        """Return the number of samples sent since the stream was started.
+
+        Returns
+        -------
+        sample_number : int
+            Number of streamed samples
+        """
+        sample_number = self.__sample_number
+        return sample_number
+
+    def __readInput(self):
+        """Read all bytes received since the last loop like readInput()."""
+        try:
+            incoming = os.read(self.__master, 1024)
+        except (BlockingIOError, OSError):
+            incoming = b""
+        now = time.monotonic()
+        if incoming:
+            self.__rx_queue.append((now + self.__latency, incoming))
+        # Only the bytes which passed the USB serial converter are available
+        incoming = b"".join([i[1] for i in self.__rx_queue if i[0] <= now])
+        self.__rx_queue = [i for i in self.__rx_queue if i[0] > now]
+        return incoming
+
+    def __readStringUntil(self, incoming):
+        """Complete a command until the new line like readStringUntil()."""
+        timeout = time.monotonic() + self.command_timeout
+        while b"\n" not in incoming and time.monotonic() < timeout:
+            time.sleep(1e-3)
+            incoming += self.__readInput()
+        return incoming
+
+    def __readSensors(self):
+        """Return the raw ADC values and the pressure like readSensors()."""
+        transistor_voltage, pressure = self.getSignal(time.monotonic())
+        transistor_voltage = np.asarray(transistor_voltage) + \
+            self.__rng.normal(0, self.__voltage_noise, 4)
+        # 10 bit analog digital conversion with 5 V reference
+        transistor_value = np.clip(np.round(transistor_voltage/5*1023),
+                                   0, 1023)
+        pressure += self.__rng.normal(0, self.__pressure_noise)
+        return transistor_value, pressure
+
+    def __readSample(self):
+        """Return a reply line like the firmware does in printSample()."""
+        transistor_value, pressure = self.__readSensors()
+        transistor_voltage = transistor_value*(5.0/1023.0)
+        reply = ";".join(["%.3f" % i for i in transistor_voltage] +
+                         ["%.1f" % pressure]) + "\r\n"
+        return reply.encode()
+
+    def __readFrame(self):
+        """Return a binary frame like the firmware does in writeFrame()."""
+        transistor_value, pressure = self.__readSensors()
+        frame = frm.encodeFrames([self.__sample_number], [transistor_value],
+                                 [pressure])
+        if self.__rng.random() < self.__frame_error_rate*frm.frame_size:
+            # Flip one byte like a disturbed transmission
+            frame = bytearray(frame)
+            frame[self.__rng.integers(frm.frame_size)] ^= 0xFF
+            frame = bytes(frame)
+        return frame
+
+    def __transmit(self, data):
+        """Queue data for transmission with the delay of the baud rate."""
+        byte_time = 10/self.__baud_rate  # Start, 8 data and stop bit
+        now = time.monotonic()
+        self.__tx_busy_until = max(now, self.__tx_busy_until) + \
+            len(data)*byte_time
+        self.__tx_queue.put((self.__tx_busy_until + self.__latency, data))
+        # Serial.print() blocks while the transmit buffer is full
+        backlog = self.__tx_busy_until - now - \
+            self.transmit_buffer_size*byte_time
+        if backlog > 0:
+            time.sleep(backlog)
+
+    def __transmitLoop(self):
+        """Write the queued data as soon as it is transmitted."""
+        while True:
+            item = self.__tx_queue.get()
+            if item is None:
+                return
+            due_time, data = item
+            time.sleep(max(due_time - time.monotonic(), 0))
+            try:
+                os.write(self.__master, data)
+            except OSError:
+                pass
+
+    def __loop(self):
+        """Firmware loop of the V2 arduino program."""
+        while self.__running:
+            raw_incoming = self.__readInput()
+            incoming = raw_incoming.replace(b"\n", b"")
+            if incoming == b"1":
+                self.__transmit(self.__readSample())
+            elif incoming == b"2":
+                if not self.__pressure_sensor:
+                    self.__transmit(b"No pressure sensor connected!\r\n")
+            elif incoming.startswith(b"S") or incoming.startswith(b"B"):
+                incoming = self.__readStringUntil(raw_incoming)
+                incoming = incoming.replace(b"\n", b"")
+                try:
+                    stream_rate = int(incoming[1:])
+                except ValueError:
+                    stream_rate = 0
+                if stream_rate > 0:
+                    self.__stream_period = 1/stream_rate
+                    last_sample_time = time.monotonic() - \
+                        self.__stream_period
+                    self.__sample_number = 0
+                    self.__binary_frames = incoming.startswith(b"B")
+            elif incoming == b"X":
+                self.__stream_period = None
+            if self.__stream_period is not None:
+                # No delay while streaming, the samples are timed by micros()
+                waiting_time = last_sample_time + self.__stream_period - \
+                    time.monotonic()
+                if waiting_time <= -self.__stream_period:
+                    # More than one period behind, skip the missed samples
+                    # like the firmware
+                    missed_samples = int(-waiting_time/self.__stream_period)
+                    last_sample_time += missed_samples*self.__stream_period
+                    self.__sample_number += missed_samples
+                if waiting_time <= 0:
+                    last_sample_time += self.__stream_period
+                    if self.__binary_frames:
+                        self.__transmit(self.__readFrame())
+                    else:
+                        self.__transmit(str(self.__sample_number).encode() +
+                                        b";" + self.__readSample())
+                    self.__sample_number += 1
+                else:
+                    time.sleep(min(waiting_time, 1e-3))
+            else:
+                time.sleep(self.__loop_delay)
@@ -0,0 +1,185 @@
+"""Columnar storage of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+A measurement is saved as uncompressed .npz file with one array per
+quantity, which is read back directly into NumPy arrays without parsing:
+
+    measurement_time : Measurement time in seconds, shape (n,)
+    transistor_voltage : Voltage values in volts of the photo transistors in
+        order [Before90° Before180° After90° After180°], shape (n, 4)
+    turbidity : Turbidity value before and after the mask, shape (n, 2)
+    turbidity_ratio : Ratio between the turbidity before and after the mask,
+        shape (n,)
+    pressure : Relative pressure after the mask in mbar, shape (n,), only
+        measured by the V2
+
+and the scalar or short arrays calibration_value, total_turbidity,
+total_turbidity_ratio, filtered_percentage, data_name, created, device and
+format_version. The V1 class writes the same layout, so both versions are
+read by loadMeasurement(). The measurements saved by the V1 as .csv files
+with stringified lists are converted by convertCsvDirectories().
+"""
+import csv
+import glob
+import numpy as np
+import os
+import re
+
+format_version = 1
+column_names = ['measurement_time', 'transistor_voltage', 'turbidity',
+                'turbidity_ratio', 'pressure']
+
+
+def saveMeasurement(file_name, measurement_time, transistor_voltage,
+                    turbidity, turbidity_ratio, pressure=None, **metadata):
+    """Save a measurement as columnar .npz file.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the .npz file inclusive path
+    measurement_time : float
+        Measurement time in seconds, one value per sample
+    transistor_voltage : float
+        Voltage values in volts of the photo transistors, one row per sample
+        in order: [Before90° Before180° After90° After180°]
+    turbidity : float
+        Turbidity value (90°signal/180°signal) before and after the mask, one
+        row per sample in order: [Before After]
+    turbidity_ratio : float
+        Ratio between the turbidity before and after the mask, one value per
+        sample
+    pressure : float
+        Relative pressure after the mask in mbar, one value per sample, None
+        for the V1 (default None)
+    **metadata
+        Further values saved with the measurement, for example
+        calibration_value, total_turbidity, total_turbidity_ratio,
+        filtered_percentage, data_name, created or device
+    """
+    columns = {'measurement_time': np.asarray(measurement_time, np.float64),
+               'transistor_voltage': np.asarray(transistor_voltage,
+                                                np.float64).reshape(-1, 4),
+               'turbidity': np.asarray(turbidity, np.float64).reshape(-1, 2),
+               'turbidity_ratio': np.asarray(turbidity_ratio, np.float64)}
+    if pressure is not None:
+        columns['pressure'] = np.asarray(pressure, np.float64)
+    metadata.setdefault('device', 'V1' if pressure is None else 'V2')
+    metadata = {key: np.asarray(value) for key, value in metadata.items()
+                if value is not None}
+    np.savez(file_name, format_version=format_version, **columns, **metadata)
+
+
+def loadMeasurement(file_name):
+    """Load a measurement of the V1 or the V2 from a .npz file.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the .npz file inclusive path
+
+    Returns
+    -------
+    measurement : dict
+        Arrays of the measurement by name. Scalar values are returned as
+        Python scalars and strings.
+    """
+    measurement = {}
+    with np.load(file_name, allow_pickle=False) as data:
+        for key in data.files:
+            value = data[key]
+            measurement[key] = value.item() if value.ndim == 0 else value
+    return measurement
+
+
+def __parseList(text):
+    """Return the numbers of a stringified list, for example '[0.3, 2.5]'."""
+    return [float(i) for i in re.findall(r"[-+]?(?:\d+\.?\d*|\.\d+)" +
+                                         r"(?:[eE][-+]?\d+)?|nan|inf", text)]
+
+
+def readCsvMeasurement(file_name):
+    """Read a measurement saved by saveData() of the V1 as .csv file.
+
+    The data rows are converted at once instead of row by row.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the .csv file inclusive path, for example
+        'Messungen/Test/Test.csv'
+
+    Returns
+    -------
+    measurement : dict
+        Arrays of the measurement by name like loadMeasurement()
+    """
+    with open(file_name, newline='') as csv_file:
+        lines = csv_file.read().splitlines()
+    header = list(csv.reader(lines[:6]))
+    measurement = {'data_name': header[0][1], 'created': header[1][1],
+                   'calibration_value': __parseList(header[2][1]),
+                   'total_turbidity': __parseList(header[3][1]),
+                   'total_turbidity_ratio': __parseList(header[4][1]),
+                   'filtered_percentage': __parseList(header[5][1]),
+                   'device': 'V1'}
+    for key in ['total_turbidity_ratio', 'filtered_percentage']:
+        if len(measurement[key]) == 1:
+            measurement[key] = measurement[key][0]
+    # The data rows follow the empty row and the column names
+    data = "\n".join([i for i in lines[8:] if i.strip()])
+    # Remove the quotes, brackets and representations of the stringified
+    # lists, then every row holds the same number of values
+    data = re.sub(r'np\.float64\(|[\[\]"()]', '', data)
+    data = np.array(re.split(r"[,\n]", data), np.float64) if data \
+        else np.zeros(0)
+    data = data.reshape(-1, 8)
+    measurement.update({'measurement_time': data[:, 0],
+                        'transistor_voltage': data[:, 1:5],
+                        'turbidity': data[:, 5:7],
+                        'turbidity_ratio': data[:, 7]})
+    return measurement
+
+
+def convertCsv(file_name):
+    """Convert a .csv file of the V1 into a .npz file next to it.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the .csv file inclusive path
+
+    Returns
+    -------
+    npz_file_name : str
+        Name of the written .npz file
+    """
+    measurement = readCsvMeasurement(file_name)
+    npz_file_name = os.path.splitext(file_name)[0] + ".npz"
+    columns = [measurement.pop(i) for i in column_names[:4]]
+    saveMeasurement(npz_file_name, *columns, **measurement)
+    return npz_file_name
+
+
+def convertCsvDirectories(directory="Messungen", overwrite=False):
+    """Convert all measurements saved as .csv files in a directory.
+
+    Parameters
+    ----------
+    directory : str
+        Directory with one subdirectory per measurement like the directory
+        'Messungen' of the V1 (default 'Messungen')
+    overwrite : bool
+        Convert files which already have a .npz file (default False)
+
+    Returns
+    -------
+    npz_file_names : list
+        Names of the written .npz files
+    """
+    npz_file_names = []
+    for file_name in sorted(glob.glob(os.path.join(directory, "*", "*.csv"))):
+        if not overwrite and \
+                os.path.exists(os.path.splitext(file_name)[0] + ".npz"):
+            continue
+        npz_file_names.append(convertCsv(file_name))
+    return npz_file_names
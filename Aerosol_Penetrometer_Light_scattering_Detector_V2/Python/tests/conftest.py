@@ -0,0 +1,10 @@
+"""Test configuration of the Aerosol_Penetrometer_Light_Scattering_Detector_V2.
+
+The modules are imported by their bare names like in the scripts, so the
+directory of the modules is added to the path.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
@@ -0,0 +1,79 @@
+"""Tests of the asyncio driver against the simulator."""
+import asyncio
+import time
+import pytest
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Async as apa
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Port_Pool as ppl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator as sim
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    monkeypatch.setattr(ppl.Port_Pool, 'bootloader_delay', 0.0)
+    simulator = \
+        sim.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator(
+            seed=0)
+    simulator.startSimulation()
+    yield simulator
+    simulator.stopSimulation()
+
+
+def test_driver_runs_in_several_event_loops(simulator):
+    device = apa.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Async(
+        60e-3, 1.3408, serial_port=simulator.getSerialPort())
+
+    async def measure():
+        async with device:
+            return await device.measure(0.3)
+
+    for i in range(2):
+        assert len(asyncio.run(measure())) > 0
+
+
+@pytest.mark.parametrize('sample_rate', [None, 20])
+def test_silent_device_ends_measurement(simulator, monkeypatch, sample_rate):
+    # The device receives the commands, but never sends anything
+    monkeypatch.setattr(
+        simulator,
+        '_Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator'
+        '__transmit', lambda data: None)
+    device = apa.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Async(
+        60e-3, 1.3408, serial_port=simulator.getSerialPort())
+
+    async def measure():
+        async with device:
+            return await asyncio.wait_for(device.measure(0.5, sample_rate),
+                                          5.0)
+
+    assert len(asyncio.run(measure())) == 0
+
+
+def test_calibration_converges(simulator):
+    device = apa.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Async(
+        60e-3, 1.3408, serial_port=simulator.getSerialPort())
+
+    async def calibrate():
+        async with device:
+            start_time = time.monotonic()
+            calibration_value = await device.calibrate(10.0, 20)
+            return calibration_value, time.monotonic() - start_time
+
+    calibration_value, elapsed_time = asyncio.run(calibrate())
+    assert len(calibration_value) == 3
+    assert elapsed_time < 10.0
+
+
+def test_calibration_without_samples_raises(simulator, monkeypatch):
+    monkeypatch.setattr(
+        simulator,
+        '_Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator'
+        '__transmit', lambda data: None)
+    device = apa.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Async(
+        60e-3, 1.3408, serial_port=simulator.getSerialPort())
+
+    async def calibrate():
+        async with device:
+            return await device.calibrate(0.5)
+
+    with pytest.raises(ValueError):
+        asyncio.run(calibrate())
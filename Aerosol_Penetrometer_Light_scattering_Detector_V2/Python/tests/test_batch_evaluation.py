@@ -0,0 +1,27 @@
+"""Tests of the Batch_Evaluation module."""
+import numpy as np
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Batch_Evaluation \
+    as bev
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Storage as sto
+
+
+def saveRun(file_name, measurement_time, pressure):
+    n = len(measurement_time)
+    turbidity = np.full((n, 2), 0.1)
+    sto.saveMeasurement(str(file_name), measurement_time, np.ones((n, 4)),
+                        turbidity, np.ones(n), pressure,
+                        calibration_value=[0.0, 0.0, 1013.2])
+
+
+def test_degenerate_run_does_not_abort(tmp_path):
+    saveRun(tmp_path / "good.npz", np.arange(6.0),
+            [0.0, 0.0, -1.0, -1.0, 0.0, 0.0])
+    # Repeated time stamps give a flow time of zero
+    saveRun(tmp_path / "degenerate.npz", [0.0, 1.0, 1.0, 1.0],
+            [0.0, 0.0, -1.0, 0.0])
+    results = bev.evaluateFiles([str(tmp_path / "good.npz"),
+                                 str(tmp_path / "degenerate.npz")],
+                                0.06, 1.34, processes=1)
+    assert len(results) == 2
+    assert results['flow_rate'][0] == 1.2
+    assert np.isnan(results['flow_rate'][1])
@@ -0,0 +1,54 @@
+"""Tests of the cached calibration against the simulator."""
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2 as pen
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Calibration_Cache \
+    as cch
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Port_Pool as ppl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator as sim
+
+
+def test_cached_calibration_is_reused_without_drift(tmp_path, monkeypatch,
+                                                    capsys):
+    monkeypatch.setattr(ppl.Port_Pool, 'bootloader_delay', 0.0)
+    simulator = \
+        sim.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator(
+            seed=0)
+    simulator.startSimulation()
+    device = pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2(
+        60e-3, 1.3408, serial_port=simulator.getSerialPort())
+    cache = cch.Calibration_Cache(str(tmp_path / "calibration_cache.npy"))
+    requested_samples = []
+    readData = device.readData
+
+    def recordReadData():
+        sample = readData()
+        requested_samples.append(sample)
+        return sample
+
+    calibrations = []
+    try:
+        calibration_value = device.calibrateCached(cache, 10, plot=False)
+        capsys.readouterr()
+        monkeypatch.setattr(device, 'readData', recordReadData)
+        monkeypatch.setattr(device, 'calibrate',
+                            lambda *args, **kwargs: calibrations.append(args))
+        assert device.calibrateCached(cache, 10, plot=False) == \
+            calibration_value
+    finally:
+        device.closeSerial(keep_open=False)
+        simulator.stopSimulation()
+    # Only the few samples of the drift check were requested, no calibration
+    # ran
+    assert len(calibrations) == 0
+    assert len(requested_samples) == device.drift_check_samples
+    assert "Cached calibration reused." in capsys.readouterr().out
+    assert len(cache) == 1
+
+
+def test_default_cache_file_is_next_to_module(tmp_path, monkeypatch):
+    module_directory = tmp_path / "module"
+    module_directory.mkdir()
+    monkeypatch.setattr(cch, '__file__', str(module_directory / "cache.py"))
+    monkeypatch.chdir(tmp_path)
+    cch.Calibration_Cache().put("device", [0.0, 0.0, 1013.0])
+    assert not (tmp_path / "calibration_cache.npy").exists()
+    assert (module_directory / "calibration_cache.npy").exists()
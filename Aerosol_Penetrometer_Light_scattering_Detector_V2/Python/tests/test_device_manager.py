@@ -0,0 +1,46 @@
+"""Tests of the Device_Manager against the simulator."""
+import asyncio
+import pytest
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Device_Manager \
+    as dmg
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Port_Pool as ppl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator as sim
+
+
+@pytest.fixture
+def simulators(monkeypatch):
+    monkeypatch.setattr(ppl.Port_Pool, 'bootloader_delay', 0.0)
+    simulators = [
+        sim.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator(
+            seed=seed) for seed in range(2)]
+    for simulator in simulators:
+        simulator.startSimulation()
+    yield simulators
+    for simulator in simulators:
+        simulator.stopSimulation()
+
+
+def test_failing_device_keeps_other_results(simulators, monkeypatch):
+    serial_ports = [simulator.getSerialPort() for simulator in simulators]
+    manager = dmg.Device_Manager(60e-3, 1.3408, serial_ports)
+
+    async def fail(*args):
+        raise OSError("Device unplugged")
+
+    async def runAll():
+        await manager.connect()
+        monkeypatch.setattr(manager.getDevices()[serial_ports[1]],
+                            'calibrate', fail)
+        try:
+            calibration_values = await manager.calibrate(5.0)
+            sample_stores = await manager.measure(0.3)
+        finally:
+            await manager.close()
+        return calibration_values, sample_stores
+
+    with pytest.warns(UserWarning, match="Device unplugged"):
+        calibration_values, sample_stores = asyncio.run(runAll())
+    assert list(calibration_values) == [serial_ports[0]]
+    assert list(sample_stores) == [serial_ports[0]]
+    assert len(sample_stores[serial_ports[0]]) > 0
+    assert isinstance(manager.getErrors()[serial_ports[1]], OSError)
@@ -0,0 +1,20 @@
+"""Tests of the Evaluation module."""
+import numpy as np
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Evaluation as evl
+
+
+def test_flow_rate():
+    pressure = [0.0, 0.0, -1.0, -1.0, 0.0, 0.0]
+    measurement_time = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert evl.calculateFlowRate(pressure, measurement_time, 0.06) == \
+        (1.2, 3.0, 1, 4)
+
+
+def test_flow_rate_without_flow_time():
+    # Repeated time stamps give a flow time of zero
+    pressure = [0.0, 0.0, -1.0, 0.0]
+    measurement_time = [0.0, 1.0, 1.0, 1.0]
+    flow_rate, flow_time, start_ind, stop_ind = evl.calculateFlowRate(
+        pressure, measurement_time, 0.06)
+    assert np.isnan(flow_rate)
+    assert (flow_time, start_ind, stop_ind) == (0.0, 1, 3)
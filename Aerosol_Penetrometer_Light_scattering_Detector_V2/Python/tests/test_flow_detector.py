@@ -0,0 +1,44 @@
+"""Tests of the Flow_Detector."""
+import numpy as np
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Evaluation as evl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Flow_Detector as fdt
+
+
+def test_flow_rate_without_flow_time():
+    detector = fdt.Flow_Detector()
+    detector.append([0.0, 1.0, 1.0, 1.0], [0.0, 0.0, -1.0, 0.0])
+    flow_rate, flow_time, start_ind, stop_ind = detector.getFlowRate(0.06)
+    assert np.isnan(flow_rate)
+    assert (flow_time, start_ind, stop_ind) == (0.0, 1, 3)
+
+
+def test_empty_block():
+    detector = fdt.Flow_Detector()
+    detector.append([], [])
+    assert not detector.isStarted()
+    assert detector.getStartStop() == (0, 0)
+
+
+def test_single_sample_block():
+    detector = fdt.Flow_Detector()
+    detector.append([0.0], [0.0])
+    assert not detector.isStarted()
+    assert detector.getStartStop() == (0, 1)
+    assert detector.getFlowRate(0.06) == (0.0, 0.0, 0, 1)
+
+
+def test_blocks_equal_calculate_flow_rate():
+    measurement_time = np.arange(40)*0.1
+    pressure = np.zeros(40)
+    pressure[10:25] = -2.0
+    pressure += np.random.default_rng(0).normal(0.0, 0.01, 40)
+    detector = fdt.Flow_Detector(hold_off=0.5)
+    # Empty, single-sample and multi-sample blocks
+    splits = [0, 1, 4, 4, 5, 12, 13, 30]
+    for block_time, block_pressure in zip(np.split(measurement_time, splits),
+                                          np.split(pressure, splits)):
+        detector.append(block_time, block_pressure)
+    assert detector.getFlowRate(0.06) == \
+        evl.calculateFlowRate(pressure, measurement_time, 0.06)
+    assert detector.isStopped()
+    assert detector.getStopTime() == measurement_time[25]
@@ -0,0 +1,49 @@
+"""Tests of the binary frames."""
+import numpy as np
+import pytest
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Frames as frm
+
+
+def encodeTestFrames(number_of_frames):
+    """Return the buffer of numbered test frames."""
+    buffer = frm.encodeFrames(np.arange(number_of_frames),
+                              np.full((number_of_frames, 4), 512),
+                              np.full(number_of_frames, 1013.25))
+    return buffer
+
+
+def corruptByte(buffer, index):
+    """Return the buffer with one flipped byte."""
+    buffer = bytearray(buffer)
+    buffer[index] ^= 0xFF
+    return bytes(buffer)
+
+
+@pytest.mark.parametrize('index', [0, 1, 5, frm.frame_size - 1])
+def test_corrupted_frame_is_counted(index):
+    buffer = corruptByte(encodeTestFrames(4), frm.frame_size + index)
+    frames, rest, corrupted_frames = frm.decodeFrames(buffer)
+    np.testing.assert_array_equal(frames['sample_number'], [0, 2, 3])
+    assert rest == b""
+    assert corrupted_frames == 1
+
+
+def test_shortened_frame_is_counted():
+    buffer = encodeTestFrames(3)
+    buffer = buffer[:frm.frame_size + 5] + buffer[2*frm.frame_size:]
+    frames, rest, corrupted_frames = frm.decodeFrames(buffer)
+    np.testing.assert_array_equal(frames['sample_number'], [0, 2])
+    assert corrupted_frames == 1
+
+
+def test_corrupted_frame_split_across_buffers_is_counted_once():
+    buffer = corruptByte(encodeTestFrames(4), 2*frm.frame_size)
+    corrupted_frames = 0
+    sample_numbers = []
+    rest = b""
+    for i in range(0, len(buffer), 7):
+        frames, rest, corrupted = frm.decodeFrames(rest + buffer[i:i + 7])
+        corrupted_frames += corrupted
+        sample_numbers += frames['sample_number'].tolist()
+    assert sample_numbers == [0, 1, 3]
+    assert corrupted_frames == 1
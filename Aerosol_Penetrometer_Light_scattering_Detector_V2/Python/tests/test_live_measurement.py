@@ -0,0 +1,100 @@
+"""Tests of the live measurement against the simulator."""
+import threading
+import numpy as np
+import pytest
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2 as pen
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Port_Pool as ppl
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Recorder as rec
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator as sim
+
+
+@pytest.fixture
+def silent_device(monkeypatch):
+    monkeypatch.setattr(ppl.Port_Pool, 'bootloader_delay', 0.0)
+    simulator = \
+        sim.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator(
+            seed=0)
+    # The device receives the commands, but never sends anything
+    monkeypatch.setattr(
+        simulator,
+        '_Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator'
+        '__transmit', lambda data: None)
+    simulator.startSimulation()
+    device = pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2(
+        60e-3, 1.3408, serial_port=simulator.getSerialPort())
+    yield device
+    device.closeSerial(keep_open=False)
+    simulator.stopSimulation()
+
+
+def runWithTimeout(function, timeout=10.0):
+    """Run a function in a thread and return its results."""
+    results = []
+    thread = threading.Thread(target=lambda: results.append(function()),
+                              daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive()
+    return results
+
+
+@pytest.mark.parametrize('options', [{}, {'sample_rate': 20},
+                                     {'sample_rate': 20, 'binary': True}])
+def test_silent_device_ends_measurement(silent_device, options):
+    results = runWithTimeout(lambda: silent_device.liveMeasurement(
+        0.5, plot=False, **options))
+    assert len(results) == 1
+    assert len(results[0]) == 0
+
+
+def test_silent_device_stops_drift_monitor(silent_device, monkeypatch):
+    monkeypatch.setattr(silent_device, 'drift_sample_interval', 0.1)
+    silent_device.startDriftMonitor()
+    runWithTimeout(silent_device.stopDriftMonitor)
+    assert len(runWithTimeout(silent_device.getDriftBaseline)) == 1
+
+
+def test_recording_keeps_window_in_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(ppl.Port_Pool, 'bootloader_delay', 0.0)
+    simulator = \
+        sim.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator(
+            seed=0)
+    simulator.startSimulation()
+    device = pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2(
+        60e-3, 1.3408, serial_port=simulator.getSerialPort())
+    monkeypatch.setattr(device, 'recording_window', 10)
+    record_file = str(tmp_path / "recording.bin")
+    try:
+        sample_store = device.liveMeasurement(1.0, plot=False,
+                                              record_file=record_file)
+    finally:
+        device.closeSerial(keep_open=False)
+        simulator.stopSimulation()
+    samples = rec.readRecording(record_file)[1]
+    assert len(samples) > 10
+    assert len(sample_store) == 10
+    np.testing.assert_allclose(sample_store.getMeasurementTime(),
+                               samples[-10:, 0])
+
+
+def test_stream_above_link_capacity_drops_samples(monkeypatch):
+    monkeypatch.setattr(ppl.Port_Pool, 'bootloader_delay', 0.0)
+    simulator = \
+        sim.Aerosol_Penetrometer_Light_Scattering_Detector_V2_Simulator(
+            seed=0)
+    simulator.startSimulation()
+    device = pen.Aerosol_Penetrometer_Light_Scattering_Detector_V2(
+        60e-3, 1.3408, serial_port=simulator.getSerialPort())
+    try:
+        # 9600 baud carry about 25 text lines per second
+        with pytest.warns(UserWarning, match="dropped"):
+            sample_store = device.liveMeasurement(1.0, plot=False,
+                                                  sample_rate=200)
+    finally:
+        device.closeSerial(keep_open=False)
+        simulator.stopSimulation()
+    # The stream skips the samples it cannot send instead of bursting them
+    # late, so the sample times follow the elapsed time
+    assert device.getDroppedSamples() > 0
+    measurement_time = sample_store.getMeasurementTime()
+    assert measurement_time[-1] - measurement_time[0] < 1.5
@@ -0,0 +1,44 @@
+"""Tests of the Running_Integrator."""
+import numpy as np
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Running_Integrator \
+    as rin
+
+
+def test_empty_block_is_ignored():
+    integrator = rin.Running_Integrator(3)
+    integrator.append(np.zeros(0), np.zeros((0, 3)))
+    assert len(integrator) == 0
+    np.testing.assert_array_equal(integrator.getTotal(), np.zeros(3))
+
+
+def test_empty_block_between_blocks():
+    integrator = rin.Running_Integrator(1)
+    integrator.append([0.0, 1.0], [[1.0], [1.0]])
+    integrator.append([], [])
+    integrator.append([2.0], [[1.0]])
+    assert len(integrator) == 3
+    np.testing.assert_allclose(integrator.getTotal(), [2.0])
+
+
+def test_single_sample_block():
+    integrator = rin.Running_Integrator(2)
+    integrator.append([0.5], [[1.0, 2.0]])
+    assert len(integrator) == 1
+    np.testing.assert_array_equal(integrator.getTotal(), np.zeros(2))
+
+
+def test_blocks_equal_trapezoidal_rule():
+    rng = np.random.default_rng(0)
+    measurement_time = np.cumsum(rng.uniform(0.01, 0.1, 20))
+    values = rng.normal(size=(20, 2))
+    integrator = rin.Running_Integrator(2, chunk_size=4)
+    # Empty, single-sample and multi-sample blocks
+    splits = [0, 1, 4, 4, 5, 12]
+    for block_time, block_values in zip(np.split(measurement_time, splits),
+                                        np.split(values, splits)):
+        integrator.append(block_time, block_values)
+    assert len(integrator) == 20
+    areas = 0.5*(values[1:] + values[:-1])*np.diff(measurement_time)[:, None]
+    np.testing.assert_allclose(integrator.getTotal(), np.sum(areas, 0))
+    np.testing.assert_allclose(integrator.getTotal(3, 9),
+                               np.sum(areas[3:8], 0))
@@ -0,0 +1,34 @@
+"""Tests of the Running_Statistics."""
+import numpy as np
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Running_Statistics \
+    as rst
+
+
+def test_empty_block():
+    statistics = rst.Running_Statistics(3)
+    statistics.append(np.zeros((0, 3)))
+    assert len(statistics) == 0
+    assert np.all(np.isnan(statistics.getMean()))
+    assert np.all(np.isnan(statistics.getStandardError()))
+
+
+def test_single_sample_block():
+    statistics = rst.Running_Statistics(3)
+    statistics.append([1.0, 2.0, 3.0])
+    assert len(statistics) == 1
+    np.testing.assert_array_equal(statistics.getMean(), [1.0, 2.0, 3.0])
+    assert np.all(np.isnan(statistics.getVariance()))
+
+
+def test_blocks_equal_all_samples():
+    values = np.random.default_rng(0).normal(5.0, 2.0, (20, 3))
+    statistics = rst.Running_Statistics(3)
+    # Empty, single-sample and multi-sample blocks
+    for block in np.split(values, [0, 1, 4, 4, 5, 12]):
+        statistics.append(block)
+    assert len(statistics) == 20
+    np.testing.assert_allclose(statistics.getMean(), np.mean(values, 0))
+    np.testing.assert_allclose(statistics.getVariance(),
+                               np.var(values, 0, ddof=1))
+    np.testing.assert_allclose(statistics.getStandardError(),
+                               np.std(values, 0, ddof=1)/np.sqrt(20))
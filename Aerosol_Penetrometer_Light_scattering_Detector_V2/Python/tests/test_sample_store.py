@@ -0,0 +1,37 @@
+"""Tests of the Sample_Store."""
+import numpy as np
+import Aerosol_Penetrometer_Light_Scattering_Detector_V2_Sample_Store as sst
+
+
+def appendSamples(sample_store, measurement_time):
+    n = len(measurement_time)
+    sample_store.append(measurement_time, np.ones((n, 4)), -measurement_time,
+                        np.ones((n, 2)), np.ones(n))
+
+
+def test_all_samples_are_kept():
+    sample_store = sst.Sample_Store(chunk_size=4)
+    for block in np.split(np.arange(20.0), [0, 1, 4, 4, 5, 12]):
+        appendSamples(sample_store, block)
+    assert len(sample_store) == 20
+    np.testing.assert_array_equal(sample_store.getMeasurementTime(),
+                                  np.arange(20.0))
+    assert sample_store.getDiscardedSamples() == 0
+
+
+def test_maximum_samples_keeps_the_latest():
+    sample_store = sst.Sample_Store(chunk_size=4, maximum_samples=10)
+    appended_samples = 0
+    # Empty, single-sample, multi-sample and blocks beyond the maximum
+    for block in np.split(np.arange(100.0), [0, 1, 4, 4, 5, 12, 30, 31, 70]):
+        appendSamples(sample_store, block)
+        appended_samples += len(block)
+        assert len(sample_store) == min(appended_samples, 10)
+        np.testing.assert_array_equal(sample_store.getPressure(),
+                                      -sample_store.getMeasurementTime())
+    np.testing.assert_array_equal(sample_store.getMeasurementTime(),
+                                  np.arange(90.0, 100.0))
+    assert sample_store.getDiscardedSamples() == 90
+    # The arrays hold at most twice the maximum number of samples
+    assert sample_store.getMemoryUsage() <= \
+        sst.Sample_Store(20).getMemoryUsage()